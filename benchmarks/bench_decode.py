@@ -0,0 +1,57 @@
+"""
+Decoding time of a state packet for 1v1, 2v2 and 3v3 matches, with the per object GameState decoder and with the
+ArrayGameState numba decoder (new state each step, and reusing one state).
+
+    python benchmarks/bench_decode.py --iterations 20000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from rlgym.headless.simulator import KinematicSimulator
+from rlgym.utils.gamestates import GameState, ArrayGameState
+
+
+def _state_packet(team_size: int) -> np.ndarray:
+    simulator = KinematicSimulator()
+    simulator.configure([team_size, 1, 8, 100, 1, 1])
+    for _ in range(10):
+        simulator.step([1, 1, 0.5, 0, 0, 0, 0, 1, 0] * team_size * 2)
+    packet = simulator.get_state()
+
+    # Plugin packets are not sorted by car id.
+    players = packet[-team_size * 2 * GameState.PLAYER_INFO_LENGTH:].reshape(team_size * 2, -1)
+    players[:] = players[::-1].copy()
+    return packet
+
+
+def _time(func, packet, iterations: int) -> float:
+    func(packet)
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        func(packet)
+    return (time.perf_counter() - t0) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+
+    for team_size in (1, 2, 3):
+        packet = _state_packet(team_size)
+        reused = ArrayGameState()
+
+        # Protocol v1 hands the decoder a list of floats, protocol v2 a float32 array.
+        for name, body in (("v1 list", packet.tolist()), ("v2 float32", packet.astype(np.float32))):
+            results = [("GameState", _time(GameState, body, args.iterations)),
+                       ("ArrayGameState", _time(ArrayGameState, body, args.iterations)),
+                       ("ArrayGameState reused", _time(reused.decode, body, args.iterations))]
+            print("{}v{} {:<10} | ".format(team_size, team_size, name) +
+                  " | ".join("{} {:6.1f} us".format(label, t * 1e6) for label, t in results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+"""
+Time per call of every rlgym.utils.math backend (Rust, numba, NumPy) available on this host, and which one is picked
+by default.
+
+    python benchmarks/bench_math_backends.py --number 20000
+"""
+
+import argparse
+
+from rlgym.utils import math
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=10000)
+    args = parser.parse_args()
+
+    results = math.benchmark_backends(args.number)
+    defaults = {name: math.get_backend(name) for name in results}
+    for name, times in results.items():
+        fastest = min(times, key=times.get)
+        print("{:<22} | ".format(name) +
+              " | ".join("{} {:6.2f} us".format(backend, t * 1e6) for backend, t in times.items()) +
+              " | fastest {}, default {}".format(fastest, defaults[name]))
+
+
+if __name__ == '__main__':
+    main()
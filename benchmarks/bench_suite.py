@@ -0,0 +1,228 @@
+"""
+Times every stage of a step on synthetic 1v1, 2v2 and 3v3 state packets, each in isolation and as a full Match step,
+without the game. The results are saved as JSON so two commits can be compared.
+
+    python benchmarks/bench_suite.py --iterations 2000 --output results.json
+    python benchmarks/bench_suite.py --iterations 2000 --output new.json --compare results.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_packets import synthetic_packet
+
+from rlgym.envs import Match
+from rlgym.utils.action_parsers import ContinuousAction
+from rlgym.utils.gamestates import GameState, ArrayGameState
+from rlgym.utils.obs_builders import DefaultObs, AdvancedObs
+from rlgym.utils.obs_builders.rhobot_obs import RhobotObs
+from rlgym.utils.reward_functions import DefaultReward, CombinedReward
+from rlgym.utils.reward_functions.common_rewards import LiuDistanceBallToGoalReward, VelocityBallToGoalReward, \
+    BallYCoordinateReward, EventReward, VelocityReward, SaveBoostReward, AlignBallGoal, \
+    LiuDistancePlayerToBallReward, VelocityPlayerToBallReward, FaceBallReward, TouchBallReward, RewardIfClosestToBall
+from rlgym.utils.state_setters import DefaultState
+from rlgym.utils.terminal_conditions.common_conditions import TimeoutCondition, NoTouchTimeoutCondition, \
+    GoalScoredCondition
+
+
+def _time(func: Callable, iterations: int) -> float:
+    func()
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - t0) / iterations
+
+
+def _rewards():
+    return [LiuDistanceBallToGoalReward(), VelocityBallToGoalReward(), BallYCoordinateReward(),
+            EventReward(goal=10, concede=-10, touch=1, shot=1, save=1, demo=1, boost_pickup=1), VelocityReward(),
+            SaveBoostReward(), AlignBallGoal(), LiuDistancePlayerToBallReward(), VelocityPlayerToBallReward(),
+            FaceBallReward(), TouchBallReward(aerial_weight=1), RewardIfClosestToBall(VelocityPlayerToBallReward()),
+            DefaultReward()]
+
+
+def _combined_reward():
+    return CombinedReward((VelocityPlayerToBallReward(), VelocityBallToGoalReward(), EventReward(goal=10, touch=1),
+                           SaveBoostReward()), (1, 1, 1, 0.1))
+
+
+def _bench_decode(packet: np.ndarray, iterations: int, results: Dict[str, float]):
+    # Protocol v1 hands the decoder a list of floats, protocol v2 a float32 array.
+    for name, body in (("v1", packet.tolist()), ("v2", packet.astype(np.float32))):
+        reused_state, reused_array_state = GameState(body), ArrayGameState(body)
+        results["decode/GameState/" + name] = _time(lambda: GameState(body), iterations)
+        results["decode/GameState reused/" + name] = _time(lambda: reused_state.decode(body), iterations)
+        results["decode/ArrayGameState/" + name] = _time(lambda: ArrayGameState(body), iterations)
+        results["decode/ArrayGameState reused/" + name] = _time(lambda: reused_array_state.decode(body), iterations)
+
+
+def _bench_convert(packet: np.ndarray, iterations: int, results: Dict[str, float]):
+    # What the batched obs builders pay on the states of a Match with the default game_state_class.
+    state, array_state = GameState(packet.tolist()), ArrayGameState()
+    results["convert/GameState to ArrayGameState"] = _time(lambda: ArrayGameState.from_state(state, array_state),
+                                                           iterations)
+
+
+def _bench_obs(packet: np.ndarray, team_size: int, iterations: int, results: Dict[str, float]):
+    state, array_state = GameState(packet.tolist()), ArrayGameState(packet)
+    actions = np.zeros((len(state.players), 8))
+    for obs_builder in (DefaultObs(), AdvancedObs(team_size=team_size), RhobotObs()):
+        name = "obs/" + type(obs_builder).__name__
+        obs_builder.reset(state)
+
+        def per_player():
+            obs_builder.pre_step(state)
+            for i, player in enumerate(state.players):
+                obs_builder.build_obs(player, state, actions[i])
+
+        # Match batches the observations of both state classes, a GameState is converted by the builder.
+        def batch(batch_state):
+            obs_builder.pre_step(batch_state)
+            obs_builder.build_obs_batch(batch_state, actions)
+
+        results[name + "/per player"] = _time(per_player, iterations)
+        results[name + "/batch from GameState"] = _time(lambda: batch(state), iterations)
+        results[name + "/batch from ArrayGameState"] = _time(lambda: batch(array_state), iterations)
+
+
+def _bench_rewards(packet: np.ndarray, iterations: int, results: Dict[str, float]):
+    state, array_state = GameState(packet.tolist()), ArrayGameState(packet)
+    actions = np.zeros((len(state.players), 8))
+    for reward_fn in _rewards() + [_combined_reward()]:
+        name = "reward/" + type(reward_fn).__name__
+        reward_fn.reset(state)
+
+        def per_player():
+            reward_fn.pre_step(state)
+            for i, player in enumerate(state.players):
+                reward_fn.get_reward(player, state, actions[i])
+
+        # Match only batches the rewards of ArrayGameState states, GameState ones go through get_reward.
+        def batch():
+            reward_fn.pre_step(array_state)
+            reward_fn.get_rewards_batch(array_state, actions)
+
+        results[name + "/per player from GameState"] = _time(per_player, iterations)
+        results[name + "/batch from ArrayGameState"] = _time(batch, iterations)
+
+
+def _make_match(team_size: int, game_state_class: type, obs_builder, reuse_game_states: bool = False) -> Match:
+    return Match(reward_function=_combined_reward(),
+                 terminal_conditions=[TimeoutCondition(10 ** 9), NoTouchTimeoutCondition(10 ** 9),
+                                      GoalScoredCondition()],
+                 obs_builder=obs_builder,
+                 action_parser=ContinuousAction(),
+                 state_setter=DefaultState(),
+                 team_size=team_size,
+                 spawn_opponents=True,
+                 game_state_class=game_state_class,
+                 reuse_game_states=reuse_game_states)
+
+
+def _bench_match(packet: np.ndarray, team_size: int, iterations: int, results: Dict[str, float]):
+    configurations = (("GameState/v1", GameState, packet.tolist(), False),
+                      ("ArrayGameState/v2", ArrayGameState, packet.astype(np.float32), False),
+                      ("ArrayGameState reused/v2", ArrayGameState, packet.astype(np.float32), True))
+    actions = np.random.default_rng(0).uniform(-1, 1, (team_size * 2, 8))
+
+    for name, game_state_class, body, reuse in configurations:
+        match = _make_match(team_size, game_state_class, AdvancedObs(team_size=team_size), reuse)
+        state = match.parse_state(body)
+        match.episode_reset(state)
+        match.build_observations(state)
+
+        # The stages of Gym.step, in order.
+        stages = {
+            "parse_actions": lambda: match.parse_actions(actions, state),
+            "format_actions": lambda: match.format_actions(actions),
+            "parse_state": lambda: match.parse_state(body),
+            "build_observations": lambda: match.build_observations(state),
+            "is_done": lambda: match.is_done(state),
+            "get_rewards": lambda: match.get_rewards(state, False),
+        }
+        for stage, func in stages.items():
+            results["match/{}/{}".format(name, stage)] = _time(func, iterations)
+
+        def step():
+            match.format_actions(match.parse_actions(actions, state))
+            new_state = match.parse_state(body)
+            match.build_observations(new_state)
+            done = match.is_done(new_state)
+            match.get_rewards(new_state, done)
+
+        results["match/{}/step".format(name)] = _time(step, iterations)
+
+
+def _metadata() -> Dict[str, str]:
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor()
+    }
+
+
+def _compare(results: Dict[str, Dict[str, float]], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print("\nCompared to {} (commit {}), new / old:".format(baseline_path, baseline["meta"].get("commit")))
+    for match_name, timings in results.items():
+        for name, t in timings.items():
+            old = baseline["results"].get(match_name, {}).get(name)
+            if old:
+                print("{} {:<55} {:8.1f} us -> {:8.1f} us  x{:.2f}".format(match_name, name, old * 1e6, t * 1e6,
+                                                                          t / old))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--team-sizes", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="A JSON file to save the results to")
+    parser.add_argument("--compare", help="A JSON file of previous results to compare to")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = {}
+    for team_size in args.team_sizes:
+        packet = synthetic_packet(team_size, rng)
+        timings = {}
+        _bench_decode(packet, args.iterations, timings)
+        _bench_convert(packet, args.iterations, timings)
+        _bench_obs(packet, team_size, args.iterations, timings)
+        _bench_rewards(packet, args.iterations, timings)
+        _bench_match(packet, team_size, args.iterations, timings)
+
+        match_name = "{}v{}".format(team_size, team_size)
+        results[match_name] = timings
+        for name, t in timings.items():
+            print("{} {:<55} {:8.1f} us".format(match_name, name, t * 1e6))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"meta": _metadata(), "iterations": args.iterations, "results": results}, f, indent=2)
+    if args.compare is not None:
+        _compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
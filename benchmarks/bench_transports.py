@@ -0,0 +1,62 @@
+"""
+Round trip benchmark of the transports against the loopback stand-in game, one action message out and one 3v3 state
+packet back per step.
+
+    python benchmarks/bench_transports.py --steps 20000
+"""
+
+import argparse
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from rlgym.communication import CommunicationHandler, Message, TransportType
+
+
+def bench(transport: str, protocol: int, steps: int, num_players: int) -> float:
+    comm_handler = CommunicationHandler(transport=transport, protocol=protocol)
+    address = comm_handler.format_address("bench_{}".format(os.getpid()))
+
+    # The stand-in runs in its own interpreter, like the game would.
+    game = subprocess.Popen([sys.executable, "-m", "rlgym.communication.loopback", address, "--transport", transport,
+                             "--protocol", str(protocol), "--players", str(num_players)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    comm_handler.open_pipe(address)
+
+    actions = [0.0] * (num_players * (1 + 8))
+    header = Message.RLGYM_AGENT_ACTION_IMMEDIATE_RESPONSE_MESSAGE_HEADER
+    for _ in range(100):
+        comm_handler.send_message(header=header, body=actions)
+        comm_handler.receive_message(header=Message.RLGYM_STATE_MESSAGE_HEADER)
+
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        comm_handler.send_message(header=header, body=actions)
+        comm_handler.receive_message(header=Message.RLGYM_STATE_MESSAGE_HEADER)
+    elapsed = time.perf_counter() - t0
+
+    comm_handler.close_pipe()
+    game.wait(5)
+    return elapsed / steps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=10000)
+    parser.add_argument("--players", type=int, default=6)
+    args = parser.parse_args()
+
+    transports = [TransportType.UNIX_SOCKET, TransportType.SHARED_MEMORY]
+    if platform.system() == 'Windows':
+        transports = [TransportType.NAMED_PIPE, TransportType.SHARED_MEMORY]
+
+    for transport in transports:
+        for protocol in (Message.RLGYM_PROTOCOL_V1, Message.RLGYM_PROTOCOL_V2):
+            step_time = bench(transport, protocol, args.steps, args.players)
+            print("{:<14} protocol v{} | {:8.2f} us / round trip".format(transport, protocol, step_time * 1e6))
+
+
+if __name__ == '__main__':
+    main()
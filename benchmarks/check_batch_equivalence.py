@@ -0,0 +1,71 @@
+"""
+Checks that the batched obs builders and rewards give the same results as their per player methods, on synthetic 1v1,
+2v2 and 3v3 state packets, from both a GameState and an ArrayGameState. Observations have to be bit-identical, rewards
+equal up to float rounding. Exits with an error on the first mismatch.
+
+    python benchmarks/check_batch_equivalence.py --states 200
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_packets import synthetic_packet
+from bench_suite import _rewards, _combined_reward
+
+from rlgym.utils.gamestates import GameState, ArrayGameState
+from rlgym.utils.obs_builders import DefaultObs, AdvancedObs
+from rlgym.utils.obs_builders.rhobot_obs import RhobotObs
+
+
+def _check_obs(state, team_size: int, actions: np.ndarray):
+    for obs_builder in (DefaultObs(), AdvancedObs(team_size=team_size), RhobotObs()):
+        obs_builder.reset(state)
+        obs_builder.pre_step(state)
+        expected = np.stack([obs_builder.build_obs(player, state, actions[i])
+                             for i, player in enumerate(state.players)])
+        obs = obs_builder.build_obs_batch(state, actions)
+        if not np.array_equal(obs, expected):
+            raise AssertionError("{} build_obs_batch differs from build_obs on {} by up to {}".format(
+                type(obs_builder).__name__, type(state).__name__, np.abs(obs - expected).max()))
+
+
+def _check_rewards(state, actions: np.ndarray):
+    # Some rewards keep state between steps, so each path gets its own instance.
+    for reward_fn, batched_fn in zip(_rewards() + [_combined_reward()], _rewards() + [_combined_reward()]):
+        for done in (False, True):
+            for fn in (reward_fn, batched_fn):
+                fn.reset(state)
+                fn.pre_step(state)
+            get_reward = reward_fn.get_final_reward if done else reward_fn.get_reward
+            expected = np.array([get_reward(player, state, actions[i]) for i, player in enumerate(state.players)],
+                                dtype=float)
+            rewards = np.asarray(batched_fn.get_rewards_batch(state, actions, done), dtype=float)
+            if not np.allclose(rewards, expected, rtol=1e-9, atol=1e-9):
+                raise AssertionError("{} get_rewards_batch differs from get_reward on {} (done={}): {} != {}".format(
+                    type(reward_fn).__name__, type(state).__name__, done, rewards, expected))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--states", type=int, default=200, help="Random states per team size")
+    parser.add_argument("--team-sizes", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for team_size in args.team_sizes:
+        for _ in range(args.states):
+            packet = synthetic_packet(team_size, rng)
+            actions = rng.uniform(-1, 1, (team_size * 2, 8))
+            for state in (GameState(packet.tolist()), ArrayGameState(packet.astype(np.float32))):
+                _check_obs(state, team_size, actions)
+                _check_rewards(state, actions)
+        print("{}v{}: {} states match".format(team_size, team_size, args.states))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Random but plausible state packets, with the layout of the Bakkesmod plugin (see `GameState.decode`), for benchmarks
+that run without the game.
+"""
+
+import numpy as np
+
+from rlgym.headless.simulator import euler_to_rotation, rotation_to_quaternion, BLUE_ID1, ORANGE_ID1, _INVERT, \
+    _clip_norm
+from rlgym.utils import common_values
+from rlgym.utils.gamestates import GameState
+
+
+def synthetic_packet(team_size: int, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    A state packet of a `team_size`v`team_size` match, with the cars in random packet order like the plugin sends them.
+
+    :param team_size: The number of cars per team.
+    :param rng: The random generator to use.
+    :return: The packet as a float64 array, `.tolist()` gives a protocol v1 body and `.astype(np.float32)` a v2 one.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    n = 2 * team_size
+
+    ball = np.empty((3, 3))
+    ball[0] = rng.uniform((-common_values.SIDE_WALL_X, -common_values.BACK_WALL_Y, common_values.BALL_RADIUS),
+                          (common_values.SIDE_WALL_X, common_values.BACK_WALL_Y, common_values.CEILING_Z))
+    ball[1:2] = _clip_norm(rng.normal(0, 1500, (1, 3)), common_values.BALL_MAX_SPEED)
+    ball[2:3] = _clip_norm(rng.normal(0, 2, (1, 3)), 6)
+
+    # Most cars are driving on the ground, the others are in the air with any orientation.
+    on_ground = rng.random(n) < 0.7
+    positions = rng.uniform((-common_values.SIDE_WALL_X, -common_values.BACK_WALL_Y, 17),
+                            (common_values.SIDE_WALL_X, common_values.BACK_WALL_Y, common_values.CEILING_Z), (n, 3))
+    positions[on_ground, 2] = 17
+    rotations = rng.uniform((-np.pi / 2, -np.pi, -np.pi), (np.pi / 2, np.pi, np.pi), (n, 3))
+    rotations[on_ground, 0] = rotations[on_ground, 2] = 0
+    quaternions = rotation_to_quaternion(euler_to_rotation(rotations))
+    w, x, y, z = quaternions.T
+    inverted_quaternions = np.stack((-z, -y, x, w), axis=1)
+    linear_velocities = _clip_norm(rng.normal(0, 1000, (n, 3)), common_values.CAR_MAX_SPEED)
+    angular_velocities = _clip_norm(rng.normal(0, 2, (n, 3)), common_values.CAR_MAX_ANG_VEL)
+
+    car_ids = np.concatenate((np.arange(team_size) + BLUE_ID1, np.arange(team_size) + ORANGE_ID1))
+    team_nums = np.repeat([common_values.BLUE_TEAM, common_values.ORANGE_TEAM], team_size)
+    # Goals, saves, shots, demolishes, boost pickups, is demoed, on ground, ball touched, has jump, has flip, boost.
+    tertiary = np.column_stack((rng.integers(0, 3, (n, 4)), rng.integers(0, 30, n), rng.random(n) < 0.05, on_ground,
+                                rng.random(n) < 0.05, on_ground | (rng.random(n) < 0.3), rng.random(n) < 0.8,
+                                rng.random(n)))
+
+    players = np.column_stack((car_ids, team_nums,
+                               positions, quaternions, linear_velocities, angular_velocities,
+                               positions * _INVERT, inverted_quaternions, linear_velocities * _INVERT,
+                               angular_velocities * _INVERT, tertiary))
+    assert players.shape[1] == GameState.PLAYER_INFO_LENGTH
+    players = players[rng.permutation(n)]
+
+    header = [0, rng.integers(0, 5), rng.integers(0, 5)]
+    boost_pads = rng.random(GameState.BOOST_PADS_LENGTH) < 0.8
+    return np.concatenate((header, boost_pads, ball.ravel(), (ball * _INVERT).ravel(), players.ravel()))
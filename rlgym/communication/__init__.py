@@ -1,2 +1,3 @@
 from .message import Message
-from .communication_handler import CommunicationHandler
\ No newline at end of file
+from .transport import Transport, TransportType
+from .communication_handler import CommunicationHandler
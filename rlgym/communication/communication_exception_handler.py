@@ -15,7 +15,7 @@ def handle_exception(e):
     args = e.args
     exception_code = UNKNOWN_ERROR
     print("RLGym has encountered an exception!\nException traceback:\n{}".format(traceback.format_exc()))
-    if "The pipe has been ended." in args:
+    if "The pipe has been ended." in args or isinstance(e, (EOFError, ConnectionError)):
         exception_code = _eof_error()
     else:
         print("EXCEPTION ARGS:", args)
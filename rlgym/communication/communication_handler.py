@@ -1,13 +1,12 @@
 from rlgym.communication import Message
 from rlgym.communication import communication_exception_handler
+from rlgym.communication.transport import Transport, TransportType, get_transport
 
-import win32file
-import win32pipe
 # import struct
 from struct import unpack
 # import numpy
-from multiprocessing.pool import ThreadPool
 import array
+from typing import Dict, Tuple
 
 
 class CommunicationHandler(object):
@@ -16,25 +15,57 @@ class CommunicationHandler(object):
     RLGYM_DEFAULT_PIPE_SIZE = 1400
     RLGYM_DEFAULT_TIMEOUT = 4000
 
-    def __init__(self):
-        self._current_pipe_name = CommunicationHandler.RLGYM_GLOBAL_PIPE_NAME
-        self._pipe = None
+    def __init__(self, transport: Transport = TransportType.NAMED_PIPE, protocol: int = Message.RLGYM_PROTOCOL_V1):
+        """
+        :param transport: The transport used to talk to the game, either a `TransportType` value or a `Transport`
+                          object.
+        :param protocol: The message framing to use, Message.RLGYM_PROTOCOL_V1 or Message.RLGYM_PROTOCOL_V2. Both sides
+                         of the connection must use the same one.
+        """
+        self.transport = get_transport(transport)
+        self.protocol = protocol
+        self._current_pipe_name = None
         self._connected = False
+        self._sequence = 0
         self.message = Message()
-
-    def receive_message(self, header=None, num_attempts=100):
+        # The number of messages skipped by the last `receive_message(latest_only=True)`, and by all of them.
+        self.dropped_frames = 0
+        self.total_dropped_frames = 0
+        self._header_prefixes: Dict[Tuple, bytes] = {}
+
+    def receive_message(self, header=None, num_attempts=100, latest_only=False):
+        """
+        :param header: The header of the message to wait for, any message if None.
+        :param num_attempts: The maximum number of messages to read.
+        :param latest_only: Read every message that is already waiting and decode only the newest one with `header`.
+                            The headers are compared on the raw bytes, so the older messages are never decoded. The
+                            number of messages skipped is stored in `dropped_frames`.
+        """
         # TODO: deal with discarded messages while waiting for a specific header
         if not self.is_connected():
             print("RLGYM ATTEMPTED TO RECEIVE MESSAGE WITH NO CONNECTION")
             return communication_exception_handler.BROKEN_PIPE_ERROR
 
+        if latest_only:
+            return self._receive_latest_message(header, num_attempts)
+
         received_message = self.message
         exception_code = None
         try:
             for i in range(num_attempts):
                 # print("Waiting for header",header)
                 # a = array.array("f")
-                code, msg_bytes = win32file.ReadFile(self._pipe, CommunicationHandler.RLGYM_DEFAULT_PIPE_SIZE)
+                msg_bytes = self.transport.receive()
+
+                if self.protocol == Message.RLGYM_PROTOCOL_V2:
+                    deserialized_header = Message.deserialize_binary_header(msg_bytes)
+                    if header is None or header == deserialized_header:
+                        received_message.deserialize_binary(msg_bytes)
+
+                        if not self.transport.peek():
+                            break
+                    continue
+
                 # a = array.array("f")
                 # arr = numpy.frombuffer(msg_bytes, dtype=float)
                 # msg_floats = arr.tolist()
@@ -50,9 +81,8 @@ class CommunicationHandler(object):
                     received_message.deserialize(msg_floats)
                     # print("RETURNING MESSAGE BODY:",received_message.body)
 
-                    # Peek the next message in the pipe to see if we've reached the end of new messages.
-                    data = win32pipe.PeekNamedPipe(self._pipe, CommunicationHandler.RLGYM_DEFAULT_PIPE_SIZE)
-                    if data[0] == b'':
+                    # Peek the next message to see if we've reached the end of new messages.
+                    if not self.transport.peek():
                         break
 
         # This is the pywintypes.error object type.
@@ -63,6 +93,55 @@ class CommunicationHandler(object):
         # TODO: make sure users of this object deal with the null message response
         return received_message, exception_code
 
+    def _receive_latest_message(self, header, num_attempts):
+        received_message = self.message
+        exception_code = None
+        prefix = self._header_prefix(header) if header is not None else None
+        transport = self.transport
+        latest = None
+        frames = 0
+        try:
+            for i in range(num_attempts):
+                msg_bytes = transport.receive()
+                frames += 1
+                pending = transport.peek()
+
+                if prefix is None or msg_bytes[:len(prefix)] == prefix:
+                    # The next receive may reuse the buffer of this message.
+                    latest = bytes(msg_bytes) if pending else msg_bytes
+                if latest is not None and not pending:
+                    break
+
+            if latest is not None:
+                if self.protocol == Message.RLGYM_PROTOCOL_V2:
+                    received_message.deserialize_binary(latest)
+                else:
+                    received_message.deserialize(list(unpack('%sf' % (len(latest) // 4), latest)))
+
+        # This is the pywintypes.error object type.
+        except BaseException as e:
+            print("Receive message failed")
+            exception_code = communication_exception_handler.handle_exception(e)
+
+        self.dropped_frames = frames - 1 if latest is not None else frames
+        self.total_dropped_frames += self.dropped_frames
+        return received_message, exception_code
+
+    def _header_prefix(self, header) -> bytes:
+        """
+        The first bytes of every serialized message with this header.
+        """
+        key = tuple(header)
+        prefix = self._header_prefixes.get(key)
+        if prefix is None:
+            if self.protocol == Message.RLGYM_PROTOCOL_V2:
+                message_type = Message.RLGYM_MESSAGE_TYPES.index(list(header))
+                prefix = Message.RLGYM_V2_HEADER.pack(Message.RLGYM_V2_MAGIC, message_type, 0, 0)[:8]
+            else:
+                prefix = array.array("f", list(header) + Message.RLGYM_HEADER_END_TOKEN).tobytes()
+            self._header_prefixes[key] = prefix
+        return prefix
+
     def send_message(self, message=None, header=None, body=None):
         if not self.is_connected():
             print("RLGYM ATTEMPTED TO SEND MESSAGE WITH NO CONNECTION")
@@ -79,17 +158,24 @@ class CommunicationHandler(object):
             message.header = header
             message.body = body
 
-        serialized = message.serialize()
-        # print("TRANSMITTING",serialized)
         exception_code = None
-        a = array.array("f")
+        if self.protocol == Message.RLGYM_PROTOCOL_V2:
+            message.sequence = self._sequence
+            self._sequence += 1
+            try:
+                self.transport.send(message.serialize_binary())
+            except BaseException as e:
+                print("Send message failed")
+                exception_code = communication_exception_handler.handle_exception(e)
+
+            return exception_code
+
+        # print("TRANSMITTING",message.serialize())
         try:
-            a.fromlist(serialized)
             # arr = numpy.fromiter(serialized, dtype=numpy.float32)
             # encoded = arr.tobytes()
-            # encoded = a.tobytes()
             # encoded = struct.pack('%sf' % len(serialized), *serialized)
-            win32file.WriteFile(self._pipe, a.tobytes())
+            self.transport.send(message.serialize_bytes())
 
         except BaseException as e:
             print("Send message failed")
@@ -97,7 +183,7 @@ class CommunicationHandler(object):
 
         return exception_code
 
-    def open_pipe(self, pipe_name=None, num_allowed_instances=1):
+    def open_pipe(self, pipe_name=None, num_allowed_instances=1, timeout=None, abort=None):
         if pipe_name is None:
             pipe_name = CommunicationHandler.RLGYM_GLOBAL_PIPE_NAME
 
@@ -106,62 +192,38 @@ class CommunicationHandler(object):
 
         self._connected = False
 
-        pool = ThreadPool(processes=1)
-        pool.apply_async(CommunicationHandler.handle_diemwin_potential, args=[self.is_connected])
-
-        # win32pipe.PIPE_UNLIMITED_INSTANCES
-        self._pipe = win32pipe.CreateNamedPipe(pipe_name,
-                                               win32pipe.PIPE_ACCESS_DUPLEX | win32file.FILE_FLAG_OVERLAPPED,
-
-                                               win32pipe.PIPE_TYPE_MESSAGE |
-                                               win32pipe.PIPE_READMODE_MESSAGE |
-                                               win32pipe.PIPE_WAIT,
+        if abort is None:
+            self.transport.open(pipe_name, num_allowed_instances, timeout)
+        else:
+            self.transport.open(pipe_name, num_allowed_instances, timeout, abort=abort)
 
-                                               num_allowed_instances,
+        self._current_pipe_name = pipe_name
+        self._connected = True
 
-                                               CommunicationHandler.RLGYM_DEFAULT_PIPE_SIZE,
-                                               CommunicationHandler.RLGYM_DEFAULT_PIPE_SIZE, 0, None)
+    def connect_pipe(self, pipe_name):
+        """
+        Connects to a pipe opened by another CommunicationHandler, this is the game side of the connection.
+        """
+        if self.is_connected():
+            self.close_pipe()
 
-        win32pipe.ConnectNamedPipe(self._pipe)
+        self.transport.connect(pipe_name)
 
         self._current_pipe_name = pipe_name
         self._connected = True
 
-        pool.terminate()
-        pool.join()
-
     def close_pipe(self):
         self._connected = False
-        win32file.CloseHandle(self._pipe)
+        # The last message body may still point into the transport's buffers.
+        self.message = Message()
+        self.transport.close()
 
     def is_connected(self):
         return self._connected
 
+    def format_address(self, pipe_id):
+        return self.transport.format_address(pipe_id)
+
     @staticmethod
     def format_pipe_id(pipe_id):
         return r"\\.\pipe\{}".format(pipe_id)
-
-    @staticmethod
-    def handle_diemwin_potential(connected):
-        import time
-        import pywinauto
-
-        # Windows Direct Input Emulator (DIEmWin) spawns a window sometimes, so we delete it here.
-        while not connected():
-            try:
-                app = pywinauto.Application().connect(title='DIEmWin', visible_only=True)
-                if app.is_process_running():
-                    app.window(title='DIEmWin', visible_only=True).close()
-                    print("DIEmWin detector successfully closed window")
-                    return
-            except:
-                time.sleep(2)
-
-        try:
-            app = pywinauto.Application().connect(title='DIEmWin', visible_only=True)
-            if app.is_process_running():
-                app.window(title='DIEmWin', visible_only=True).close()
-                print("DIEmWin detector successfully closed window")
-                return
-        except:
-            pass
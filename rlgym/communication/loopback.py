@@ -0,0 +1,72 @@
+"""
+A minimal stand-in for the Bakkesmod plugin that answers every reset and action message with the same state packet.
+It is meant to measure the Python side of the connection (transport, framing, decoding) without running the game.
+"""
+
+import time
+from typing import List
+
+from rlgym.communication import CommunicationHandler, Message, TransportType
+
+
+def run_loopback_game(address: str, state_floats: List[float], transport: str = TransportType.UNIX_SOCKET,
+                      protocol: int = Message.RLGYM_PROTOCOL_V1, connect_timeout: float = 10):
+    """
+    Connects to an RLGym instance listening on `address` and serves `state_floats` until the connection is closed.
+
+    :param address: The address RLGym is listening on, as returned by `CommunicationHandler.format_address`.
+    :param state_floats: The state packet sent after every reset and action message.
+    :param transport: The transport type RLGym was created with.
+    :param protocol: The message protocol RLGym was created with.
+    :param connect_timeout: How long to keep retrying the connection while RLGym is not listening yet.
+    """
+    comm_handler = CommunicationHandler(transport=transport, protocol=protocol)
+
+    deadline = time.time() + connect_timeout
+    while True:
+        try:
+            comm_handler.connect_pipe(address)
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.time() > deadline:
+                raise
+            time.sleep(0.01)
+
+    reply_to = (Message.RLGYM_RESET_GAME_STATE_MESSAGE_HEADER,
+                Message.RLGYM_AGENT_ACTION_IMMEDIATE_RESPONSE_MESSAGE_HEADER)
+    while True:
+        message, exception = comm_handler.receive_message(num_attempts=1)
+        if exception is not None:
+            break
+
+        if message.header in reply_to:
+            if comm_handler.send_message(header=Message.RLGYM_STATE_MESSAGE_HEADER, body=state_floats) is not None:
+                break
+
+    comm_handler.close_pipe()
+
+
+def _synthetic_state_packet(num_players: int) -> List[float]:
+    from rlgym.utils.gamestates import GameState
+
+    packet = [0.0] * (3 + GameState.BOOST_PADS_LENGTH + GameState.BALL_STATE_LENGTH)
+    for i in range(num_players):
+        player = [0.0] * GameState.PLAYER_INFO_LENGTH
+        player[0], player[1] = i + 1, i % 2
+        # Identity quaternion for the car and its inverted copy.
+        player[5] = player[5 + GameState.PLAYER_CAR_STATE_LENGTH] = 1.0
+        packet += player
+    return packet
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a constant state packet to an RLGym instance.")
+    parser.add_argument("address")
+    parser.add_argument("--transport", default=TransportType.UNIX_SOCKET)
+    parser.add_argument("--protocol", type=int, default=Message.RLGYM_PROTOCOL_V1)
+    parser.add_argument("--players", type=int, default=2)
+    args = parser.parse_args()
+
+    run_loopback_game(args.address, _synthetic_state_packet(args.players), args.transport, args.protocol)
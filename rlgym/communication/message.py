@@ -1,3 +1,9 @@
+from array import array
+from struct import Struct
+
+from numpy import frombuffer, asarray, float32, ndarray
+
+
 class Message(object):
     RLGYM_HEADER_END_TOKEN                               = [13771, 83712, 83770]
     RLGYM_BODY_END_TOKEN                                 = [82772, 83273, 83774]
@@ -12,6 +18,26 @@ class Message(object):
     RLGYM_LAST_BOT_INPUT_MESSAGE_HEADER                  = [11781, 83782, 83983]
     RLGYM_RESET_TO_SPECIFIC_GAME_STATE_MESSAGE_HEADER    = [12782, 83783, 80784]
 
+    # Protocol v1 wraps every message in the float tokens above, v2 prefixes it with a fixed size binary header instead.
+    RLGYM_PROTOCOL_V1 = 1
+    RLGYM_PROTOCOL_V2 = 2
+
+    # magic, message type, payload length (in floats), sequence number
+    RLGYM_V2_HEADER = Struct('<4I')
+    RLGYM_V2_HEADER_SIZE = RLGYM_V2_HEADER.size
+    RLGYM_V2_MAGIC = 0x32475952  # "RYG2" in little endian, can't collide with the float tokens of a v1 header
+
+    # The index of each header in this list is its message type in protocol v2.
+    RLGYM_MESSAGE_TYPES = [RLGYM_NULL_MESSAGE_HEADER,
+                           RLGYM_CONFIG_MESSAGE_HEADER,
+                           RLGYM_STATE_MESSAGE_HEADER,
+                           RLGYM_AGENT_ACTION_MESSAGE_HEADER,
+                           RLGYM_RESET_GAME_STATE_MESSAGE_HEADER,
+                           RLGYM_AGENT_ACTION_IMMEDIATE_RESPONSE_MESSAGE_HEADER,
+                           RLGYM_REQUEST_LAST_BOT_INPUT_MESSAGE_HEADER,
+                           RLGYM_LAST_BOT_INPUT_MESSAGE_HEADER,
+                           RLGYM_RESET_TO_SPECIFIC_GAME_STATE_MESSAGE_HEADER]
+
     @staticmethod
     def deserialize_header(message_floats):
         assert type(message_floats) in (list, tuple), "!ATTEMPTED TO DECODE MESSAGE HEADER FROM NON-LIST TYPE! []".format(type(message_floats))
@@ -37,7 +63,13 @@ class Message(object):
                 return i
         return None
 
-    def __init__(self, header=None, body=None):
+    @staticmethod
+    def deserialize_binary_header(message_bytes):
+        magic, message_type, _, _ = Message.RLGYM_V2_HEADER.unpack_from(message_bytes)
+        assert magic == Message.RLGYM_V2_MAGIC, "!ATTEMPTED TO DECODE V2 MESSAGE WITH INVALID MAGIC! {}".format(magic)
+        return Message.RLGYM_MESSAGE_TYPES[message_type]
+
+    def __init__(self, header=None, body=None, sequence=0):
         if header is None:
             header = Message.RLGYM_NULL_MESSAGE_HEADER
         if body is None:
@@ -45,10 +77,22 @@ class Message(object):
 
         self.body = body
         self.header = header
+        self.sequence = sequence
 
     def serialize(self):
         return self.header + Message.RLGYM_HEADER_END_TOKEN + self.body + Message.RLGYM_BODY_END_TOKEN
 
+    def serialize_bytes(self) -> bytes:
+        """
+        Encodes a protocol v1 message as float32 bytes. A float32 array body, like the formatted actions, is written as
+        is instead of going through a list of floats.
+        """
+        if isinstance(self.body, ndarray):
+            return b''.join((array("f", self.header + Message.RLGYM_HEADER_END_TOKEN).tobytes(),
+                             asarray(self.body, dtype=float32).tobytes(), _BODY_END_BYTES))
+
+        return array("f", self.serialize()).tobytes()
+
     def deserialize(self, message_floats):
         assert type(message_floats) == list, "!ATTEMPTED TO DECODE MESSAGE HEADER FROM NON-LIST TYPE! []".format(type(message_floats))
         m = message_floats
@@ -64,3 +108,23 @@ class Message(object):
         self.body = body
         self.header = header
 
+    def serialize_binary(self):
+        body = asarray(self.body, dtype=float32)
+        header = Message.RLGYM_V2_HEADER.pack(Message.RLGYM_V2_MAGIC, _MESSAGE_TYPE_IDS[tuple(self.header)],
+                                              body.size, self.sequence)
+        return header + body.tobytes()
+
+    def deserialize_binary(self, message_bytes):
+        """
+        Decodes a protocol v2 message. The body is a float32 view into message_bytes, nothing is copied or scanned.
+        """
+        magic, message_type, length, sequence = Message.RLGYM_V2_HEADER.unpack_from(message_bytes)
+        assert magic == Message.RLGYM_V2_MAGIC, "!ATTEMPTED TO DECODE V2 MESSAGE WITH INVALID MAGIC! {}".format(magic)
+
+        self.header = Message.RLGYM_MESSAGE_TYPES[message_type]
+        self.body = frombuffer(message_bytes, dtype=float32, count=length, offset=Message.RLGYM_V2_HEADER_SIZE)
+        self.sequence = sequence
+
+
+_MESSAGE_TYPE_IDS = {tuple(header): i for i, header in enumerate(Message.RLGYM_MESSAGE_TYPES)}
+_BODY_END_BYTES = array("f", Message.RLGYM_BODY_END_TOKEN).tobytes()
@@ -0,0 +1,135 @@
+"""
+Windows named pipe transport, this is what the Bakkesmod plugin connects to.
+"""
+
+import time
+from multiprocessing.pool import ThreadPool
+
+import win32file
+import win32pipe
+
+from rlgym.communication.transport import Transport, OPEN_POLL_INTERVAL
+
+
+class NamedPipeTransport(Transport):
+    RLGYM_DEFAULT_PIPE_SIZE = 1400
+
+    def __init__(self):
+        self._pipe = None
+        self._connected = False
+
+    def open(self, address: str, num_allowed_instances: int = 1, timeout: float = None, abort=None):
+        self._connected = False
+
+        pool = ThreadPool(processes=1)
+        pool.apply_async(NamedPipeTransport.handle_diemwin_potential, args=[self.is_connected])
+
+        # win32pipe.PIPE_UNLIMITED_INSTANCES
+        self._pipe = win32pipe.CreateNamedPipe(address,
+                                               win32pipe.PIPE_ACCESS_DUPLEX | win32file.FILE_FLAG_OVERLAPPED,
+
+                                               win32pipe.PIPE_TYPE_MESSAGE |
+                                               win32pipe.PIPE_READMODE_MESSAGE |
+                                               win32pipe.PIPE_WAIT,
+
+                                               num_allowed_instances,
+
+                                               NamedPipeTransport.RLGYM_DEFAULT_PIPE_SIZE,
+                                               NamedPipeTransport.RLGYM_DEFAULT_PIPE_SIZE, 0, None)
+
+        try:
+            if timeout is None and abort is None:
+                win32pipe.ConnectNamedPipe(self._pipe)
+            else:
+                self._connect_with_timeout(address, timeout, abort)
+            self._connected = True
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _connect_with_timeout(self, address: str, timeout: float, abort=None):
+        import pywintypes
+        import win32event
+        import winerror
+
+        # The pipe is created with FILE_FLAG_OVERLAPPED, so the wait for the client can be bounded by an event.
+        overlapped = pywintypes.OVERLAPPED()
+        overlapped.hEvent = win32event.CreateEvent(None, True, False, None)
+        if win32pipe.ConnectNamedPipe(self._pipe, overlapped) != winerror.ERROR_IO_PENDING:
+            return
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            # Woken up regularly to check the abort event.
+            wait = OPEN_POLL_INTERVAL if abort is not None else None
+            if deadline is not None:
+                remaining = max(deadline - time.monotonic(), 0)
+                wait = remaining if wait is None else min(wait, remaining)
+            wait_ms = win32event.INFINITE if wait is None else int(wait * 1000)
+            if win32event.WaitForSingleObject(overlapped.hEvent, wait_ms) == win32event.WAIT_OBJECT_0:
+                return
+
+            if abort is not None and abort.is_set():
+                error = ConnectionAbortedError("Stopped waiting for a client on {}".format(address))
+            elif deadline is not None and time.monotonic() >= deadline:
+                error = TimeoutError("No client connected to {} within {} seconds".format(address, timeout))
+            else:
+                continue
+            win32file.CancelIo(self._pipe)
+            win32file.CloseHandle(self._pipe)
+            raise error
+
+    def connect(self, address: str):
+        self._pipe = win32file.CreateFile(address,
+                                          win32file.GENERIC_READ | win32file.GENERIC_WRITE,
+                                          0, None, win32file.OPEN_EXISTING, 0, None)
+        win32pipe.SetNamedPipeHandleState(self._pipe, win32pipe.PIPE_READMODE_MESSAGE, None, None)
+        self._connected = True
+
+    def send(self, data: bytes):
+        win32file.WriteFile(self._pipe, data)
+
+    def receive(self) -> bytes:
+        code, msg_bytes = win32file.ReadFile(self._pipe, NamedPipeTransport.RLGYM_DEFAULT_PIPE_SIZE)
+        return msg_bytes
+
+    def peek(self) -> bool:
+        # Peek the next message in the pipe to see if we've reached the end of new messages.
+        data = win32pipe.PeekNamedPipe(self._pipe, NamedPipeTransport.RLGYM_DEFAULT_PIPE_SIZE)
+        return data[0] != b''
+
+    def close(self):
+        self._connected = False
+        win32file.CloseHandle(self._pipe)
+
+    def is_connected(self):
+        return self._connected
+
+    @staticmethod
+    def format_address(pipe_id) -> str:
+        return r"\\.\pipe\{}".format(pipe_id)
+
+    @staticmethod
+    def handle_diemwin_potential(connected):
+        import time
+        import pywinauto
+
+        # Windows Direct Input Emulator (DIEmWin) spawns a window sometimes, so we delete it here.
+        while not connected():
+            try:
+                app = pywinauto.Application().connect(title='DIEmWin', visible_only=True)
+                if app.is_process_running():
+                    app.window(title='DIEmWin', visible_only=True).close()
+                    print("DIEmWin detector successfully closed window")
+                    return
+            except:
+                time.sleep(2)
+
+        try:
+            app = pywinauto.Application().connect(title='DIEmWin', visible_only=True)
+            if app.is_process_running():
+                app.window(title='DIEmWin', visible_only=True).close()
+                print("DIEmWin detector successfully closed window")
+                return
+        except:
+            pass
@@ -0,0 +1,270 @@
+"""
+Shared memory transport. Each direction is a single producer / single consumer ring of fixed size slots inside one
+`multiprocessing.shared_memory` segment, so a message is written once by the sender and read in place by the receiver.
+Waiting is done with a futex on the ring counters on Linux, and with a polling backoff everywhere else.
+
+The ring counters are published with plain stores and no memory fences, which is only correct under the total store
+order of x86 CPUs. On weakly ordered CPUs like ARM the reader could see a new count before the message itself, so the
+transport refuses to run there.
+"""
+
+import ctypes
+import os
+import platform
+import time
+from multiprocessing import shared_memory
+
+from rlgym.communication.transport import Transport
+
+# The CPUs whose memory ordering makes the plain stores of the ring safe, with their futex syscall numbers.
+_FUTEX_SYSCALLS = {'x86_64': 202, 'amd64': 202, 'i386': 240, 'i686': 240}
+_FUTEX_WAIT = 0
+_FUTEX_WAKE = 1
+
+_WAITING, _CONNECTED, _CLOSED = 0, 1, 2
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class _Doorbell(object):
+    """
+    Sleeps until a 32 bit counter in shared memory changes. Waits always time out after a short while so a missed wake
+    up can only ever cost `timeout` seconds, never a deadlock.
+    """
+    # Spinning before sleeping only pays off when the other process can run at the same time.
+    SPIN_COUNT = 100 if (os.cpu_count() or 1) > 1 else 0
+
+    def __init__(self, timeout: float = 0.01):
+        self._syscall = None
+        self._timeout = _Timespec(int(timeout), int((timeout % 1) * 1e9))
+        self._poll_interval = timeout / 100
+
+        if platform.system() == 'Linux' and platform.machine().lower() in _FUTEX_SYSCALLS:
+            try:
+                self._syscall = ctypes.CDLL(None, use_errno=True).syscall
+                self._syscall_nr = _FUTEX_SYSCALLS[platform.machine().lower()]
+            except (OSError, AttributeError):
+                self._syscall = None
+
+    def wait(self, counters: memoryview, index: int, address: int, expected: int):
+        """
+        Blocks for at most one timeout period while counters[index] == expected.
+        """
+        for _ in range(self.SPIN_COUNT):
+            if counters[index] != expected:
+                return
+
+        if self._syscall is not None:
+            self._syscall(self._syscall_nr, ctypes.c_void_p(address), _FUTEX_WAIT, ctypes.c_uint32(expected),
+                          ctypes.byref(self._timeout), None, 0)
+        else:
+            time.sleep(self._poll_interval)
+
+    def wake(self, address: int):
+        if self._syscall is not None:
+            self._syscall(self._syscall_nr, ctypes.c_void_p(address), _FUTEX_WAKE, 0x7fffffff, None, None, 0)
+
+
+class _Ring(object):
+    # write count, read count, reader waiting, writer waiting
+    HEADER_SIZE = 16
+
+    def __init__(self, buf: memoryview, base_address: int, offset: int, slot_count: int, slot_size: int):
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.counters = buf[offset:offset + _Ring.HEADER_SIZE].cast('I')
+        self.write_address = base_address + offset
+        self.read_address = base_address + offset + 4
+
+        slots_offset = offset + _Ring.HEADER_SIZE
+        self.lengths = buf[slots_offset:slots_offset + 4 * slot_count].cast('I')
+        payload_offset = slots_offset + 4 * slot_count
+        self.payloads = [buf[payload_offset + i * slot_size:payload_offset + (i + 1) * slot_size]
+                         for i in range(slot_count)]
+
+    @staticmethod
+    def size(slot_count: int, slot_size: int) -> int:
+        return _Ring.HEADER_SIZE + 4 * slot_count + slot_count * slot_size
+
+    def release(self):
+        self.lengths = None
+        self.counters = None
+        self.payloads = []
+
+
+class SharedMemoryTransport(Transport):
+    RLGYM_DEFAULT_SLOT_COUNT = 8
+    RLGYM_DEFAULT_SLOT_SIZE = 4096
+    RLGYM_STATE_HEADER_SIZE = 64
+
+    def __init__(self, slot_count: int = RLGYM_DEFAULT_SLOT_COUNT, slot_size: int = RLGYM_DEFAULT_SLOT_SIZE,
+                 timeout: float = 0.01):
+        """
+        :param slot_count: Number of messages each direction can hold before the sender blocks.
+        :param slot_size: Maximum size of a single message in bytes, must be a multiple of 8.
+        :param timeout: Upper bound on how long a wait can sleep before the counters are checked again.
+        """
+        assert slot_size % 8 == 0, "slot_size must be a multiple of 8"
+        if platform.machine().lower() not in _FUTEX_SYSCALLS:
+            raise OSError("The shared memory transport needs an x86 CPU, its ring buffers have no memory fences for {}."
+                          " Use TransportType.UNIX_SOCKET instead.".format(platform.machine()))
+        self._slot_count = slot_count
+        self._slot_size = slot_size
+        self._doorbell = _Doorbell(timeout)
+
+        self._shm = None
+        self._owner = False
+        self._state = None
+        self._state_address = None
+        self._tx = None
+        self._rx = None
+        self._holding_slot = False
+
+    def open(self, address: str, num_allowed_instances: int = 1, timeout: float = None, abort=None):
+        size = SharedMemoryTransport.RLGYM_STATE_HEADER_SIZE + 2 * _Ring.size(self._slot_count, self._slot_size)
+        try:
+            self._shm = shared_memory.SharedMemory(name=address, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a crashed process.
+            stale = shared_memory.SharedMemory(name=address)
+            stale.close()
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(name=address, create=True, size=size)
+
+        # A new segment is already zeroed, writing to it here could overwrite a client that was quick to connect.
+        self._owner = True
+        self._map(tx_ring=0, rx_ring=1)
+
+        # Like ConnectNamedPipe, block until the other side is there.
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self._state[0] == _WAITING:
+            if deadline is not None and time.monotonic() > deadline:
+                self.close()
+                raise TimeoutError("No client connected to {} within {} seconds".format(address, timeout))
+            if abort is not None and abort.is_set():
+                self.close()
+                raise ConnectionAbortedError("Stopped waiting for a client on {}".format(address))
+            self._doorbell.wait(self._state, 0, self._state_address, _WAITING)
+
+    def connect(self, address: str):
+        try:
+            self._shm = shared_memory.SharedMemory(name=address, track=False)
+        except TypeError:
+            # Python < 3.13 always tracks the segment and would unlink it when this process exits.
+            from multiprocessing import resource_tracker
+            self._shm = shared_memory.SharedMemory(name=address)
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        self._owner = False
+        self._map(tx_ring=1, rx_ring=0)
+        self._state[0] = _CONNECTED
+        self._doorbell.wake(self._state_address)
+
+    def _map(self, tx_ring: int, rx_ring: int):
+        buf = self._shm.buf
+        anchor = ctypes.c_char.from_buffer(buf)
+        base_address = ctypes.addressof(anchor)
+        del anchor
+
+        self._state = buf[:4].cast('I')
+        self._state_address = base_address
+
+        ring_size = _Ring.size(self._slot_count, self._slot_size)
+        offsets = [SharedMemoryTransport.RLGYM_STATE_HEADER_SIZE + i * ring_size for i in range(2)]
+        self._tx = _Ring(buf, base_address, offsets[tx_ring], self._slot_count, self._slot_size)
+        self._rx = _Ring(buf, base_address, offsets[rx_ring], self._slot_count, self._slot_size)
+        self._holding_slot = False
+
+    def send(self, data: bytes):
+        ring = self._tx
+        counters = ring.counters
+        length = len(data)
+        if length > ring.slot_size:
+            raise ValueError("Message of {} bytes does not fit in a {} byte slot".format(length, ring.slot_size))
+
+        write_count = counters[0]
+        while (write_count - counters[1]) & 0xffffffff >= ring.slot_count:
+            if self._state[0] == _CLOSED:
+                raise EOFError("The shared memory transport has been closed by the other side.")
+            counters[3] = 1
+            self._doorbell.wait(counters, 1, ring.read_address, counters[1])
+        counters[3] = 0
+
+        slot = write_count % ring.slot_count
+        ring.payloads[slot][:length] = data
+        ring.lengths[slot] = length
+
+        # Publish the message only once the payload is written, x86 does not reorder these stores.
+        counters[0] = (write_count + 1) & 0xffffffff
+        if counters[2]:
+            self._doorbell.wake(ring.write_address)
+
+    def receive(self) -> memoryview:
+        """
+        Returns a view of the message inside the ring, it is only valid until the next call to `receive`.
+        """
+        ring = self._rx
+        counters = ring.counters
+        self._release_slot()
+
+        read_count = counters[1]
+        while counters[0] == read_count:
+            if self._state[0] == _CLOSED:
+                raise EOFError("The shared memory transport has been closed by the other side.")
+            counters[2] = 1
+            self._doorbell.wait(counters, 0, ring.write_address, read_count)
+        counters[2] = 0
+
+        slot = read_count % ring.slot_count
+        self._holding_slot = True
+        return ring.payloads[slot][:ring.lengths[slot]]
+
+    def _release_slot(self):
+        if self._holding_slot:
+            ring = self._rx
+            ring.counters[1] = (ring.counters[1] + 1) & 0xffffffff
+            self._holding_slot = False
+            if ring.counters[3]:
+                self._doorbell.wake(ring.read_address)
+
+    def peek(self) -> bool:
+        counters = self._rx.counters
+        pending = (counters[0] - counters[1]) & 0xffffffff
+        return pending > (1 if self._holding_slot else 0)
+
+    def interrupt(self):
+        # A killed game never marks the segment as closed, so the waits would go on forever.
+        state, rx, tx = self._state, self._rx, self._tx
+        if state is not None:
+            state[0] = _CLOSED
+            self._doorbell.wake(self._state_address)
+            self._doorbell.wake(rx.write_address)
+            self._doorbell.wake(tx.read_address)
+
+    def close(self):
+        if self._shm is None:
+            return
+
+        self._state[0] = _CLOSED
+        self._doorbell.wake(self._state_address)
+        self._doorbell.wake(self._rx.write_address)
+        self._doorbell.wake(self._tx.read_address)
+
+        self._tx.release()
+        self._rx.release()
+        self._tx, self._rx, self._state = None, None, None
+
+        shm, self._shm = self._shm, None
+        try:
+            shm.close()
+        except BufferError:
+            print("Shared memory {} stays mapped, a message body returned by receive() is still referenced. Copy "
+                  "bodies that are kept past the next receive.".format(shm.name))
+        if self._owner:
+            shm.unlink()
+
+    @staticmethod
+    def format_address(pipe_id) -> str:
+        return "rlgym_{}".format(pipe_id)
@@ -0,0 +1,118 @@
+"""
+The transport layer used by the CommunicationHandler to exchange raw message bytes with the game.
+"""
+
+from abc import ABC, abstractmethod
+
+# How often a blocked `open` checks its abort event, in seconds.
+OPEN_POLL_INTERVAL = 0.1
+
+
+class TransportType:
+    NAMED_PIPE = 'named_pipe'
+    UNIX_SOCKET = 'unix_socket'
+    SHARED_MEMORY = 'shared_memory'
+
+
+class Transport(ABC):
+    """
+    A message oriented, bidirectional connection to the game. Every call to `send` must arrive as exactly one
+    `receive` on the other side, which is what the Bakkesmod plugin expects from its named pipe.
+    """
+
+    @abstractmethod
+    def open(self, address: str, num_allowed_instances: int = 1, timeout: float = None, abort=None):
+        """
+        Function to create the server side of the connection and block until the game has connected to it.
+
+        :param address: The address to listen on, as returned by `format_address`.
+        :param num_allowed_instances: The amount of clients that are allowed to connect to this address.
+        :param timeout: How long to wait for the game in seconds, forever if None. A TimeoutError is raised when no
+                        client connected in time, the transport is closed again.
+        :param abort: A threading.Event checked every `OPEN_POLL_INTERVAL` seconds while waiting. Once it is set the
+                      transport is closed again and a ConnectionAbortedError raised.
+        """
+        raise NotImplementedError
+
+    def connect(self, address: str):
+        """
+        Function to connect to a transport that was opened by RLGym. This is the side the game uses, it is only needed
+        by local stand-ins for the Bakkesmod plugin.
+
+        :param address: The address RLGym is listening on.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def send(self, data: bytes):
+        """
+        Function to send a single message.
+
+        :param data: The serialized message.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def receive(self) -> bytes:
+        """
+        Function to block until a single message has been received.
+
+        :return: The raw bytes of the message.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def peek(self) -> bool:
+        """
+        Function to check if there is another message waiting to be received, without blocking or consuming it.
+
+        :return: True if a call to `receive` would return immediately.
+        """
+        raise NotImplementedError
+
+    def interrupt(self):
+        """
+        Function to make a `receive` or `send` that is blocked in another thread fail, when the game is known to be
+        dead or stuck. Transports that notice a dead game by themselves do not need it.
+        """
+        pass
+
+    @abstractmethod
+    def close(self):
+        """
+        Function to close the connection and release any resources held by the transport.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    @abstractmethod
+    def format_address(pipe_id) -> str:
+        """
+        Function to convert an RLGym pipe id into an address this transport can open.
+
+        :param pipe_id: The unique id of the environment, usually the process id.
+        """
+        raise NotImplementedError
+
+
+def get_transport(transport_type: str = TransportType.NAMED_PIPE) -> Transport:
+    """
+    Builds a transport object from one of the `TransportType` values. The platform specific modules are imported here
+    so only the selected transport has to be importable on the current OS.
+    """
+    if isinstance(transport_type, Transport):
+        return transport_type
+
+    if transport_type == TransportType.NAMED_PIPE:
+        from rlgym.communication.named_pipe_transport import NamedPipeTransport
+        return NamedPipeTransport()
+
+    if transport_type == TransportType.UNIX_SOCKET:
+        from rlgym.communication.unix_socket_transport import UnixSocketTransport
+        return UnixSocketTransport()
+
+    if transport_type == TransportType.SHARED_MEMORY:
+        from rlgym.communication.shared_memory_transport import SharedMemoryTransport
+        return SharedMemoryTransport()
+
+    raise ValueError('{} is not a valid transport type'.format(transport_type))
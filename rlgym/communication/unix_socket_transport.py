@@ -0,0 +1,88 @@
+"""
+Unix domain socket transport. SOCK_SEQPACKET keeps message boundaries intact, so it behaves like the message mode named
+pipe used on Windows and can be served by a local stand-in for the Bakkesmod plugin.
+"""
+
+import os
+import socket
+import tempfile
+import time
+
+from rlgym.communication.transport import Transport, OPEN_POLL_INTERVAL
+
+
+class UnixSocketTransport(Transport):
+    RLGYM_DEFAULT_BUFFER_SIZE = 4096
+
+    def __init__(self, buffer_size: int = RLGYM_DEFAULT_BUFFER_SIZE):
+        self._buffer_size = buffer_size
+        self._server = None
+        self._socket = None
+        self._address = None
+
+    def open(self, address: str, num_allowed_instances: int = 1, timeout: float = None, abort=None):
+        # A socket file left behind by a crashed process would make bind() fail.
+        if os.path.exists(address):
+            os.remove(address)
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self._server.bind(address)
+        self._server.listen(num_allowed_instances)
+        self._address = address
+
+        # Woken up regularly to check the abort event.
+        self._server.settimeout(timeout if abort is None else OPEN_POLL_INTERVAL)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self._socket is None:
+            try:
+                self._socket, _ = self._server.accept()
+            except socket.timeout:
+                if abort is not None and abort.is_set():
+                    self.close()
+                    raise ConnectionAbortedError("Stopped waiting for a client on {}".format(address))
+                if deadline is not None and time.monotonic() >= deadline:
+                    self.close()
+                    raise TimeoutError("No client connected to {} within {} seconds".format(address, timeout))
+        self._socket.settimeout(None)
+
+    def connect(self, address: str):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self._socket.connect(address)
+
+    def send(self, data: bytes):
+        self._socket.send(data)
+
+    def receive(self) -> bytes:
+        msg_bytes = self._socket.recv(self._buffer_size)
+        if not msg_bytes:
+            raise EOFError("The socket has been closed by the other side.")
+        return msg_bytes
+
+    def peek(self) -> bool:
+        try:
+            return len(self._socket.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT)) > 0
+        except BlockingIOError:
+            return False
+
+    def interrupt(self):
+        sock = self._socket
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            if os.path.exists(self._address):
+                os.remove(self._address)
+
+    @staticmethod
+    def format_address(pipe_id) -> str:
+        return os.path.join(tempfile.gettempdir(), "rlgym_{}.sock".format(pipe_id))
@@ -2,23 +2,28 @@
 The Match object.
 """
 
-from typing import List, Union, Any
+from typing import List, Union, Any, Optional, Dict
 
 # import gym.spaces
 from gym.spaces import Box
 # import numpy as np
-from numpy import zeros, ndarray, copy, inf, shape
+from numpy import zeros, ndarray, copy, inf, shape, float32
 
 from rlgym.envs.environment import Environment
 # from rlgym.utils.state_setters.wrappers.state_wrapper import StateWrapper
 from rlgym.utils import common_values
-from rlgym.utils.gamestates import GameState
+from rlgym.utils.gamestates import GameState, ArrayGameState
+from rlgym.utils.obs_builders import ObsBuilder
+from rlgym.utils.reward_functions import RewardFunction, CombinedReward
+from rlgym.utils.batching import overrides_batch
 
 
 class Match(Environment):
     __slots__ = ["_game_speed", "_gravity", "_boost_consumption", "_team_size", "_spawn_opponents", "_tick_skip",
                  "_reward_fn", "_terminal_conditions", "_obs_builder", "_action_parser", "_state_setter", "agents",
-                 "observation_space", "action_space", "_prev_actions", "_spectator_ids", "last_touch", "_initial_score"]
+                 "observation_space", "action_space", "_prev_actions", "_spectator_ids", "last_touch", "_initial_score",
+                 "_game_state_class", "_batch_obs", "_batch_rewards", "_records_breakdown", "_action_buffer",
+                 "_state_pool", "_state_pool_index", "_profiler"]
 
     def __init__(self,
                  reward_function,
@@ -31,7 +36,16 @@ class Match(Environment):
                  game_speed=100,
                  gravity=1,
                  boost_consumption=1,
-                 spawn_opponents=False):
+                 spawn_opponents=False,
+                 game_state_class=GameState,
+                 reuse_game_states=False):
+        """
+        :param game_state_class: The class states are decoded into, GameState or a drop in replacement like
+                                 rlgym.utils.gamestates.ArrayGameState.
+        :param reuse_game_states: Decode the states in place into two preallocated states used in turn, instead of a new
+                                  state per step. A state returned by `parse_state` is then only valid until the next
+                                  but one call, use `GameState.copy()` to keep it longer.
+        """
         super().__init__()
 
         self._game_speed = game_speed
@@ -45,6 +59,22 @@ class Match(Environment):
         self._obs_builder = obs_builder
         self._action_parser = action_parser
         self._state_setter = state_setter
+        self._game_state_class = game_state_class
+        # Two states, so the previous state Gym keeps is not overwritten by the current one.
+        self._state_pool = (game_state_class(), game_state_class()) if reuse_game_states else None
+        self._state_pool_index = 0
+        self._profiler = None
+        self._batch_obs = overrides_batch(obs_builder, ObsBuilder, "build_obs_batch", "build_obs")
+        self._batch_rewards = overrides_batch(reward_function, RewardFunction, "get_rewards_batch", "get_reward",
+                                              "get_final_reward")
+        # The breakdown is recorded by the CombinedReward methods Match calls, a subclass that replaces them has none.
+        if self._batch_rewards and issubclass(game_state_class, ArrayGameState):
+            reward_methods = ("get_rewards_batch",)
+        else:
+            reward_methods = ("get_reward", "get_final_reward")
+        self._records_breakdown = isinstance(reward_function, CombinedReward) and \
+            reward_function.breakdown_length > 0 and \
+            all(getattr(type(reward_function), name) is getattr(CombinedReward, name) for name in reward_methods)
 
         if type(terminal_conditions) not in (tuple, list):
             self._terminal_conditions = [terminal_conditions, ]
@@ -57,12 +87,16 @@ class Match(Environment):
 
         self._prev_actions = zeros((self.agents, 8), dtype=float)
         self._spectator_ids = None
+        self._action_buffer = None
 
         self.last_touch = None
         self._initial_score = 0
 
     def episode_reset(self, initial_state: GameState):
         self._spectator_ids = [p.car_id for p in initial_state.players]
+        # One row per car, the spectator id followed by the 8 actions, in the float32 layout of the action message.
+        self._action_buffer = zeros((len(self._spectator_ids), 9), dtype=float32)
+        self._action_buffer[:, 0] = self._spectator_ids
         self._prev_actions.fill(0)
         for condition in self._terminal_conditions:
             condition.reset(initial_state)
@@ -72,12 +106,14 @@ class Match(Environment):
         self._initial_score = initial_state.blue_score - initial_state.orange_score
 
     def build_observations(self, state) -> Union[Any, List]:
-        observations = []
-
         self._obs_builder.pre_step(state)
 
-        for i, player in enumerate(state.players):
-            observations.append(self._obs_builder.build_obs(player, state, self._prev_actions[i]))
+        if self._batch_obs:
+            observations = self._obs_builder.build_obs_batch(state, self._prev_actions)
+        else:
+            observations = []
+            for i, player in enumerate(state.players):
+                observations.append(self._obs_builder.build_obs(player, state, self._prev_actions[i]))
 
         # for i in range(len(state.players)):
         #     player = state.players[i]
@@ -95,15 +131,18 @@ class Match(Environment):
         return observations
 
     def get_rewards(self, state: GameState, done) -> Union[float, List]:
-        rewards = []
-
         self._reward_fn.pre_step(state)
 
-        for i, player in enumerate(state.players):
-            if done:
-                rewards.append(self._reward_fn.get_final_reward(player, state, self._prev_actions[i]))
-            else:
-                rewards.append(self._reward_fn.get_reward(player, state, self._prev_actions[i]))
+        # The batched rewards only pay off on array states, converting a GameState for them costs more than the loop.
+        if self._batch_rewards and isinstance(state, ArrayGameState):
+            rewards = self._reward_fn.get_rewards_batch(state, self._prev_actions, done)
+        else:
+            rewards = []
+            for i, player in enumerate(state.players):
+                if done:
+                    rewards.append(self._reward_fn.get_final_reward(player, state, self._prev_actions[i]))
+                else:
+                    rewards.append(self._reward_fn.get_reward(player, state, self._prev_actions[i]))
         # for i in range(len(state.players)):
         #     player = state.players[i]
         #
@@ -120,17 +159,53 @@ class Match(Environment):
         return rewards
 
     def is_done(self, state):
+        if self._profiler is not None:
+            return self._profiled_is_done(state)
+
         for condition in self._terminal_conditions:
             if condition.is_terminal(state):
                 return True
         return False
 
+    def _profiled_is_done(self, state):
+        start = self._profiler.now()
+        for i, condition in enumerate(self._terminal_conditions):
+            terminal = condition.is_terminal(state)
+            start = self._profiler.lap("is_done/{}/{}".format(i, type(condition).__name__), start)
+            if terminal:
+                return True
+        return False
+
+    def set_profiler(self, profiler):
+        """
+        Times the terminal conditions one by one, and the components of the reward function when it is a
+        CombinedReward, with a rlgym.utils.step_profiler.StepProfiler. Gym calls this with its own profiler.
+        """
+        self._profiler = profiler
+        if isinstance(self._reward_fn, CombinedReward):
+            self._reward_fn.profiler = profiler
+
     def get_result(self, state: GameState):
         current_score = state.blue_score - state.orange_score
         return current_score - self._initial_score
 
+    def get_reward_breakdown(self) -> Optional[Dict[str, Any]]:
+        """
+        The per reward function breakdown of the episode rewards, when the reward function is a CombinedReward that
+        records it, otherwise None. See `CombinedReward.get_breakdown`.
+        """
+        if self._records_breakdown:
+            return self._reward_fn.get_breakdown()
+        return None
+
     def parse_state(self, state_str: List[float]) -> GameState:
-        state = GameState(state_str)
+        if self._state_pool is not None:
+            state = self._state_pool[self._state_pool_index]
+            self._state_pool_index ^= 1
+            state.decode(state_str)
+            return state
+
+        state = self._game_state_class(state_str)
         return state
 
     def parse_actions(self, actions: Any, state: GameState) -> ndarray:
@@ -139,17 +214,17 @@ class Match(Environment):
             actions = copy(actions)
         return self._action_parser.parse_actions(actions, state)
 
-    def format_actions(self, actions: ndarray):
-        self._prev_actions[:len(actions)] = actions[:]
-
-        acts = []
-        # print(self._spectator_ids)
-        for i in range(len(actions)):
-            acts.append(float(self._spectator_ids[i]))
-            for act in actions[i]:
-                acts.append(float(act))
-
-        return acts
+    def format_actions(self, actions: ndarray) -> ndarray:
+        """
+        Formats the actions for the action message, as a flat float32 array with the spectator id of each car before its
+        actions. The array is reused by the next call.
+        """
+        num_actions = len(actions)
+        self._prev_actions[:num_actions] = actions
+
+        acts = self._action_buffer[:num_actions]
+        acts[:, 1:] = actions
+        return acts.reshape(-1)
 
     def get_reset_state(self) -> list:
         new_state = self._state_setter.build_wrapper(self._team_size, self._spawn_opponents)
@@ -1,3 +1,7 @@
 from .launch import launch_rocket_league, run_injector, LaunchPreference
+from .headless_launch import launch_headless_game
+from .instances import GameInstance, launch_instance, launch_instances
+from .supervisor import InstanceSupervisor
+from .pool import InstancePool, get_instance_pool
 from .paging import page_rocket_league
 from .minimize import toggle_rl_windows, toggle_rl_process
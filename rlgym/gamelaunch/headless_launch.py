@@ -0,0 +1,18 @@
+import subprocess
+import sys
+from typing import Sequence
+
+from rlgym.communication import Message, TransportType
+
+
+def launch_headless_game(pipe_name: str, transport: str = TransportType.UNIX_SOCKET,
+                         protocol: int = Message.RLGYM_PROTOCOL_V1, args: Sequence[str] = ()) -> subprocess.Popen:
+    """
+    Launches the headless kinematic game (rlgym.headless) in a new process, it will connect to `pipe_name` by itself.
+    Its stdout only repeats the connection messages of the CommunicationHandler, so it is discarded.
+
+    :param args: Extra command line arguments of rlgym.headless, like the fault injection ones.
+    """
+    return subprocess.Popen([sys.executable, "-m", "rlgym.headless", pipe_name,
+                             "--transport", transport, "--protocol", str(protocol)] + list(args),
+                            stdout=subprocess.DEVNULL)
@@ -0,0 +1,164 @@
+"""
+Launching several games at once, each handed back with an open connection once its plugin has connected.
+"""
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from threading import Event
+from typing import List, Optional, Sequence
+
+from rlgym.communication import CommunicationHandler, Message, TransportType
+from rlgym.gamelaunch.headless_launch import launch_headless_game
+from rlgym.gamelaunch.launch import launch_rocket_league, run_injector, LaunchPreference
+
+
+class GameInstance(object):
+    """
+    A launched game and the CommunicationHandler it is connected to. Pass it to `Gym` to use it instead of launching a
+    new game.
+    """
+
+    def __init__(self, pipe_id, comm_handler: CommunicationHandler, process: Optional[subprocess.Popen] = None,
+                 launch_preference: str = LaunchPreference.EPIC, transport=TransportType.NAMED_PIPE):
+        """
+        :param pipe_id: The id the address of the connection was made from.
+        :param comm_handler: The connected CommunicationHandler.
+        :param process: The game process, when it is known. Steam launches are not.
+        :param launch_preference: How the game was launched.
+        :param transport: The transport the CommunicationHandler was created with.
+        """
+        self.pipe_id = pipe_id
+        self.comm_handler = comm_handler
+        self.process = process
+        self.launch_preference = launch_preference
+        self.transport = transport
+        # When the Gym started waiting for a state, None while it is not waiting. Used by the InstanceSupervisor.
+        self.waiting_since = None
+
+    @property
+    def protocol(self) -> int:
+        return self.comm_handler.protocol
+
+    @property
+    def address(self) -> str:
+        return self.comm_handler.format_address(self.pipe_id)
+
+    def is_alive(self) -> bool:
+        """
+        Whether the connection is open and the game process, when it is known, is still running.
+        """
+        if not self.comm_handler.is_connected():
+            return False
+        return self.process is None or self.process.poll() is None
+
+    def waiting_time(self) -> float:
+        """
+        How long the Gym has been waiting for a state from this game, 0 while it is not waiting.
+        """
+        waiting_since = self.waiting_since
+        return time.monotonic() - waiting_since if waiting_since is not None else 0
+
+    def abort(self):
+        """
+        Kills the game and makes the Gym fail out of a blocked receive, it can be called from any thread. The Gym
+        handles the failure like a crash, `close` still has to be called.
+        """
+        if self.process is not None:
+            self.process.kill()
+        self.comm_handler.transport.interrupt()
+
+    def close(self):
+        """
+        Closes the connection and terminates the game.
+        """
+        self.comm_handler.close_pipe()
+        if self.process is not None:
+            self.process.terminate()
+
+
+def launch_instance(pipe_id, launch_preference: str = LaunchPreference.EPIC, transport=TransportType.NAMED_PIPE,
+                    protocol: int = Message.RLGYM_PROTOCOL_V1, connect_timeout: float = None,
+                    headless_args: Sequence[str] = (), abort: Optional[Event] = None) -> GameInstance:
+    """
+    Launches one game and blocks until its plugin has connected.
+
+    :param pipe_id: The unique id of the instance, the address of the connection is made from it.
+    :param launch_preference: A `LaunchPreference` or the path to RocketLeague.exe.
+    :param transport: A `TransportType` value, see `Gym`.
+    :param protocol: The message protocol, see `Gym`.
+    :param connect_timeout: How long to wait for the plugin in seconds, forever if None. The game is terminated and a
+                            TimeoutError raised when it did not connect in time.
+    :param headless_args: Extra command line arguments of the headless game, see `launch_headless_game`.
+    :param abort: Stops waiting for the plugin once it is set, the game is terminated and a ConnectionAbortedError
+                  raised.
+    :return: The connected instance.
+    """
+    comm_handler = CommunicationHandler(transport=transport, protocol=protocol)
+    address = comm_handler.format_address(pipe_id)
+
+    if launch_preference == LaunchPreference.HEADLESS:
+        process = launch_headless_game(address, transport, protocol, headless_args)
+    else:
+        process = launch_rocket_league(address, launch_preference)
+
+    try:
+        comm_handler.open_pipe(address, timeout=connect_timeout, abort=abort)
+    except BaseException:
+        if process is not None:
+            process.terminate()
+        raise
+    return GameInstance(pipe_id, comm_handler, process, launch_preference, transport)
+
+
+def launch_instances(pipe_ids: Sequence, launch_preference: str = LaunchPreference.EPIC,
+                     transport=TransportType.NAMED_PIPE, protocol: int = Message.RLGYM_PROTOCOL_V1,
+                     max_concurrent_launches: int = 4, use_injector: bool = False, connect_timeout: float = 300,
+                     injector_interval: float = 3) -> List[GameInstance]:
+    """
+    Launches one game per pipe id, up to `max_concurrent_launches` at a time. A game counts as launched as soon as its
+    plugin connects, so the next one starts right away instead of after a fixed delay.
+
+    :param pipe_ids: The unique ids of the instances.
+    :param launch_preference: A `LaunchPreference` or the path to RocketLeague.exe.
+    :param transport: A `TransportType` value, see `Gym`.
+    :param protocol: The message protocol, see `Gym`.
+    :param max_concurrent_launches: How many games may be starting at the same time.
+    :param use_injector: Whether to run RLGym's bakkesmod injector. It is run every `injector_interval` seconds while
+                         some games are not connected yet, first after one interval so the games had time to start,
+                         which injects every game that started in the meantime.
+    :param connect_timeout: How long to wait for the plugin of each game in seconds.
+    :param injector_interval: How often to run the injector.
+    :return: The connected instances, in the order of `pipe_ids`. If any of them failed, the games still waiting for
+             their plugin stop waiting, every other one is closed and the first error is raised.
+    """
+    # Set on the first failure, so the launches in flight do not wait out their connect timeout.
+    abort = Event()
+    error = None
+    with ThreadPoolExecutor(max_workers=max_concurrent_launches) as executor:
+        futures = [executor.submit(launch_instance, pipe_id, launch_preference, transport, protocol, connect_timeout,
+                                   abort=abort)
+                   for pipe_id in pipe_ids]
+
+        pending = set(futures)
+        next_injection = time.monotonic() + injector_interval
+        while pending:
+            timeout = max(next_injection - time.monotonic(), 0) if use_injector and error is None else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if error is None and not future.cancelled() and future.exception() is not None:
+                    error = future.exception()
+                    abort.set()
+                    # No point in starting the games that are still queued.
+                    for queued in pending:
+                        queued.cancel()
+            if use_injector and error is None and time.monotonic() >= next_injection:
+                run_injector()
+                next_injection = time.monotonic() + injector_interval
+
+    if error is not None:
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                future.result().close()
+        raise error
+
+    return [future.result() for future in futures]
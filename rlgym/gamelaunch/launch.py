@@ -26,6 +26,8 @@ class LaunchPreference:
     STEAM = 'steam'
     EPIC = 'epic'
     EPIC_LOGIN_TRICK = EPIC + '_login_trick'
+    # Runs rlgym.headless instead of Rocket League, see Gym.
+    HEADLESS = 'headless'
 
 
 def run_injector():
@@ -1,13 +1,11 @@
-import pywintypes
-import win32gui
-import win32process
-
 # show_codes: 9 to show, 6 to hide
 HIDE = 6
 SHOW = 9
 
 
 def toggle_rl_windows(minimize=True):
+    import win32gui
+
     # Minimize all RL processes
     window_ledger = {}
 
@@ -24,6 +22,10 @@ def toggle_rl_windows(minimize=True):
 
 
 def toggle_rl_process(pid, minimize=True):
+    import pywintypes
+    import win32gui
+    import win32process
+
     # Minimize a single RL process
     window_ledger = {}
 
@@ -0,0 +1,109 @@
+"""
+Connected games kept open between environments, so a new environment only has to send its config to one of them.
+"""
+import atexit
+import itertools
+from threading import Lock
+from typing import List, Optional
+
+from rlgym.gamelaunch.instances import GameInstance
+
+
+class InstancePool(object):
+    """
+    Idle connected games. A Gym created with an `instance_pool` claims a game of the same launch preference, transport
+    and protocol from it instead of launching one, and gives its game back when it is closed. The new Gym only sends
+    its config, so changing the Match costs one message instead of a game boot.
+    """
+
+    def __init__(self, max_idle: int = None):
+        """
+        :param max_idle: How many idle games to keep, the oldest ones are closed first. Unlimited if None.
+        """
+        self.max_idle = max_idle
+        self._idle: List[GameInstance] = []
+        self._lock = Lock()
+        self._pipe_ids = itertools.count()
+
+    def claim(self, launch_preference: str, transport, protocol: int) -> Optional[GameInstance]:
+        """
+        Takes an idle game that was launched with the same arguments.
+
+        :return: The game, or None if there is none.
+        """
+        with self._lock:
+            matching = [instance for instance in self._idle
+                        if (instance.launch_preference, instance.transport, instance.protocol) ==
+                        (launch_preference, transport, protocol)]
+            for instance in matching:
+                self._idle.remove(instance)
+
+        claimed = None
+        for instance in matching:
+            if claimed is None and instance.is_alive():
+                claimed = instance
+            elif claimed is None:
+                instance.close()
+            else:
+                self.put(instance)
+        return claimed
+
+    def put(self, instance: GameInstance):
+        """
+        Gives back a game. Messages it already sent are dropped, a game that is not alive anymore is closed.
+        """
+        if not instance.is_alive():
+            instance.close()
+            return
+
+        try:
+            transport = instance.comm_handler.transport
+            while transport.peek():
+                transport.receive()
+        except BaseException as e:
+            print("Closing RLGym instance {} instead of keeping it, it failed with {}".format(instance.pipe_id, e))
+            instance.close()
+            return
+
+        with self._lock:
+            self._idle.append(instance)
+            if self.max_idle is not None and len(self._idle) > self.max_idle:
+                evicted = self._idle.pop(0)
+            else:
+                evicted = None
+        if evicted is not None:
+            evicted.close()
+
+    def next_pipe_id(self, pipe_id) -> str:
+        """
+        A pipe id derived from `pipe_id` that no game of the pool uses, for launching a new one.
+        """
+        with self._lock:
+            return "{}_p{}".format(pipe_id, next(self._pipe_ids))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def close(self):
+        """
+        Closes every idle game.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for instance in idle:
+            instance.close()
+
+
+_instance_pool = None
+
+
+def get_instance_pool() -> InstancePool:
+    """
+    The process wide InstancePool, its idle games are closed when the process exits.
+    """
+    global _instance_pool
+    if _instance_pool is None:
+        _instance_pool = InstancePool()
+        atexit.register(_instance_pool.close)
+    return _instance_pool
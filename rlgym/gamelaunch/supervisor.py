@@ -0,0 +1,225 @@
+"""
+Keeps games running: crashed or frozen games are swapped for warm standby games while the others keep stepping.
+"""
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, Lock, Event
+from typing import Callable, List
+
+from rlgym.communication import Message, TransportType
+from rlgym.gamelaunch.instances import GameInstance, launch_instance, launch_instances
+from rlgym.gamelaunch.launch import LaunchPreference
+
+
+class InstanceSupervisor(object):
+    """
+    Hands out connected games to Gyms, and keeps `num_standby` more games launched and connected in the background.
+
+    A monitor thread checks every `heartbeat_interval` seconds that the game of each Gym is alive, and that the Gym
+    has not been waiting longer than `step_timeout` seconds for a state. A game that fails either check is killed, so
+    the Gym fails out of its receive. The Gym then calls `replace` which returns a standby game right away, and a new
+    standby is launched in the background. Standby games that die are replaced too.
+
+    Pass the supervisor to `Gym` or `VecGym`, it is not closed with them.
+    """
+
+    def __init__(self, launch_preference: str = LaunchPreference.EPIC, transport=TransportType.NAMED_PIPE,
+                 protocol: int = Message.RLGYM_PROTOCOL_V1, num_standby: int = 1, heartbeat_interval: float = 1,
+                 step_timeout: float = 30, connect_timeout: float = 300, max_concurrent_launches: int = 4,
+                 launcher: Callable[[str], GameInstance] = None):
+        """
+        :param launch_preference: A `LaunchPreference` or the path to RocketLeague.exe.
+        :param transport: A `TransportType` value, see `Gym`.
+        :param protocol: The message protocol, see `Gym`.
+        :param num_standby: How many connected games to keep waiting for a failure.
+        :param heartbeat_interval: How often the games are checked, in seconds.
+        :param step_timeout: How long a Gym may wait for a state before its game is considered frozen, in seconds.
+        :param connect_timeout: How long to wait for a game to connect, in seconds.
+        :param max_concurrent_launches: How many games may be starting at the same time.
+        :param launcher: Launches a game for a pipe id, defaults to `launch_instance` with the arguments above.
+        """
+        self.launch_preference = launch_preference
+        self.transport = transport
+        self.protocol = protocol
+        self.num_standby = num_standby
+        self.heartbeat_interval = heartbeat_interval
+        self.step_timeout = step_timeout
+        self.connect_timeout = connect_timeout
+        self.max_concurrent_launches = max_concurrent_launches
+        self.launcher = launcher
+
+        # Counts of failed games, by cause, only updated under _lock.
+        self.crashes = 0
+        self.timeouts = 0
+        self.replacements = 0
+
+        self._pipe_ids = ("{}_s{}".format(os.getpid(), i) for i in itertools.count())
+        self._lock = Lock()
+        self._active: List[GameInstance] = []
+        self._standby: List[GameInstance] = []
+        # Games that were aborted but not replaced by their Gym yet.
+        self._aborted = set()
+        self._standby_launches = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_launches)
+        self._closed = Event()
+
+        self._refill()
+        self._monitor = Thread(target=self._monitor_loop, daemon=True)
+        self._monitor.start()
+
+    def acquire(self) -> GameInstance:
+        """
+        A connected game, a standby one if there is one, otherwise it is launched now.
+        """
+        return self.acquire_many(1)[0]
+
+    def acquire_many(self, count: int) -> List[GameInstance]:
+        """
+        `count` connected games, the standby ones first. The missing ones are launched now, at the same time.
+        """
+        with self._lock:
+            instances = self._standby[:count]
+            del self._standby[:count]
+
+        missing = count - len(instances)
+        if missing > 0:
+            pipe_ids = [self._next_pipe_id() for _ in range(missing)]
+            if self.launcher is not None:
+                instances += list(self._executor.map(self.launcher, pipe_ids))
+            else:
+                instances += launch_instances(pipe_ids, self.launch_preference, self.transport, self.protocol,
+                                              self.max_concurrent_launches, connect_timeout=self.connect_timeout)
+
+        with self._lock:
+            self._active += instances
+        self._refill()
+        return instances
+
+    def replace(self, instance: GameInstance) -> GameInstance:
+        """
+        Closes a failed game and returns another connected one in its place, see `acquire`. A failure the monitor did
+        not catch first, e.g. the Gym losing the connection, is counted as a crash.
+        """
+        with self._lock:
+            # Taken out of the active games at once, so the monitor can no longer count it too.
+            if instance in self._active:
+                self._active.remove(instance)
+            if instance not in self._aborted:
+                self.crashes += 1
+            self.replacements += 1
+        self.release(instance)
+        replacement = self.acquire()
+        print("RLGym instance {} failed, switched to instance {}".format(instance.pipe_id, replacement.pipe_id))
+        return replacement
+
+    def release(self, instance: GameInstance):
+        """
+        Closes a game that was handed out.
+        """
+        with self._lock:
+            if instance in self._active:
+                self._active.remove(instance)
+            self._aborted.discard(instance)
+        instance.close()
+
+    def num_standby_ready(self) -> int:
+        """
+        The number of standby games that are connected and waiting.
+        """
+        with self._lock:
+            return len(self._standby)
+
+    def wait_for_standby(self, timeout: float = None) -> bool:
+        """
+        Blocks until all `num_standby` standby games are connected.
+
+        :return: False if they were not connected after `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self.num_standby_ready() < self.num_standby:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self):
+        """
+        Stops the monitor thread and closes the standby games. The games handed out are closed by their Gyms.
+        """
+        self._closed.set()
+        self._monitor.join()
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            standby, self._standby = self._standby, []
+        for instance in standby:
+            instance.close()
+
+    def _next_pipe_id(self) -> str:
+        with self._lock:
+            return next(self._pipe_ids)
+
+    def _launch(self, pipe_id: str) -> GameInstance:
+        if self.launcher is not None:
+            return self.launcher(pipe_id)
+        return launch_instance(pipe_id, self.launch_preference, self.transport, self.protocol, self.connect_timeout)
+
+    def _refill(self):
+        with self._lock:
+            if self._closed.is_set():
+                return
+            missing = self.num_standby - len(self._standby) - self._standby_launches
+            self._standby_launches += max(missing, 0)
+
+        for _ in range(missing):
+            future = self._executor.submit(self._launch, self._next_pipe_id())
+            future.add_done_callback(self._standby_launched)
+
+    def _standby_launched(self, future):
+        error = future.exception()
+        with self._lock:
+            self._standby_launches -= 1
+            if error is None:
+                if self._closed.is_set():
+                    future.result().close()
+                else:
+                    self._standby.append(future.result())
+        if error is not None:
+            # Retried on the next heartbeat.
+            print("Failed to launch a standby RLGym instance:", error)
+
+    def _monitor_loop(self):
+        while not self._closed.wait(self.heartbeat_interval):
+            with self._lock:
+                active = [instance for instance in self._active if instance not in self._aborted]
+                standby = list(self._standby)
+
+            for instance in active:
+                crashed = not instance.is_alive()
+                frozen = not crashed and instance.waiting_time() > self.step_timeout
+                if not crashed and not frozen:
+                    continue
+
+                with self._lock:
+                    # The Gym may have released it in the meantime.
+                    if instance not in self._active:
+                        continue
+                    self._aborted.add(instance)
+                    if crashed:
+                        self.crashes += 1
+                    else:
+                        self.timeouts += 1
+                if frozen:
+                    print("RLGym instance {} did not answer for {:.1f} seconds".format(instance.pipe_id,
+                                                                                       instance.waiting_time()))
+                instance.abort()
+
+            for instance in standby:
+                if not instance.is_alive():
+                    with self._lock:
+                        if instance in self._standby:
+                            self._standby.remove(instance)
+                    instance.close()
+
+            self._refill()
@@ -2,44 +2,87 @@
     The Rocket League gym environment.
 """
 from threading import Thread
-from time import sleep
+from time import sleep, monotonic
 from typing import List, Union, Tuple, Dict, Any
 
 import numpy as np
 from gym import Env
 
-from rlgym.communication import CommunicationHandler, Message
-from rlgym.gamelaunch import launch_rocket_league, run_injector, page_rocket_league, LaunchPreference
+from rlgym.communication import CommunicationHandler, Message, TransportType
+from rlgym.gamelaunch import launch_rocket_league, launch_headless_game, run_injector, page_rocket_league, \
+    LaunchPreference, GameInstance, launch_instances
 from rlgym.gamelaunch.minimize import toggle_rl_process
 
 
 class Gym(Env):
     __slots__ = ["_match", "observation_space", "action_space", "_launch_preference", "_use_injector", "_force_paging",
                  "_raise_on_crash", "_comm_handler", "_local_pipe_name", "_local_pipe_id", "_game_process",
-                 "_minimizing_thread", "_minimized", "_auto_minimize", "_prev_state"]
+                 "_minimizing_thread", "_minimized", "_auto_minimize", "_prev_state", "_transport", "_protocol",
+                 "_pending_step", "_recorder", "_last_packet", "_last_actions",
+                 "_profiler", "_instance", "_supervisor", "_instance_pool"]
 
     def __init__(self, match, pipe_id=0, launch_preference=LaunchPreference.EPIC, use_injector=False,
-                 force_paging=False, raise_on_crash=False, auto_minimize=False):
+                 force_paging=False, raise_on_crash=False, auto_minimize=False, transport=TransportType.NAMED_PIPE,
+                 protocol=Message.RLGYM_PROTOCOL_V1, recorder=None, profiler=None, instance=None, supervisor=None,
+                 instance_pool=None):
+        """
+        :param instance: An already connected rlgym.gamelaunch.GameInstance, like those returned by
+                         `launch_instances`, to use instead of launching a game. Its pipe id, launch preference,
+                         transport and protocol replace the arguments, and it is closed with the Gym.
+        :param supervisor: An rlgym.gamelaunch.InstanceSupervisor to get the game from, when `instance` is not given.
+                           A crashed or frozen game is then replaced by one of its standby games instead of being
+                           relaunched, and the step ends the episode.
+        :param instance_pool: An rlgym.gamelaunch.InstancePool, like the process wide `get_instance_pool()`, to claim an
+                              idle game from when `instance` and `supervisor` are not given. The game is launched when
+                              the pool has none, and given back to the pool instead of being closed by `close`.
+        :param recorder: An optional rlgym.recording.TrajectoryRecorder that records every reset and step, it is closed
+                         with the Gym. The Gym passes it the received packets as they are, the recorder owns the copy.
+        :param profiler: An optional rlgym.utils.step_profiler.StepProfiler that times every phase of the steps and
+                         resets.
+        """
         super().__init__()
 
         self._match = match
         self.observation_space = match.observation_space
         self.action_space = match.action_space
 
+        self._supervisor = supervisor
+        self._instance_pool = instance_pool if supervisor is None else None
+        if instance is None and supervisor is not None:
+            instance = supervisor.acquire()
+        elif instance is None and instance_pool is not None:
+            instance = instance_pool.claim(launch_preference, transport, protocol)
+            if instance is None:
+                instance = launch_instances([instance_pool.next_pipe_id(pipe_id)], launch_preference, transport,
+                                            protocol, use_injector=use_injector)[0]
+        self._instance = instance
+
+        if instance is not None:
+            pipe_id, launch_preference = instance.pipe_id, instance.launch_preference
+            transport, protocol = instance.transport, instance.protocol
+
         self._launch_preference = launch_preference
         self._use_injector = use_injector
         self._force_paging = force_paging
 
         self._raise_on_crash = raise_on_crash
 
-        self._comm_handler = CommunicationHandler()
-        self._local_pipe_name = CommunicationHandler.format_pipe_id(pipe_id)
+        self._transport = transport
+        self._protocol = protocol
+        if instance is not None:
+            self._comm_handler = instance.comm_handler
+            self._game_process = instance.process
+        else:
+            self._comm_handler = CommunicationHandler(transport=transport, protocol=protocol)
+            self._game_process = None
+        self._local_pipe_name = self._comm_handler.format_address(pipe_id)
         self._local_pipe_id = pipe_id
 
-        self._game_process = None
-
-        self._open_game()
-        self._setup_plugin_connection()
+        if instance is None:
+            self._open_game()
+            self._setup_plugin_connection()
+        else:
+            self._send_config()
 
         if self._force_paging:
             self._page_client()
@@ -49,8 +92,21 @@ class Gym(Env):
         self._auto_minimize = auto_minimize
 
         self._prev_state = None
+        self._pending_step = None
+
+        self._recorder = recorder
+        self._last_packet = None
+        self._last_actions = None
+
+        self._profiler = profiler
+        if profiler is not None:
+            match.set_profiler(profiler)
 
     def _open_game(self):
+        if self._launch_preference == LaunchPreference.HEADLESS:
+            self._game_process = launch_headless_game(self._local_pipe_name, self._transport, self._protocol)
+            return
+
         print("Launching Rocket League, make sure bakkesmod is running.")
         # Game process is only set if epic version is used or launched with path_to_rl
         self._game_process = launch_rocket_league(self._local_pipe_name, self._launch_preference)
@@ -61,6 +117,9 @@ class Gym(Env):
 
     def _setup_plugin_connection(self):
         self._comm_handler.open_pipe(self._local_pipe_name)
+        self._send_config()
+
+    def _send_config(self):
         self._comm_handler.send_message(header=Message.RLGYM_CONFIG_MESSAGE_HEADER, body=self._match.get_config())
 
     def _page_client(self) -> bool:
@@ -90,6 +149,101 @@ class Gym(Env):
         function is `True`.
         """
 
+        self._send_reset_state()
+        state = self._receive_reset_state()
+        return self._finish_reset(state, return_info)
+
+    def step(self, actions: Any) -> Tuple[List, List, bool, Dict]:
+        """
+        The step function will send the list of provided actions to the game, then advance the game forward by `tick_skip`
+        physics ticks using that action. The game is then paused, and the current state is sent back to RLGym. This is
+        decoded into a `GameState` object, which gets passed to the configuration objects to determine the rewards,
+        next observation, and done signal.
+
+        :param actions: An object containing actions, in the format specified by the `ActionParser`.
+        :return: A tuple containing (obs, rewards, done, info)
+        """
+
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions: Any):
+        """
+        The first half of `step`, sends the actions to the game and returns without waiting for the new state. The game
+        simulates while the caller does other work, `step_wait` must be called before the next step or reset.
+
+        :param actions: An object containing actions, in the format specified by the `ActionParser`.
+        """
+        assert self._pending_step is None, "step_async was called twice without a step_wait in between"
+        self._pending_step = self._parse_and_send_actions(actions)
+
+    def step_wait(self) -> Tuple[List, List, bool, Dict]:
+        """
+        The second half of `step`, blocks until the state that follows the actions given to `step_async` is received.
+
+        :return: A tuple containing (obs, rewards, done, info)
+        """
+        assert self._pending_step is not None, "step_wait was called without step_async"
+        actions_sent, self._pending_step = self._pending_step, None
+        # A game that did not get the actions, like a replacement for a crashed one, has no state to send.
+        state = self._receive_state() if actions_sent else None
+        return self._finish_step(state, actions_sent)
+
+    async def astep(self, actions: Any) -> Tuple[List, List, bool, Dict]:
+        """
+        An asyncio version of `step`. The actions are sent right away and the wait for the state runs in the event
+        loop's default executor, so other coroutines keep running while the game simulates.
+
+        :param actions: An object containing actions, in the format specified by the `ActionParser`.
+        :return: A tuple containing (obs, rewards, done, info)
+        """
+        import asyncio
+
+        self.step_async(actions)
+        return await asyncio.get_running_loop().run_in_executor(None, self.step_wait)
+
+    def close(self):
+        """
+        Disconnect communication with the Bakkesmod plugin and close the game. This should only be called if you are finished
+        with your current RLGym environment instance.
+        """
+        # It must not keep the shared memory of the transport mapped.
+        self._last_packet = None
+        if self._supervisor is not None:
+            self._supervisor.release(self._instance)
+        elif self._instance_pool is not None:
+            self._return_instance()
+        else:
+            self._close_game()
+        if self._recorder is not None:
+            self._recorder.close()
+
+    def _close_game(self):
+        self._comm_handler.close_pipe()
+        if self._game_process is not None:
+            self._game_process.terminate()
+
+    def _return_instance(self):
+        if self._pending_step:
+            # The state of the last actions is on its way, it must not be taken for the reply to the next reset.
+            self._comm_handler.receive_message(header=Message.RLGYM_STATE_MESSAGE_HEADER, latest_only=True)
+        self._pending_step = None
+        self._instance_pool.put(self._instance)
+
+    def update_settings(self, game_speed=None, gravity=None, boost_consumption=None):
+        """
+        Updates the specified RLGym instance settings
+
+        :param game_speed: The speed the physics will run at, leave it at 100 unless your game can't run at over 240fps
+        :param gravity:
+        :param boost_consumption:
+        """
+        self._match.update_settings(game_speed=game_speed, gravity=gravity, boost_consumption=boost_consumption)
+        self._comm_handler.send_message(header=Message.RLGYM_CONFIG_MESSAGE_HEADER, body=self._match.get_config())
+
+    def _send_reset_state(self):
+        profiler = self._profiler
+        start = profiler.now() if profiler is not None else 0
         state_str = self._match.get_reset_state()
 
         exception = self._comm_handler.send_message(header=Message.RLGYM_RESET_GAME_STATE_MESSAGE_HEADER,
@@ -103,79 +257,105 @@ class Gym(Env):
                 print("!UNABLE TO RECOVER ROCKET LEAGUE!\nEXITING")
                 sys.exit(-1)
 
+        if profiler is not None:
+            profiler.record('send_reset', start)
+
+    def _receive_reset_state(self):
         state = self._receive_state()
+        if state is None:
+            # The game failed after the reset was sent, the one that replaced it has to be reset too.
+            self._send_reset_state()
+            state = self._receive_state()
+        return state
+
+    def _finish_reset(self, state, return_info=False) -> Union[List, Tuple]:
+        profiler = self._profiler
+        start = profiler.now() if profiler is not None else 0
         self._match.episode_reset(state)
         self._prev_state = state
+        if profiler is not None:
+            start = profiler.lap('episode_reset', start)
+        if self._recorder is not None:
+            self._recorder.record_reset(self._last_packet)
+            self._last_packet = None
 
         if self._auto_minimize:
             self._minimize_game()  # After a successful episode, try to minimize the game
 
         obs = self._match.build_observations(state)
+        if profiler is not None:
+            profiler.record('build_observations', start)
         if return_info:
             info = {
                 'state': state,
-                'result': self._match.get_result(state)
+                'result': self._match.get_result(state),
+                'dropped_frames': self._comm_handler.dropped_frames
             }
             return obs, info
         return obs
 
-    def step(self, actions: Any) -> Tuple[List, List, bool, Dict]:
-        """
-        The step function will send the list of provided actions to the game, then advance the game forward by `tick_skip`
-        physics ticks using that action. The game is then paused, and the current state is sent back to RLGym. This is
-        decoded into a `GameState` object, which gets passed to the configuration objects to determine the rewards,
-        next observation, and done signal.
-
-        :param actions: An object containing actions, in the format specified by the `ActionParser`.
-        :return: A tuple containing (obs, rewards, done, info)
-        """
-
+    def _parse_and_send_actions(self, actions: Any) -> bool:
+        profiler = self._profiler
+        start = profiler.now() if profiler is not None else 0
         actions = self._match.parse_actions(actions, self._prev_state)
-        actions_sent = self._send_actions(actions)
+        if profiler is not None:
+            start = profiler.lap('parse_actions', start)
 
-        state = self._receive_state()
+        actions_sent = self._send_actions(actions)
+        if profiler is not None:
+            profiler.record('send_actions', start)
+        return actions_sent
 
+    def _finish_step(self, state, actions_sent: bool) -> Tuple[List, List, bool, Dict]:
         # If, for any reason, the state is not successfully received, we do not want to just crash the API.
         # This will simply pretend that the state did not change and advance as though nothing went wrong.
-        if state is None:
+        received = state is not None
+        if not received:
             print("FAILED TO RECEIEVE STATE! FALLING TO", self._prev_state)
             state = self._prev_state
 
+        profiler = self._profiler
+        start = profiler.now() if profiler is not None else 0
         obs = self._match.build_observations(state)
-        done = self._match.is_done(state) or state is None or not actions_sent
+        if profiler is not None:
+            start = profiler.lap('build_observations', start)
+        # A game that failed during the step has been replaced or relaunched, it needs a reset.
+        done = self._match.is_done(state) or not received or not actions_sent
+        if profiler is not None:
+            start = profiler.lap('is_done', start)
         reward = self._match.get_rewards(state, done)
+        if profiler is not None:
+            profiler.record('get_rewards', start)
         self._prev_state = state
 
         info = {
             'state': state,
-            'result': self._match.get_result(state)
+            'result': self._match.get_result(state),
+            'dropped_frames': self._comm_handler.dropped_frames
         }
+        if done:
+            breakdown = self._match.get_reward_breakdown()
+            if breakdown is not None:
+                info['reward_breakdown'] = breakdown
 
-        return obs, reward, done, info
-
-    def close(self):
-        """
-        Disconnect communication with the Bakkesmod plugin and close the game. This should only be called if you are finished
-        with your current RLGym environment instance.
-        """
-        self._comm_handler.close_pipe()
-        if self._game_process is not None:
-            self._game_process.terminate()
-
-    def update_settings(self, game_speed=None, gravity=None, boost_consumption=None):
-        """
-        Updates the specified RLGym instance settings
+        if self._recorder is not None and self._last_packet is not None:
+            self._recorder.record_step(self._last_packet, self._last_actions, reward, done)
+            self._last_packet = None
 
-        :param game_speed: The speed the physics will run at, leave it at 100 unless your game can't run at over 240fps
-        :param gravity:
-        :param boost_consumption:
-        """
-        self._match.update_settings(game_speed=game_speed, gravity=gravity, boost_consumption=boost_consumption)
-        self._comm_handler.send_message(header=Message.RLGYM_CONFIG_MESSAGE_HEADER, body=self._match.get_config())
+        return obs, reward, done, info
 
     def _receive_state(self):
         # print("Waiting for state...")
-        message, exception = self._comm_handler.receive_message(header=Message.RLGYM_STATE_MESSAGE_HEADER)
+        profiler = self._profiler
+        start = profiler.now() if profiler is not None else 0
+        instance = self._instance if self._supervisor is not None else None
+        if instance is not None:
+            instance.waiting_since = monotonic()
+        # Older states that piled up while this process was busy are skipped without being decoded.
+        message, exception = self._comm_handler.receive_message(header=Message.RLGYM_STATE_MESSAGE_HEADER,
+                                                                latest_only=True)
+        if instance is not None:
+            instance.waiting_since = None
         if exception is not None:
             self._handle_exception()
             return None
@@ -186,13 +366,24 @@ class Gym(Env):
         if message.body is None:
             return None
 
-        return self._match.parse_state(message.body)
+        if self._recorder is not None:
+            # The body may be a view into the transport's buffers. It stays valid until the next receive, the recorder
+            # copies it before then and the reference is dropped once it is recorded.
+            self._last_packet = message.body
+        if profiler is None:
+            return self._match.parse_state(message.body)
+
+        start = profiler.lap('receive_state', start)
+        state = self._match.parse_state(message.body)
+        profiler.record('parse_state', start)
+        return state
 
     def _send_actions(self, actions):
         assert isinstance(actions, np.ndarray), "Invalid action type, action must be of type np.ndarray(n, 8)."
         assert len(actions.shape) == 2, "Invalid action shape, shape must be of the form (n, 8)."
         assert actions.shape[-1] == 8, "Invalid action shape, last dimension must be 8."
 
+        self._last_actions = actions
         actions_formatted = self._match.format_actions(actions)
         exception = self._comm_handler.send_message(header=Message.RLGYM_AGENT_ACTION_IMMEDIATE_RESPONSE_MESSAGE_HEADER,
                                                     body=actions_formatted)
@@ -206,22 +397,42 @@ class Gym(Env):
             raise EnvironmentError("Rocket League has crashed")  # Add exception message?
         else:
             print("!ROCKET LEAGUE HAS CRASHED!\nATTEMPTING RECOVERY")
-            self.attempt_recovery()
+            # It must not keep the shared memory of the failed transport mapped.
+            self._last_packet = None
+            if self._supervisor is not None:
+                self._use_instance(self._supervisor.replace(self._instance))
+            else:
+                self.attempt_recovery()
+
+    def _use_instance(self, instance):
+        self._instance = instance
+        self._comm_handler = instance.comm_handler
+        self._game_process = instance.process
+        self._local_pipe_id = instance.pipe_id
+        self._local_pipe_name = instance.address
+        self._minimized = False
+        self._send_config()
 
     def attempt_recovery(self):
         import os
         import time
-        self.close()
-        proc_list = os.popen('wmic process get description, processid').read()
-        num_instances = proc_list.count("RocketLeague.exe")
-        wait_time = 2 * num_instances
-
-        print("Discovered {} existing Rocket League processes. Waiting {} seconds before attempting to open "
-              "a new one.".format(num_instances, wait_time))
-
-        time.sleep(wait_time)
+        # Only the game, the recorder and the instance pool must outlive the crash.
+        self._close_game()
+        # The headless game is a Python process, there are no Rocket League processes to wait for.
+        if self._launch_preference != LaunchPreference.HEADLESS:
+            proc_list = os.popen('wmic process get description, processid').read()
+            num_instances = proc_list.count("RocketLeague.exe")
+            wait_time = 2 * num_instances
+
+            print("Discovered {} existing Rocket League processes. Waiting {} seconds before attempting to open "
+                  "a new one.".format(num_instances, wait_time))
+
+            time.sleep(wait_time)
         self._open_game()
         self._setup_plugin_connection()
+        if self._instance is not None:
+            self._instance = GameInstance(self._local_pipe_id, self._comm_handler, self._game_process,
+                                          self._launch_preference, self._transport)
         if self._force_paging:
             self._page_client()
         self._minimized = False
@@ -0,0 +1,2 @@
+from .simulator import KinematicSimulator
+from .game import run_headless_game
@@ -0,0 +1,14 @@
+import argparse
+
+from rlgym.communication import Message, TransportType
+from rlgym.headless import run_headless_game
+
+parser = argparse.ArgumentParser(description="Run the headless RLGym game for the RLGym instance at an address.")
+parser.add_argument("address")
+parser.add_argument("--transport", default=TransportType.UNIX_SOCKET)
+parser.add_argument("--protocol", type=int, default=Message.RLGYM_PROTOCOL_V1)
+parser.add_argument("--crash-after", type=int, help="Exit abruptly after sending this many states")
+parser.add_argument("--hang-after", type=int, help="Stop answering after sending this many states")
+args = parser.parse_args()
+
+run_headless_game(args.address, args.transport, args.protocol, crash_after=args.crash_after, hang_after=args.hang_after)
@@ -0,0 +1,72 @@
+"""
+The message loop of the headless game, a drop in replacement for Rocket League with the Bakkesmod plugin.
+"""
+
+import os
+import time
+
+from rlgym.communication import CommunicationHandler, Message, TransportType
+from rlgym.headless.simulator import KinematicSimulator
+
+
+def run_headless_game(address: str, transport: str = TransportType.UNIX_SOCKET,
+                      protocol: int = Message.RLGYM_PROTOCOL_V1, connect_timeout: float = 30, crash_after: int = None,
+                      hang_after: int = None):
+    """
+    Connects to an RLGym instance listening on `address` and simulates matches for it until the connection is closed.
+
+    :param address: The address RLGym is listening on, as returned by `CommunicationHandler.format_address`.
+    :param transport: The transport type RLGym was created with.
+    :param protocol: The message protocol RLGym was created with.
+    :param connect_timeout: How long to keep retrying the connection while RLGym is not listening yet.
+    :param crash_after: Fault injection, exit abruptly instead of answering the message after this many states were
+                        sent, like a crashed game.
+    :param hang_after: Fault injection, stop answering after this many states were sent, like a frozen game.
+    """
+    comm_handler = CommunicationHandler(transport=transport, protocol=protocol)
+
+    deadline = time.time() + connect_timeout
+    while True:
+        try:
+            comm_handler.connect_pipe(address)
+            break
+        except (FileNotFoundError, ConnectionRefusedError, ValueError):
+            # ValueError is raised by a shared memory segment that exists but has not been sized yet.
+            if time.time() > deadline:
+                raise
+            time.sleep(0.01)
+
+    simulator = KinematicSimulator()
+    states_sent = 0
+    action_headers = (Message.RLGYM_AGENT_ACTION_IMMEDIATE_RESPONSE_MESSAGE_HEADER,
+                      Message.RLGYM_AGENT_ACTION_MESSAGE_HEADER)
+    while True:
+        message, exception = comm_handler.receive_message(num_attempts=1)
+        if exception is not None:
+            break
+
+        if message.header == Message.RLGYM_CONFIG_MESSAGE_HEADER:
+            simulator.configure(message.body)
+            continue
+
+        if message.header == Message.RLGYM_RESET_GAME_STATE_MESSAGE_HEADER:
+            simulator.reset(message.body)
+        elif message.header in action_headers:
+            simulator.step(message.body)
+        else:
+            continue
+
+        if states_sent == crash_after:
+            os._exit(1)
+        if states_sent == hang_after:
+            while True:
+                time.sleep(1)
+
+        state = simulator.get_state()
+        if protocol == Message.RLGYM_PROTOCOL_V1:
+            state = state.tolist()
+        if comm_handler.send_message(header=Message.RLGYM_STATE_MESSAGE_HEADER, body=state) is not None:
+            break
+        states_sent += 1
+
+    comm_handler.close_pipe()
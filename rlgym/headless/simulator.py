@@ -0,0 +1,351 @@
+"""
+A simple kinematic model of a Rocket League match. It is nowhere near the real physics, but it produces state packets
+with exactly the layout of the Bakkesmod plugin and reacts to actions, gravity and boost consumption in a plausible way.
+Every step is deterministic and vectorized over the cars.
+"""
+
+from typing import List
+
+import numpy as np
+
+from rlgym.utils import common_values
+
+# Seconds per physics tick, the game runs at 120Hz.
+TICK_TIME = 1 / 120
+
+GRAVITY_Z = -650
+CAR_REST_HEIGHT = 17
+CAR_RADIUS = 70
+CAR_THROTTLE_ACCEL = 1600
+CAR_COAST_DECEL = 525
+CAR_BOOST_ACCEL = 991.667
+CAR_JUMP_SPEED = 292
+CAR_TURN_RATE = 2.5
+BOOST_USED_PER_SECOND = 1 / 3  # Boost amounts are in [0, 1].
+
+BALL_REST_HEIGHT = 93.15
+BALL_RESTITUTION = 0.6
+BALL_HIT_SCALE = 1.5
+GOAL_HALF_WIDTH = 892.755
+
+BIG_PAD_HEIGHT = 73
+BIG_PAD_RADIUS, SMALL_PAD_RADIUS = 208, 144
+BIG_PAD_RESPAWN, SMALL_PAD_RESPAWN = 10, 4
+BIG_PAD_BOOST, SMALL_PAD_BOOST = 1, 0.12
+
+BLUE_ID1 = 1
+ORANGE_ID1 = 5
+
+NUM_BOOST_PADS = len(common_values.BOOST_LOCATIONS)
+RESET_BALL_LENGTH = 9
+RESET_CAR_LENGTH = 14
+
+# Rotates a vector half a turn around the z axis, which is how the plugin mirrors the field for the orange team.
+_INVERT = np.array([-1, -1, 1])
+
+
+def euler_to_rotation(pyr: np.ndarray) -> np.ndarray:
+    """
+    Batched version of `rlgym.utils.math.euler_to_rotation`, (n, 3) pitch, yaw, roll to (n, 3, 3).
+    """
+    cp, cy, cr = np.cos(pyr).T
+    sp, sy, sr = np.sin(pyr).T
+
+    theta = np.empty((len(pyr), 3, 3))
+    theta[:, 0, 0] = cp * cy
+    theta[:, 1, 0] = cp * sy
+    theta[:, 2, 0] = sp
+
+    theta[:, 0, 1] = cy * sp * sr - cr * sy
+    theta[:, 1, 1] = sy * sp * sr + cr * cy
+    theta[:, 2, 1] = -cp * sr
+
+    theta[:, 0, 2] = -cr * cy * sp - sr * sy
+    theta[:, 1, 2] = -cr * sy * sp + sr * cy
+    theta[:, 2, 2] = cp * cr
+    return theta
+
+
+def rotation_to_quaternion(m: np.ndarray) -> np.ndarray:
+    """
+    Batched version of `rlgym.utils.math.rotation_to_quaternion`, (n, 3, 3) to (n, 4) in w, x, y, z order.
+    """
+    q = np.empty((len(m), 4))
+    trace = np.trace(m, axis1=1, axis2=2)
+    m00, m11, m22 = m[:, 0, 0], m[:, 1, 1], m[:, 2, 2]
+
+    # Same branches as the scalar version, picked per matrix for numerical stability.
+    b0 = trace > 0
+    b1 = ~b0 & (m00 >= m11) & (m00 >= m22)
+    b2 = ~b0 & ~b1 & (m11 > m22)
+    b3 = ~b0 & ~b1 & ~b2
+
+    for branch, diagonal, col in ((b0, trace + 1, 0), (b1, 1 + m00 - m11 - m22, 1),
+                                  (b2, 1 + m11 - m00 - m22, 2), (b3, 1 + m22 - m00 - m11, 3)):
+        if not branch.any():
+            continue
+        r = m[branch]
+        s = diagonal[branch] ** 0.5
+        inv_s = 0.5 / s
+        w = (r[:, 2, 1] - r[:, 1, 2], r[:, 0, 2] - r[:, 2, 0], r[:, 1, 0] - r[:, 0, 1])
+        xy, xz, yz = r[:, 1, 0] + r[:, 0, 1], r[:, 2, 0] + r[:, 0, 2], r[:, 1, 2] + r[:, 2, 1]
+        if col == 0:
+            q[branch] = np.stack((0.5 * s, w[0] * inv_s, w[1] * inv_s, w[2] * inv_s), axis=1)
+        elif col == 1:
+            q[branch] = np.stack((w[0] * inv_s, 0.5 * s, xy * inv_s, xz * inv_s), axis=1)
+        elif col == 2:
+            q[branch] = np.stack((w[1] * inv_s, xy * inv_s, 0.5 * s, yz * inv_s), axis=1)
+        else:
+            q[branch] = np.stack((w[2] * inv_s, xz * inv_s, yz * inv_s, 0.5 * s), axis=1)
+    return -q
+
+
+class KinematicSimulator(object):
+    def __init__(self):
+        self.team_size = 1
+        self.spawn_opponents = False
+        self.tick_skip = 8
+        self.gravity = 1
+        self.boost_consumption = 1
+
+        self.blue_score = 0
+        self.orange_score = 0
+
+        self.ball_position = np.zeros(3)
+        self.ball_linear_velocity = np.zeros(3)
+        self.ball_angular_velocity = np.zeros(3)
+
+        pad_locations = np.array(common_values.BOOST_LOCATIONS)
+        self._pad_positions = pad_locations[:, :2]
+        self._big_pads = pad_locations[:, 2] == BIG_PAD_HEIGHT
+        self.pad_timers = np.zeros(NUM_BOOST_PADS)
+
+        self._setup_cars()
+
+    def configure(self, config: List[float]):
+        """
+        Applies a config message body, in the format of `Match.get_config`. Game speed is ignored, the simulator always
+        runs as fast as it can.
+        """
+        team_size, spawn_opponents, tick_skip, _, gravity, boost_consumption = config[:6]
+        self.team_size = int(team_size)
+        self.spawn_opponents = spawn_opponents > 0
+        self.tick_skip = int(tick_skip)
+        self.gravity = float(gravity)
+        self.boost_consumption = float(boost_consumption)
+        self._setup_cars()
+
+    def _setup_cars(self):
+        blue = [BLUE_ID1 + i for i in range(self.team_size)]
+        orange = [ORANGE_ID1 + i for i in range(self.team_size)] if self.spawn_opponents else []
+        n = len(blue) + len(orange)
+
+        self.car_ids = np.array(blue + orange)
+        self.team_nums = np.array([common_values.BLUE_TEAM] * len(blue) + [common_values.ORANGE_TEAM] * len(orange))
+        self.positions = np.zeros((n, 3))
+        self.positions[:, 0] = self.car_ids * 100
+        self.positions[:, 2] = CAR_REST_HEIGHT
+        self.linear_velocities = np.zeros((n, 3))
+        self.angular_velocities = np.zeros((n, 3))
+        self.rotations = np.zeros((n, 3))
+        self.boost_amounts = np.zeros(n)
+        self.on_ground = np.ones(n, dtype=bool)
+        self.has_jump = np.ones(n, dtype=bool)
+        self.has_flip = np.ones(n, dtype=bool)
+        self.ball_touched = np.zeros(n, dtype=bool)
+        self.boost_pickups = np.zeros(n, dtype=int)
+        self.match_goals = np.zeros(n, dtype=int)
+        self._last_toucher = -1
+
+    def reset(self, reset_state: List[float]):
+        """
+        Applies a reset message body, in the format of `StateWrapper.format_state`.
+        """
+        reset_state = np.asarray(reset_state, dtype=float)
+        self.ball_position = reset_state[0:3].copy()
+        self.ball_linear_velocity = reset_state[3:6].copy()
+        self.ball_angular_velocity = reset_state[6:9].copy()
+
+        cars = reset_state[RESET_BALL_LENGTH:]
+        cars = cars[:len(cars) // RESET_CAR_LENGTH * RESET_CAR_LENGTH].reshape(-1, RESET_CAR_LENGTH)
+        for car in cars:
+            index = np.flatnonzero(self.car_ids == int(car[0]))
+            if len(index) == 0:
+                continue
+            i = index[0]
+            self.positions[i] = car[1:4]
+            self.linear_velocities[i] = car[4:7]
+            self.angular_velocities[i] = car[7:10]
+            self.rotations[i] = car[10:13]
+            self.boost_amounts[i] = car[13]
+
+        self.on_ground[:] = self.positions[:, 2] <= CAR_REST_HEIGHT + 1
+        self.has_jump[:] = self.on_ground
+        self.has_flip[:] = True
+        self.ball_touched[:] = False
+        self.pad_timers[:] = 0
+        self._last_toucher = -1
+
+    def step(self, actions: List[float]):
+        """
+        Applies an action message body (car id followed by 8 controls, per car) for `tick_skip` ticks.
+        """
+        controls = np.zeros((len(self.car_ids), 8))
+        actions = np.asarray(actions, dtype=float)
+        for action in actions[:len(actions) // 9 * 9].reshape(-1, 9):
+            index = np.flatnonzero(self.car_ids == int(action[0]))
+            if len(index) > 0:
+                controls[index[0]] = action[1:]
+
+        self.ball_touched[:] = False
+        for _ in range(self.tick_skip):
+            self._tick(controls)
+
+    def _tick(self, controls: np.ndarray):
+        dt = TICK_TIME
+        gravity = GRAVITY_Z * self.gravity
+        throttle, steer, pitch, yaw, roll, jump, boost, _ = controls.T
+        ground, air = self.on_ground, ~self.on_ground
+
+        # Rotation, yaw only on the ground and full control in the air.
+        forward_speed = np.einsum('ij,ij->i', self.linear_velocities, self._forward())
+        turn = np.sign(forward_speed) * np.minimum(np.abs(forward_speed) / 500, 1)
+        self.angular_velocities[:, :2] = 0
+        self.angular_velocities[:, 2] = np.where(ground, steer * CAR_TURN_RATE * turn,
+                                                 yaw * common_values.CAR_MAX_ANG_VEL)
+        self.rotations[:, 1] += self.angular_velocities[:, 2] * dt
+        self.rotations[:, 0] += np.where(air, pitch * common_values.CAR_MAX_ANG_VEL * dt, 0)
+        self.rotations[:, 2] += np.where(air, roll * common_values.CAR_MAX_ANG_VEL * dt, 0)
+        self.rotations[:] = (self.rotations + np.pi) % (2 * np.pi) - np.pi
+        forward = self._forward()
+
+        # Driving keeps the car moving along its nose, boosting works everywhere.
+        boosting = (boost > 0) & (self.boost_amounts > 0)
+        speed = np.einsum('ij,ij->i', self.linear_velocities, forward)
+        accel = np.where(ground, throttle * CAR_THROTTLE_ACCEL, 0) + boosting * CAR_BOOST_ACCEL
+        coast = ground & (throttle == 0)
+        speed = np.where(coast, np.sign(speed) * np.maximum(np.abs(speed) - CAR_COAST_DECEL * dt, 0), speed)
+        self.linear_velocities[ground] = forward[ground] * speed[ground, None]
+        self.linear_velocities += forward * (accel * dt)[:, None]
+        self.linear_velocities[air, 2] += gravity * dt
+        self.boost_amounts = np.maximum(self.boost_amounts - boosting * BOOST_USED_PER_SECOND *
+                                        self.boost_consumption * dt, 0)
+
+        jumping = ground & (jump > 0) & self.has_jump
+        self.linear_velocities[jumping, 2] += CAR_JUMP_SPEED
+        self.has_jump[jumping] = False
+        self.on_ground[jumping] = False
+
+        self.linear_velocities[:] = _clip_norm(self.linear_velocities, common_values.CAR_MAX_SPEED)
+        self.positions += self.linear_velocities * dt
+        self._collide_with_arena(self.positions, self.linear_velocities, CAR_REST_HEIGHT, 0)
+
+        landed = ~self.on_ground & (self.positions[:, 2] <= CAR_REST_HEIGHT) & (self.linear_velocities[:, 2] <= 0)
+        self.on_ground |= landed
+        self.has_jump |= landed
+        self.has_flip |= landed
+        self.rotations[landed, 0] = 0
+        self.rotations[landed, 2] = 0
+
+        self._tick_ball(gravity)
+        self._tick_boost_pads()
+
+    def _tick_ball(self, gravity: float):
+        dt = TICK_TIME
+        offset = self.ball_position - self.positions
+        dist = np.linalg.norm(offset, axis=1)
+        normal = offset / np.maximum(dist, 1e-6)[:, None]
+        closing_speed = np.einsum('ij,ij->i', self.linear_velocities - self.ball_linear_velocity, normal)
+        touching = (dist < common_values.BALL_RADIUS + CAR_RADIUS) & (closing_speed > 0)
+        if touching.any():
+            self.ball_linear_velocity += (normal[touching] * closing_speed[touching, None] * BALL_HIT_SCALE).sum(0)
+            self.ball_touched |= touching
+            self._last_toucher = int(np.flatnonzero(touching)[-1])
+
+        self.ball_linear_velocity[2] += gravity * dt
+        self.ball_linear_velocity[:] = _clip_norm(self.ball_linear_velocity[None], common_values.BALL_MAX_SPEED)[0]
+        self.ball_position += self.ball_linear_velocity * dt
+
+        in_goal = abs(self.ball_position[0]) < GOAL_HALF_WIDTH and self.ball_position[2] < common_values.GOAL_HEIGHT
+        if in_goal and abs(self.ball_position[1]) > common_values.BACK_WALL_Y + common_values.BALL_RADIUS:
+            self._score_goal(orange_scored=self.ball_position[1] < 0)
+            return
+
+        self._collide_with_arena(self.ball_position[None], self.ball_linear_velocity[None], BALL_REST_HEIGHT,
+                                 BALL_RESTITUTION, back_wall_open=in_goal)
+
+    def _score_goal(self, orange_scored: bool):
+        if orange_scored:
+            self.orange_score += 1
+        else:
+            self.blue_score += 1
+
+        if self._last_toucher >= 0 and self.team_nums[self._last_toucher] == int(orange_scored):
+            self.match_goals[self._last_toucher] += 1
+
+        self.ball_position[:] = 0, 0, BALL_REST_HEIGHT
+        self.ball_linear_velocity[:] = 0
+        self.ball_angular_velocity[:] = 0
+
+    def _tick_boost_pads(self):
+        self.pad_timers = np.maximum(self.pad_timers - TICK_TIME, 0)
+
+        dist = np.linalg.norm(self.positions[:, None, :2] - self._pad_positions[None], axis=2)
+        radius = np.where(self._big_pads, BIG_PAD_RADIUS, SMALL_PAD_RADIUS)
+        in_range = (dist < radius) & (self.pad_timers == 0) & (self.positions[:, 2] < 200)[:, None]
+        in_range &= (self.boost_amounts < 1)[:, None]
+        for car, pad in zip(*np.nonzero(in_range)):
+            if self.pad_timers[pad] > 0:
+                continue
+            amount = BIG_PAD_BOOST if self._big_pads[pad] else SMALL_PAD_BOOST
+            self.boost_amounts[car] = min(self.boost_amounts[car] + amount, 1)
+            self.boost_pickups[car] += 1
+            self.pad_timers[pad] = BIG_PAD_RESPAWN if self._big_pads[pad] else SMALL_PAD_RESPAWN
+
+    @staticmethod
+    def _collide_with_arena(positions: np.ndarray, velocities: np.ndarray, floor: float, restitution: float,
+                            back_wall_open: bool = False):
+        back_wall = common_values.BACK_NET_Y if back_wall_open else common_values.BACK_WALL_Y
+        upper = np.array([common_values.SIDE_WALL_X, back_wall, common_values.CEILING_Z - floor])
+        lower = np.array([-common_values.SIDE_WALL_X, -back_wall, floor])
+
+        # Bounce off whatever surface the object is moving into, cars just stop.
+        hit = ((positions < lower) & (velocities < 0)) | ((positions > upper) & (velocities > 0))
+        velocities[:] = np.where(hit, -restitution * velocities, velocities)
+        np.clip(positions, lower, upper, out=positions)
+
+    def _forward(self) -> np.ndarray:
+        pitch, yaw = self.rotations[:, 0], self.rotations[:, 1]
+        return np.stack((np.cos(pitch) * np.cos(yaw), np.cos(pitch) * np.sin(yaw), np.sin(pitch)), axis=1)
+
+    def get_state(self) -> np.ndarray:
+        """
+        Builds a state message body with the same layout as the Bakkesmod plugin, see `GameState.decode`.
+        """
+        n = len(self.car_ids)
+        ball = np.concatenate((self.ball_position, self.ball_linear_velocity, self.ball_angular_velocity))
+        inverted_ball = (ball.reshape(3, 3) * _INVERT).ravel()
+
+        quaternions = rotation_to_quaternion(euler_to_rotation(self.rotations))
+        w, x, y, z = quaternions.T
+        inverted_quaternions = np.stack((-z, -y, x, w), axis=1)
+
+        car_data = np.concatenate((self.positions, quaternions, self.linear_velocities, self.angular_velocities),
+                                  axis=1)
+        inverted_car_data = np.concatenate((self.positions * _INVERT, inverted_quaternions,
+                                            self.linear_velocities * _INVERT, self.angular_velocities * _INVERT),
+                                           axis=1)
+        tertiary_data = np.stack((self.match_goals, np.zeros(n), np.zeros(n), np.zeros(n), self.boost_pickups,
+                                  np.zeros(n), self.on_ground, self.ball_touched, self.has_jump, self.has_flip,
+                                  self.boost_amounts), axis=1)
+        players = np.concatenate((self.car_ids[:, None], self.team_nums[:, None], car_data, inverted_car_data,
+                                  tertiary_data), axis=1)
+
+        return np.concatenate(([0, self.blue_score, self.orange_score], (self.pad_timers == 0).astype(float), ball,
+                               inverted_ball, players.ravel()))
+
+
+def _clip_norm(vectors: np.ndarray, max_norm: float) -> np.ndarray:
+    norm = np.linalg.norm(vectors, axis=1)
+    scale = np.where(norm > max_norm, max_norm / np.maximum(norm, 1e-6), 1)
+    return vectors * scale[:, None]
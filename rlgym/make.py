@@ -3,12 +3,14 @@ from typing import List
 from warnings import warn
 
 from rlgym.envs import Match
+from rlgym.communication import TransportType, Message
 from rlgym.gamelaunch import LaunchPreference
 from rlgym.utils.terminal_conditions import common_conditions
 from rlgym.utils.reward_functions import DefaultReward
 from rlgym.utils.obs_builders import DefaultObs
 from rlgym.utils.action_parsers import DefaultAction
 from rlgym.utils.state_setters import DefaultState
+from rlgym.utils.gamestates import GameState
 
 
 def make(game_speed: int = 100,
@@ -27,7 +29,15 @@ def make(game_speed: int = 100,
          use_injector: bool = False,
          force_paging: bool = False,
          raise_on_crash: bool = False,
-         auto_minimize: bool = False):
+         auto_minimize: bool = False,
+         transport: str = TransportType.NAMED_PIPE,
+         protocol: int = Message.RLGYM_PROTOCOL_V1,
+         game_state_class: type = GameState,
+         reuse_game_states: bool = False,
+         recorder: object = None,
+         profiler: object = None,
+         supervisor: object = None,
+         instance_pool: object = None):
     """
     :param game_speed: The speed the physics will run at, leave it at 100 unless your game can't run at over 240fps
     :param tick_skip: The amount of physics ticks your action will be repeated for
@@ -40,7 +50,9 @@ def make(game_speed: int = 100,
     :param obs_builder: Observation builder object (rlgym.utils.ObsBuilder)
     :param action_parser: Action parser object (rlgym.utils.ActionParser)
     :param state_setter: State Setter object (rlgym.utils.StateSetter)
-    :param launch_preference: Rocket League launch preference (rlgym.gamelaunch.LaunchPreference) or path to RocketLeague executable
+    :param launch_preference: Rocket League launch preference (rlgym.gamelaunch.LaunchPreference) or path to RocketLeague executable.
+                            LaunchPreference.HEADLESS runs the kinematic simulator in rlgym.headless instead of the game,
+                            it needs a transport that works without the plugin, like TransportType.UNIX_SOCKET
     :param use_injector: Whether to use RLGym's bakkesmod injector or not. Enable if launching multiple instances
     :param force_paging: Enable forced paging of each spawned rocket league instance to reduce memory utilization
                             immediately, instead of allowing the OS to slowly page untouched allocations.
@@ -51,6 +63,26 @@ def make(game_speed: int = 100,
     :param raise_on_crash: If enabled, raises an exception when Rocket League crashes instead of attempting to recover.
                             You can attempt a recovery manually by calling attempt_recovery()
     :param auto_minimize: Automatically minimize the game window when launching Rocket League
+    :param transport: How to communicate with the game (rlgym.communication.TransportType). The Bakkesmod plugin uses
+                            named pipes, the unix socket transport is meant for local stand-ins of the plugin on Linux.
+    :param protocol: Message framing (Message.RLGYM_PROTOCOL_V1 or RLGYM_PROTOCOL_V2). Protocol v2 uses a fixed size binary
+                            header that is cheaper to decode, but the game side must support it too.
+    :param game_state_class: The class game states are decoded into (GameState or ArrayGameState). ArrayGameState keeps all
+                            car data in (n_cars, k) arrays of a single buffer, for obs builders and rewards that work on
+                            all cars at once.
+    :param reuse_game_states: Decode every state in place into one of two preallocated states instead of creating a new
+                            one per step. States (like info['state']) are overwritten two steps later, keep them with
+                            state.copy().
+    :param recorder: A rlgym.recording.TrajectoryRecorder to record the state packets, actions, rewards and done flags of
+                            every step to memory mapped files, read them back with rlgym.recording.TrajectoryReader.
+    :param profiler: A rlgym.utils.step_profiler.StepProfiler to time every phase of the steps and resets, see its
+                            summary() and to_json().
+    :param supervisor: A rlgym.gamelaunch.InstanceSupervisor to get the game from. A crashed or frozen game is swapped for
+                            one of its standby games instead of being relaunched, launch_preference, transport and
+                            protocol are then those of the supervisor.
+    :param instance_pool: A rlgym.gamelaunch.InstancePool, like the process wide rlgym.gamelaunch.get_instance_pool(), to
+                            take an idle game from instead of launching one. Closing the Gym gives the game back to the
+                            pool, so the next make() only sends its new config.
     :return: Gym object
     [1]: https://www.tomshardware.com/news/how-to-manage-virtual-memory-pagefile-windows-10,36929.html
     """
@@ -76,7 +108,11 @@ def make(game_speed: int = 100,
                   game_speed=game_speed,
                   gravity=gravity,
                   boost_consumption=boost_consumption,
-                  spawn_opponents=spawn_opponents)
+                  spawn_opponents=spawn_opponents,
+                  game_state_class=game_state_class,
+                  reuse_game_states=reuse_game_states)
 
     return Gym(match, pipe_id=os.getpid(), launch_preference=launch_preference, use_injector=use_injector,
-               force_paging=force_paging, raise_on_crash=raise_on_crash, auto_minimize=auto_minimize)
+               force_paging=force_paging, raise_on_crash=raise_on_crash, auto_minimize=auto_minimize,
+               transport=transport, protocol=protocol, recorder=recorder,
+               profiler=profiler, supervisor=supervisor, instance_pool=instance_pool)
@@ -0,0 +1,3 @@
+from .recorder import TrajectoryRecorder
+from .reader import TrajectoryReader
+from .replay import ReplayEngine
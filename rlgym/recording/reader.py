@@ -0,0 +1,101 @@
+"""
+Reads the recordings of a TrajectoryRecorder back, decoding the states only when they are accessed.
+"""
+import json
+import os
+from typing import List, Tuple, Iterator
+
+import numpy as np
+
+from rlgym.recording.recorder import FIELDS, chunk_path
+from rlgym.utils.gamestates import GameState
+
+
+class TrajectoryReader(object):
+    """
+    Memory maps every chunk written by a `TrajectoryRecorder` to a directory. Steps are numbered from 0 across all
+    chunks, the arrays of each chunk are available through `get_arrays` and states are only decoded by `get_state`.
+    """
+
+    def __init__(self, directory: str, game_state_class: type = GameState):
+        """
+        :param directory: The directory the recorder wrote to.
+        :param game_state_class: The class states are decoded into, GameState or ArrayGameState.
+        """
+        self.directory = directory
+        self.game_state_class = game_state_class
+
+        self._chunks = []
+        chunk_index = 0
+        while os.path.exists(chunk_path(directory, chunk_index, "meta.json")):
+            with open(chunk_path(directory, chunk_index, "meta.json")) as f:
+                steps = json.load(f)["steps"]
+            if steps > 0:
+                self._chunks.append({name: np.load(chunk_path(directory, chunk_index, name + ".npy"),
+                                                   mmap_mode="r")[:steps]
+                                     for name in FIELDS})
+            chunk_index += 1
+
+        self._ends = np.cumsum([len(chunk["dones"]) for chunk in self._chunks], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return int(self._ends[-1]) if len(self._ends) else 0
+
+    def get_arrays(self, name: str) -> List[np.ndarray]:
+        """
+        The read only arrays of a field, one per chunk. The field is one of "packets", "actions", "rewards", "dones" or
+        "resets", see `TrajectoryRecorder`. Chunks with a different number of players have different shapes.
+        """
+        return [chunk[name] for chunk in self._chunks]
+
+    def locate(self, index: int) -> Tuple[int, int]:
+        """
+        :return: The chunk index and the row inside that chunk of a step.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Step {} out of range for {} recorded steps".format(index, len(self)))
+
+        chunk_index = int(np.searchsorted(self._ends, index, side="right"))
+        start = self._ends[chunk_index - 1] if chunk_index > 0 else 0
+        return chunk_index, int(index - start)
+
+    def get_state(self, index: int) -> GameState:
+        """
+        Decodes the state of a step.
+        """
+        chunk, row = self._locate(index)
+        return self.game_state_class(np.asarray(chunk["packets"][row]))
+
+    def get_step(self, index: int) -> Tuple[GameState, np.ndarray, np.ndarray, bool, bool]:
+        """
+        :return: A tuple containing (state, actions, rewards, done, reset) of a step, the actions are those that led to
+                 the state.
+        """
+        chunk, row = self._locate(index)
+        return self.get_state(index), chunk["actions"][row], chunk["rewards"][row], bool(chunk["dones"][row]), \
+            bool(chunk["resets"][row])
+
+    def iter_states(self, start: int = 0, stop: int = None) -> Iterator[GameState]:
+        """
+        Decodes the states of steps `start` to `stop` one at a time.
+        """
+        stop = len(self) if stop is None else stop
+        for index in range(start, stop):
+            yield self.get_state(index)
+
+    def get_episodes(self) -> List[Tuple[int, int]]:
+        """
+        :return: The (start, stop) step ranges of the recorded episodes, each starting at a reset.
+        """
+        if len(self) == 0:
+            return []
+
+        starts = np.flatnonzero(np.concatenate(self.get_arrays("resets")))
+        bounds = np.append(starts, len(self))
+        return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    def _locate(self, index: int):
+        chunk_index, row = self.locate(index)
+        return self._chunks[chunk_index], row
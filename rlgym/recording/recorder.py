@@ -0,0 +1,175 @@
+"""
+Records the raw state packets, actions, rewards and done flags of a Gym into memory mapped .npy files.
+"""
+import json
+import os
+from queue import Queue
+from threading import Thread
+from typing import Union, List
+
+import numpy as np
+
+from rlgym.utils.gamestates import GameState
+
+PLAYERS_START = 3 + GameState.BOOST_PADS_LENGTH + GameState.BALL_STATE_LENGTH
+FIELDS = ("packets", "actions", "rewards", "dones", "resets")
+_FLUSH = object()
+
+
+def chunk_path(directory: str, chunk_index: int, name: str) -> str:
+    return os.path.join(directory, "chunk_{:06d}_{}".format(chunk_index, name))
+
+
+class TrajectoryRecorder(object):
+    """
+    Appends every step of a Gym to chunks of preallocated memory mapped .npy files, one per field:
+
+    - packets: (chunk_size, packet_length) float32, the state packets as sent by the game.
+    - actions: (chunk_size, n_players, 8) float32, the parsed actions that led to the state, zeros after a reset.
+    - rewards: (chunk_size, n_players) float32, zeros after a reset.
+    - dones: (chunk_size,) bool.
+    - resets: (chunk_size,) bool, whether the state is the first one of an episode.
+
+    The number of steps written to each chunk is kept in a small json file next to it. The arrays are copied on the
+    calling thread and written to the files by a background thread, so recording only costs the copies.
+
+    Read the recordings back with `TrajectoryReader`.
+    """
+
+    def __init__(self, directory: str, chunk_size: int = 10000, max_queued_steps: int = 10000):
+        """
+        :param directory: The directory to write the chunks to, created if needed. Existing chunks are appended to.
+        :param chunk_size: The number of steps per chunk. A chunk also ends when the number of players changes.
+        :param max_queued_steps: How many steps may wait for the writer thread before recording blocks.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_size = chunk_size
+
+        self._chunk_index = len([f for f in os.listdir(directory) if f.endswith(".json")])
+        self._chunk = None
+        self._steps = 0
+        self._error = None
+
+        self._queue = Queue(maxsize=max_queued_steps)
+        self._thread = Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def record_reset(self, packet: Union[List[float], np.ndarray]):
+        """
+        Records the first state of an episode.
+
+        :param packet: The state packet. The recorder copies it before returning, so it may be a view of a transport
+                       buffer.
+        """
+        self._put(packet, None, None, False, True)
+
+    def record_step(self, packet: Union[List[float], np.ndarray], actions: np.ndarray,
+                    rewards: Union[float, List, np.ndarray], done: bool):
+        """
+        Records a step.
+
+        :param packet: The state packet. The recorder copies it before returning, so it may be a view of a transport
+                       buffer.
+        :param actions: The parsed actions that were sent before receiving the state, one row per car.
+        :param rewards: The rewards of the step, one per player.
+        :param done: Whether the state is terminal.
+        """
+        self._put(packet, actions, rewards, done, False)
+
+    def flush(self):
+        """
+        Waits until every recorded step is written and updates the step count of the current chunk.
+        """
+        if self._thread.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+        self._raise_writer_error()
+
+    def close(self):
+        """
+        Writes the remaining steps and stops the writer thread.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_writer_error()
+
+    def _put(self, packet, actions, rewards, done, reset):
+        self._raise_writer_error()
+        assert self._thread.is_alive(), "Recording to a closed TrajectoryRecorder"
+        # The only copy of the packet, the Gym passes the view of the transport buffer that the next message reuses.
+        packet = np.array(packet, dtype=np.float32)
+        if actions is not None:
+            actions = np.array(actions, dtype=np.float32)
+            rewards = np.array(rewards, dtype=np.float32).reshape(-1)
+        self._queue.put((packet, actions, rewards, done, reset))
+
+    def _raise_writer_error(self):
+        if self._error is not None:
+            raise RuntimeError("The trajectory writer thread failed") from self._error
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    self._close_chunk()
+                    return
+                if item is _FLUSH:
+                    if self._chunk is not None:
+                        self._write_meta()
+                elif self._error is None:
+                    self._write(*item)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, packet: np.ndarray, actions: np.ndarray, rewards: np.ndarray, done: bool, reset: bool):
+        if self._chunk is None or self._steps == self.chunk_size or \
+                self._chunk["packets"].shape[1] != packet.shape[0]:
+            self._open_chunk(packet.shape[0])
+
+        chunk, row = self._chunk, self._steps
+        chunk["packets"][row] = packet
+        if actions is not None:
+            chunk["actions"][row, :len(actions)] = actions
+            chunk["rewards"][row, :len(rewards)] = rewards
+        chunk["dones"][row] = done
+        chunk["resets"][row] = reset
+        self._steps += 1
+
+    def _open_chunk(self, packet_length: int):
+        self._close_chunk()
+
+        num_players = (packet_length - PLAYERS_START) // GameState.PLAYER_INFO_LENGTH
+        shapes = {
+            "packets": ((self.chunk_size, packet_length), np.float32),
+            "actions": ((self.chunk_size, num_players, 8), np.float32),
+            "rewards": ((self.chunk_size, num_players), np.float32),
+            "dones": ((self.chunk_size,), bool),
+            "resets": ((self.chunk_size,), bool)
+        }
+        self._chunk = {name: np.lib.format.open_memmap(chunk_path(self.directory, self._chunk_index, name + ".npy"),
+                                                       mode="w+", dtype=dtype, shape=shape)
+                       for name, (shape, dtype) in shapes.items()}
+        self._steps = 0
+        self._write_meta()
+
+    def _close_chunk(self):
+        if self._chunk is None:
+            return
+
+        for array in self._chunk.values():
+            array.flush()
+        self._write_meta()
+        self._chunk = None
+        self._chunk_index += 1
+
+    def _write_meta(self):
+        # Replaced atomically, so a reader never sees a partial file.
+        path = chunk_path(self.directory, self._chunk_index, "meta.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump({"steps": self._steps, "packet_length": self._chunk["packets"].shape[1]}, f)
+        os.replace(path + ".tmp", path)
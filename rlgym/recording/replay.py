@@ -0,0 +1,183 @@
+"""
+Recomputes observations, rewards and terminal flags over recorded trajectories, without the game.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Tuple, Sequence
+
+import numpy as np
+
+from rlgym.recording.reader import TrajectoryReader
+from rlgym.recording.recorder import chunk_path
+from rlgym.utils import ObsBuilder, RewardFunction, TerminalCondition
+from rlgym.utils.batching import overrides_batch
+from rlgym.utils.gamestates import ArrayGameState
+
+OUTPUT_FIELDS = ("obs", "rewards", "terminals")
+
+
+class ReplayEngine(object):
+    """
+    Runs an ObsBuilder, a RewardFunction and TerminalConditions over the recordings of a `TrajectoryRecorder`, episode
+    by episode like Match does: the objects are reset on the first state of each episode and every following state goes
+    through `pre_step`, the observations and the rewards with the actions recorded for it.
+
+    The episodes are split between worker processes. Each worker builds its own objects with `make_pipeline` and reads
+    the recordings through memory maps, so only episode ranges are sent to it. The results are written to .npy files in
+    `output_directory`, one set per recorded chunk with the same step rows:
+
+    - chunk_xxxxxx_obs.npy: (steps, n_players, *obs_shape) float32.
+    - chunk_xxxxxx_rewards.npy: (steps, n_players) float32.
+    - chunk_xxxxxx_terminals.npy: (steps,) bool, whether the terminal conditions ended the episode at that step.
+
+    Rewards are computed with `get_final_reward` on the steps where the terminal conditions end the episode and on the
+    steps that were recorded as done.
+    """
+
+    def __init__(self, directory: str, make_pipeline: Callable[[], Tuple[ObsBuilder, RewardFunction,
+                                                                         Sequence[TerminalCondition]]],
+                 game_state_class: type = ArrayGameState, num_workers: int = None):
+        """
+        :param directory: The directory of the recordings.
+        :param make_pipeline: Creates a new (obs_builder, reward_function, terminal_conditions) tuple. It has to be
+                              picklable, like a module level function, when using more than one worker.
+        :param game_state_class: The class the packets are decoded into.
+        :param num_workers: The number of worker processes, defaults to the number of CPUs. With 1 everything runs in
+                            the calling process.
+        """
+        self.directory = directory
+        self.make_pipeline = make_pipeline
+        self.game_state_class = game_state_class
+        self.num_workers = num_workers if num_workers is not None else os.cpu_count() or 1
+
+    def run(self, output_directory: str, episodes_per_task: int = 64):
+        """
+        Replays every recorded episode and writes the results to `output_directory`, see the class documentation.
+
+        :param output_directory: The directory to write the results to, created if needed.
+        :param episodes_per_task: How many episodes are sent to a worker at once.
+        """
+        os.makedirs(output_directory, exist_ok=True)
+        reader = TrajectoryReader(self.directory, self.game_state_class)
+        self._allocate_outputs(reader, output_directory)
+
+        episodes = reader.get_episodes()
+        tasks = [(self.directory, output_directory, self.make_pipeline, self.game_state_class,
+                  episodes[i:i + episodes_per_task]) for i in range(0, len(episodes), episodes_per_task)]
+
+        if self.num_workers <= 1:
+            for task in tasks:
+                _replay_episodes(*task)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+            # Consuming the results raises the exceptions of the workers.
+            for _ in executor.map(_replay_episodes, *zip(*tasks)):
+                pass
+
+    @staticmethod
+    def load_outputs(output_directory: str, name: str) -> List[np.ndarray]:
+        """
+        The read only arrays of an output field ("obs", "rewards" or "terminals"), one per recorded chunk.
+        """
+        arrays = []
+        chunk_index = 0
+        while os.path.exists(chunk_path(output_directory, chunk_index, name + ".npy")):
+            arrays.append(np.load(chunk_path(output_directory, chunk_index, name + ".npy"), mmap_mode="r"))
+            chunk_index += 1
+        return arrays
+
+    def _allocate_outputs(self, reader: TrajectoryReader, output_directory: str):
+        obs_shapes = {}
+        for chunk_index, packets in enumerate(reader.get_arrays("packets")):
+            num_steps = len(packets)
+            state = self.game_state_class(np.asarray(packets[0]))
+            num_players = len(state.players)
+            if num_players not in obs_shapes:
+                obs_shapes[num_players] = self._probe_obs_shape(state)
+
+            shapes = {
+                "obs": ((num_steps, num_players) + obs_shapes[num_players], np.float32),
+                "rewards": ((num_steps, num_players), np.float32),
+                "terminals": ((num_steps,), bool)
+            }
+            for name, (shape, dtype) in shapes.items():
+                array = np.lib.format.open_memmap(chunk_path(output_directory, chunk_index, name + ".npy"), mode="w+",
+                                                  dtype=dtype, shape=shape)
+                del array
+
+    def _probe_obs_shape(self, state) -> tuple:
+        obs_builder, _, _ = self.make_pipeline()
+        obs_builder.reset(state)
+        obs_builder.pre_step(state)
+        obs = obs_builder.build_obs(state.players[0], state, np.zeros(8))
+        return np.shape(obs)
+
+
+def _replay_episodes(directory: str, output_directory: str, make_pipeline: Callable, game_state_class: type,
+                     episodes: List[Tuple[int, int]]):
+    reader = TrajectoryReader(directory, game_state_class)
+    packets, actions, dones = reader.get_arrays("packets"), reader.get_arrays("actions"), reader.get_arrays("dones")
+    outputs = {name: [np.load(chunk_path(output_directory, i, name + ".npy"), mmap_mode="r+")
+                      for i in range(len(packets))]
+               for name in OUTPUT_FIELDS}
+
+    obs_builder, reward_fn, terminal_conditions = make_pipeline()
+    batch_obs = overrides_batch(obs_builder, ObsBuilder, "build_obs_batch", "build_obs")
+    # Like Match, batched rewards only on array states.
+    batch_rewards = issubclass(game_state_class, ArrayGameState) and \
+        overrides_batch(reward_fn, RewardFunction, "get_rewards_batch", "get_reward", "get_final_reward")
+
+    for start, stop in episodes:
+        index = start
+        while index < stop:
+            # The part of the episode inside one chunk is read and decoded at once.
+            chunk_index, first_row = reader.locate(index)
+            last_row = min(first_row + stop - index, len(packets[chunk_index]))
+            chunk_packets = np.asarray(packets[chunk_index][first_row:last_row])
+            chunk_actions = np.asarray(actions[chunk_index][first_row:last_row], dtype=float)
+            chunk_dones = np.asarray(dones[chunk_index][first_row:last_row])
+            if issubclass(game_state_class, ArrayGameState):
+                chunk_states = game_state_class.decode_batch(chunk_packets)
+            else:
+                chunk_states = [game_state_class(packet) for packet in chunk_packets]
+            obs_out, rewards_out, terminals_out = (outputs[name][chunk_index] for name in OUTPUT_FIELDS)
+
+            for i, row in enumerate(range(first_row, last_row)):
+                state = chunk_states[i]
+                if index == start:
+                    # Like Match.episode_reset, the previous actions are zeros on the first state.
+                    for condition in terminal_conditions:
+                        condition.reset(state)
+                    reward_fn.reset(state)
+                    obs_builder.reset(state)
+                    prev_actions = np.zeros((len(state.players), 8))
+                else:
+                    prev_actions = chunk_actions[i]
+
+                obs_builder.pre_step(state)
+                if batch_obs:
+                    obs_out[row] = obs_builder.build_obs_batch(state, prev_actions)
+                else:
+                    obs_out[row] = [obs_builder.build_obs(player, state, prev_actions[j])
+                                    for j, player in enumerate(state.players)]
+
+                # Match computes no rewards on the first state.
+                if index != start:
+                    # Like Match.is_done, stopping at the first condition that is met.
+                    terminal = any(condition.is_terminal(state) for condition in terminal_conditions)
+                    done = terminal or bool(chunk_dones[i])
+
+                    reward_fn.pre_step(state)
+                    if batch_rewards:
+                        rewards_out[row] = reward_fn.get_rewards_batch(state, prev_actions, done)
+                    else:
+                        get_reward = reward_fn.get_final_reward if done else reward_fn.get_reward
+                        rewards_out[row] = [get_reward(player, state, prev_actions[j])
+                                            for j, player in enumerate(state.players)]
+                    terminals_out[row] = terminal
+                index += 1
+
+    for arrays in outputs.values():
+        for array in arrays:
+            array.flush()
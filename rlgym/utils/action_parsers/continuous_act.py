@@ -24,8 +24,8 @@ class ContinuousAction(ActionParser):
     def parse_actions(self, actions: np.ndarray, state: GameState) -> np.ndarray:
         actions = actions.reshape((-1, 8))
 
-        # actions[..., :5] = actions[..., :5].clip(-1, 1)
-        actions[..., :5] = math.clip_1d(actions[..., :5], -1, 1)
+        # Clipped in place, actions is already a copy made by Match.parse_actions.
+        math.clip_1d(actions[..., :5], -1, 1)
         # The final 3 actions handle are jump, boost and handbrake.
         # They are inherently discrete, so we convert them to either 0 or 1.
         actions[..., 5:] = actions[..., 5:] > 0
@@ -0,0 +1,26 @@
+"""
+Helpers for the optional batched versions of the per player methods, like ObsBuilder.build_obs_batch.
+"""
+
+
+def overrides_batch(obj, base: type, batch_method: str, *methods: str) -> bool:
+    """
+    Whether `obj` has its own batched version of `methods`, instead of the default one from `base` that calls them for
+    every player. A subclass that changes one of `methods` but inherits the batched version of its parent does not,
+    since that would skip its changes.
+
+    :param obj: The object to check, like an ObsBuilder.
+    :param base: The base class with the default batched method.
+    :param batch_method: The name of the batched method.
+    :param methods: The names of the per player methods it replaces.
+    """
+    mro = type(obj).__mro__
+    batch_owner = next(cls for cls in mro if batch_method in vars(cls))
+    if batch_owner is base:
+        return False
+
+    for method in methods:
+        owner = next(cls for cls in mro if method in vars(cls))
+        if not issubclass(batch_owner, owner):
+            return False
+    return True
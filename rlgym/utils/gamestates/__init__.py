@@ -1,3 +1,4 @@
 from .physics_object import PhysicsObject
 from .player_data import PlayerData
-from .game_state import GameState
\ No newline at end of file
+from .game_state import GameState
+from .array_game_state import ArrayGameState
@@ -0,0 +1,355 @@
+"""
+    A GameState that keeps the whole packet in one NumPy buffer, with per field arrays for all cars.
+"""
+from typing import List, Union
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+from rlgym.utils import math
+from rlgym.utils.gamestates.game_state import GameState
+from rlgym.utils.gamestates.physics_object import PhysicsObject
+from rlgym.utils.gamestates.player_data import PlayerData
+
+# Column offsets inside a player packet, see GameState._decode_player.
+CAR_ID, TEAM_NUM = 0, 1
+CAR_DATA = 2
+INVERTED_CAR_DATA = CAR_DATA + GameState.PLAYER_CAR_STATE_LENGTH
+TERTIARY_DATA = INVERTED_CAR_DATA + GameState.PLAYER_CAR_STATE_LENGTH
+MATCH_GOALS, MATCH_SAVES, MATCH_SHOTS, MATCH_DEMOLISHES, BOOST_PICKUPS, IS_DEMOED, ON_GROUND, BALL_TOUCHED, HAS_JUMP, \
+    HAS_FLIP, BOOST_AMOUNT = range(TERTIARY_DATA, TERTIARY_DATA + GameState.PLAYER_TERTIARY_INFO_LENGTH)
+
+HEADER_LENGTH = 3
+PLAYERS_START = HEADER_LENGTH + GameState.BOOST_PADS_LENGTH + GameState.BALL_STATE_LENGTH
+PLAYER_INFO_LENGTH = GameState.PLAYER_INFO_LENGTH
+
+
+def _njit(func):
+    # Without numba the packets are decoded by the NumPy versions of the kernels instead, see below.
+    return func if numba is None else numba.njit(cache=True)(func)
+
+
+@_njit
+def _decode_packet_jit(packet: np.ndarray, buffer: np.ndarray, order: np.ndarray) -> int:
+    """
+    Copies a state packet into `buffer` with the player rows sorted by car id, the packet index of each row is written
+    to `order`. Works on float32 (protocol v2) and float64 packets alike.
+
+    :return: The car id of the last car in packet order that touched the ball, or -1.
+    """
+    num_cars = order.shape[0]
+    for i in range(PLAYERS_START):
+        buffer[i] = packet[i]
+
+    # Insertion sort, there are at most 8 cars and it is stable like sorted().
+    for i in range(num_cars):
+        order[i] = i
+    for i in range(1, num_cars):
+        j = i
+        while j > 0 and packet[PLAYERS_START + order[j - 1] * PLAYER_INFO_LENGTH] > \
+                packet[PLAYERS_START + order[j] * PLAYER_INFO_LENGTH]:
+            order[j - 1], order[j] = order[j], order[j - 1]
+            j -= 1
+
+    last_touch = -1
+    for row in range(num_cars):
+        src = PLAYERS_START + order[row] * PLAYER_INFO_LENGTH
+        dst = PLAYERS_START + row * PLAYER_INFO_LENGTH
+        for k in range(PLAYER_INFO_LENGTH):
+            buffer[dst + k] = packet[src + k]
+
+        # The touches are read in packet order, not sorted order.
+        packet_row = PLAYERS_START + row * PLAYER_INFO_LENGTH
+        if packet[packet_row + BALL_TOUCHED] > 0:
+            last_touch = int(packet[packet_row + CAR_ID])
+
+    return last_touch
+
+
+@_njit
+def _decode_packets_jit(packets: np.ndarray, buffers: np.ndarray, orders: np.ndarray, last_touches: np.ndarray):
+    for n in range(packets.shape[0]):
+        last_touches[n] = _decode_packet_jit(packets[n], buffers[n], orders[n])
+
+
+def _decode_packet_numpy(packet: np.ndarray, buffer: np.ndarray, order: np.ndarray) -> int:
+    # Same results as _decode_packet_jit, the stable argsort keeps cars with equal ids in packet order.
+    num_cars = order.shape[0]
+    end = PLAYERS_START + num_cars * PLAYER_INFO_LENGTH
+    players = packet[PLAYERS_START:end].reshape(num_cars, PLAYER_INFO_LENGTH)
+    order[:] = np.argsort(players[:, CAR_ID], kind='stable')
+    buffer[:PLAYERS_START] = packet[:PLAYERS_START]
+    buffer[PLAYERS_START:end].reshape(num_cars, PLAYER_INFO_LENGTH)[:] = players[order]
+
+    touched = np.flatnonzero(players[:, BALL_TOUCHED] > 0)
+    return int(players[touched[-1], CAR_ID]) if len(touched) > 0 else -1
+
+
+def _decode_packets_numpy(packets: np.ndarray, buffers: np.ndarray, orders: np.ndarray, last_touches: np.ndarray):
+    for n in range(packets.shape[0]):
+        last_touches[n] = _decode_packet_numpy(packets[n], buffers[n], orders[n])
+
+
+if numba is not None:
+    _decode_packet, _decode_packets = _decode_packet_jit, _decode_packets_jit
+else:
+    _decode_packet, _decode_packets = _decode_packet_numpy, _decode_packets_numpy
+
+
+class PhysicsObjectView(PhysicsObject):
+    """
+    A PhysicsObject whose vectors are views into an ArrayGameState buffer, so it never has to be rebuilt.
+    """
+
+    def __init__(self, data: np.ndarray, is_ball: bool = False, rotation_mtx: np.ndarray = None,
+                 euler_angles: np.ndarray = None):
+        # Not calling PhysicsObject.__init__, everything it allocates is replaced right away.
+        self._euler_angles, self._rotation_mtx = euler_angles, rotation_mtx
+        # Cars get their orientation from the batched conversion in ArrayGameState.decode.
+        self._has_computed_rot_mtx = rotation_mtx is not None
+        self._has_computed_euler_angles = euler_angles is not None
+        if is_ball:
+            self.position, self.quaternion, self.linear_velocity, self.angular_velocity = \
+                data[:3], None, data[3:6], data[6:9]
+        else:
+            self.position, self.quaternion, self.linear_velocity, self.angular_velocity = \
+                data[:3], data[3:7], data[7:10], data[10:13]
+
+    def invalidate(self):
+        self._has_computed_rot_mtx = False
+        self._has_computed_euler_angles = False
+
+
+def _column(index: int, kind: type):
+    return property(lambda self: kind(self._row[index]))
+
+
+def _flag(index: int):
+    return property(lambda self: bool(self._row[index] > 0))
+
+
+class PlayerDataView(PlayerData):
+    """
+    A PlayerData that reads its values from one row of an ArrayGameState buffer.
+    """
+    car_id = _column(CAR_ID, int)
+    team_num = _column(TEAM_NUM, int)
+    match_goals = _column(MATCH_GOALS, int)
+    match_saves = _column(MATCH_SAVES, int)
+    match_shots = _column(MATCH_SHOTS, int)
+    match_demolishes = _column(MATCH_DEMOLISHES, int)
+    boost_pickups = _column(BOOST_PICKUPS, int)
+    is_demoed = _flag(IS_DEMOED)
+    on_ground = _flag(ON_GROUND)
+    ball_touched = _flag(BALL_TOUCHED)
+    has_jump = _flag(HAS_JUMP)
+    has_flip = _flag(HAS_FLIP)
+    boost_amount = _column(BOOST_AMOUNT, float)
+
+    def __init__(self, row: np.ndarray, rotation_mtx: np.ndarray, euler_angles: np.ndarray,
+                 inverted_rotation_mtx: np.ndarray, inverted_euler_angles: np.ndarray):
+        # PlayerData.__init__ would try to assign the properties above.
+        self._row = row
+        self.car_data = PhysicsObjectView(row[CAR_DATA:INVERTED_CAR_DATA], rotation_mtx=rotation_mtx,
+                                          euler_angles=euler_angles)
+        self.inverted_car_data = PhysicsObjectView(row[INVERTED_CAR_DATA:TERTIARY_DATA],
+                                                   rotation_mtx=inverted_rotation_mtx,
+                                                   euler_angles=inverted_euler_angles)
+
+
+class ArrayGameState(GameState):
+    """
+    A drop in replacement for GameState that stores the packet, with players sorted by car id, in a single float64
+    buffer. Every field is also available for all cars at once as an (n_cars, k) view of that buffer, like
+    `car_positions` or `boost_amounts`, and `players` holds PlayerData views of the same memory.
+
+    The rotation matrices and euler angles of all cars are computed in one batched call per decode, into
+    `car_rotation_mtxs` / `car_euler_angles` and their inverted versions, which also back the PhysicsObject caches.
+
+    Both sides of the field are also available together, `ball_states` (2, 9), `car_states` (2, n_cars, 13),
+    `rotation_mtxs` (2, n_cars, 3, 3) and `euler_angles` (2, n_cars, 3) hold the normal values at index 0 and the
+    inverted ones at index 1, so indexing them with the team number of a player gives its own perspective.
+
+    Decoding into an existing ArrayGameState with the same number of cars reuses the buffer and all the views.
+    """
+
+    def __init__(self, state_floats: Union[List[float], np.ndarray] = None):
+        self.game_type, self.blue_score, self.orange_score, self.last_touch = 0, -1, -1, -1
+        self.players = []
+        self.buffer = None
+        self.num_cars = -1
+        if state_floats is not None:
+            self.decode(state_floats)
+
+    @classmethod
+    def from_state(cls, state: GameState, out: 'ArrayGameState' = None) -> 'ArrayGameState':
+        """
+        Returns `state` itself if it already is an ArrayGameState, otherwise a copy of it in an ArrayGameState. Batched
+        code uses this to get the per field arrays of any state, a Match built with `game_state_class=ArrayGameState`
+        skips the copy. A decoded GameState is copied from its packet, others are encoded from their objects.
+
+        :param state: The state to convert.
+        :param out: An ArrayGameState to copy into, decoding into the same object every step reuses its arrays.
+        """
+        if isinstance(state, ArrayGameState):
+            return state
+
+        # Decoded states still have their packet, the objects only hold views of it.
+        packet = getattr(state, "state_vals", None)
+        if packet is None:
+            packet = cls._encode(state)
+
+        array_state = out if out is not None else cls()
+        array_state.decode(packet)
+        array_state.game_type, array_state.last_touch = state.game_type, state.last_touch
+        return array_state
+
+    @staticmethod
+    def _encode(state: GameState) -> np.ndarray:
+        packet = np.zeros(PLAYERS_START + len(state.players) * PLAYER_INFO_LENGTH)
+        packet[1], packet[2] = state.blue_score, state.orange_score
+        start = HEADER_LENGTH
+        packet[start:start + GameState.BOOST_PADS_LENGTH] = state.boost_pads
+        start += GameState.BOOST_PADS_LENGTH
+        for ball in (state.ball, state.inverted_ball):
+            packet[start:start + 3] = ball.position
+            packet[start + 3:start + 6] = ball.linear_velocity
+            packet[start + 6:start + 9] = ball.angular_velocity
+            start += GameState.BALL_STATE_LENGTH // 2
+
+        for player in state.players:
+            packet[start + CAR_ID], packet[start + TEAM_NUM] = player.car_id, player.team_num
+            for car, car_start in ((player.car_data, start + CAR_DATA), (player.inverted_car_data,
+                                                                         start + INVERTED_CAR_DATA)):
+                packet[car_start:car_start + 3] = car.position
+                packet[car_start + 3:car_start + 7] = car.quaternion
+                packet[car_start + 7:car_start + 10] = car.linear_velocity
+                packet[car_start + 10:car_start + 13] = car.angular_velocity
+            packet[start + MATCH_GOALS:start + PLAYER_INFO_LENGTH] = \
+                [player.match_goals, player.match_saves, player.match_shots, player.match_demolishes,
+                 player.boost_pickups, player.is_demoed, player.on_ground, player.ball_touched, player.has_jump,
+                 player.has_flip, player.boost_amount]
+            start += PLAYER_INFO_LENGTH
+
+        return packet
+
+    def decode(self, state_vals: Union[List[float], np.ndarray]):
+        """
+        Decode a packet from the Bakkesmod plugin into the buffer of this state.
+
+        :param state_vals: The game state as a list of floats, or a float array when using protocol v2.
+        """
+        assert type(state_vals) in (list, np.ndarray), "UNABLE TO DECODE STATE OF TYPE {}".format(type(state_vals))
+        if type(state_vals) == list:
+            state_vals = np.array(state_vals, dtype=np.float64)
+        num_cars = (len(state_vals) - PLAYERS_START) // PLAYER_INFO_LENGTH
+        if num_cars != self.num_cars:
+            self._allocate(num_cars)
+        else:
+            self._invalidate_views()
+
+        self.last_touch = _decode_packet(state_vals, self.buffer, self.sort_order)
+        self.blue_score, self.orange_score = int(self.buffer[1]), int(self.buffer[2])
+
+        math.quat_to_rot_mtx_batch(self.car_quaternions, out=self.car_rotation_mtxs)
+        math.quat_to_rot_mtx_batch(self.inverted_car_quaternions, out=self.inverted_car_rotation_mtxs)
+        math.quat_to_euler_batch(self.car_quaternions, out=self.car_euler_angles)
+        math.quat_to_euler_batch(self.inverted_car_quaternions, out=self.inverted_car_euler_angles)
+
+    @classmethod
+    def decode_batch(cls, packets: np.ndarray) -> List['ArrayGameState']:
+        """
+        Decodes packets with the same number of cars all at once, like a chunk of recorded steps. The packets are sorted
+        in one kernel call into one shared buffer, and the car orientations of all of them are computed in one batched
+        call.
+
+        :param packets: The packets, one per row, float32 or float64.
+        :return: One state per packet, each a view of its own row of the shared buffers.
+        """
+        packets = np.asarray(packets)
+        num_packets = len(packets)
+        num_cars = (packets.shape[1] - PLAYERS_START) // PLAYER_INFO_LENGTH
+        buffers = np.zeros((num_packets, packets.shape[1]))
+        sort_orders = np.zeros((num_packets, num_cars), dtype=np.int64)
+        last_touches = np.empty(num_packets, dtype=np.int64)
+        _decode_packets(packets, buffers, sort_orders, last_touches)
+
+        cars = buffers[:, PLAYERS_START:].reshape(num_packets, num_cars, PLAYER_INFO_LENGTH)
+        rotation_mtxs = np.empty((num_packets, 2, num_cars, 3, 3))
+        euler_angles = np.empty((num_packets, 2, num_cars, 3))
+        for side, start in enumerate((CAR_DATA, INVERTED_CAR_DATA)):
+            quaternions = cars[:, :, start + 3:start + 7].reshape(-1, 4)
+            rotation_mtxs[:, side] = math.quat_to_rot_mtx_batch(quaternions).reshape(num_packets, num_cars, 3, 3)
+            euler_angles[:, side] = math.quat_to_euler_batch(quaternions).reshape(num_packets, num_cars, 3)
+
+        states = []
+        for i in range(num_packets):
+            state = cls()
+            state._allocate(num_cars, buffers[i], sort_orders[i], rotation_mtxs[i], euler_angles[i])
+            state.last_touch = int(last_touches[i])
+            state.blue_score, state.orange_score = int(buffers[i, 1]), int(buffers[i, 2])
+            states.append(state)
+        return states
+
+    def copy(self) -> 'ArrayGameState':
+        """
+        Returns an independent copy of this state, with its own buffer.
+        """
+        # The buffer is a packet with the players already sorted, decoding it copies it.
+        state = ArrayGameState(self.buffer)
+        state.game_type, state.last_touch = self.game_type, self.last_touch
+        return state
+
+    def _invalidate_views(self):
+        # The car orientations are recomputed in place by decode, only the ball caches are stale.
+        self.ball.invalidate()
+        self.inverted_ball.invalidate()
+
+    def _allocate(self, num_cars: int, buffer: np.ndarray = None, sort_order: np.ndarray = None,
+                  rotation_mtxs: np.ndarray = None, euler_angles: np.ndarray = None):
+        # decode_batch passes rows of arrays shared by several states.
+        self.num_cars = num_cars
+        self.buffer = buffer if buffer is not None else np.zeros(PLAYERS_START + num_cars * PLAYER_INFO_LENGTH)
+        self.sort_order = sort_order if sort_order is not None else np.zeros(num_cars, dtype=np.int64)
+
+        start = HEADER_LENGTH
+        self.boost_pads = self.buffer[start:start + GameState.BOOST_PADS_LENGTH]
+        self.inverted_boost_pads = self.boost_pads[::-1]
+        start += GameState.BOOST_PADS_LENGTH
+        # Both sides of the field at once, index 0 is the normal state and index 1 the inverted one.
+        self.ball_states = self.buffer[start:PLAYERS_START].reshape(2, GameState.BALL_STATE_LENGTH // 2)
+        self.ball = PhysicsObjectView(self.ball_states[0], is_ball=True)
+        self.inverted_ball = PhysicsObjectView(self.ball_states[1], is_ball=True)
+
+        self.cars = self.buffer[PLAYERS_START:].reshape(num_cars, PLAYER_INFO_LENGTH)
+        self.car_states = self.cars[:, CAR_DATA:TERTIARY_DATA].reshape(num_cars, 2, -1).swapaxes(0, 1)
+        self.car_ids = self.cars[:, CAR_ID]
+        self.team_nums = self.cars[:, TEAM_NUM]
+        self.car_positions = self.cars[:, CAR_DATA:CAR_DATA + 3]
+        self.car_quaternions = self.cars[:, CAR_DATA + 3:CAR_DATA + 7]
+        self.car_linear_velocities = self.cars[:, CAR_DATA + 7:CAR_DATA + 10]
+        self.car_angular_velocities = self.cars[:, CAR_DATA + 10:CAR_DATA + 13]
+        self.inverted_car_positions = self.cars[:, INVERTED_CAR_DATA:INVERTED_CAR_DATA + 3]
+        self.inverted_car_quaternions = self.cars[:, INVERTED_CAR_DATA + 3:INVERTED_CAR_DATA + 7]
+        self.inverted_car_linear_velocities = self.cars[:, INVERTED_CAR_DATA + 7:INVERTED_CAR_DATA + 10]
+        self.inverted_car_angular_velocities = self.cars[:, INVERTED_CAR_DATA + 10:INVERTED_CAR_DATA + 13]
+        self.match_stats = self.cars[:, MATCH_GOALS:IS_DEMOED]
+        self.is_demoed = self.cars[:, IS_DEMOED]
+        self.on_ground = self.cars[:, ON_GROUND]
+        self.ball_touched = self.cars[:, BALL_TOUCHED]
+        self.has_jump = self.cars[:, HAS_JUMP]
+        self.has_flip = self.cars[:, HAS_FLIP]
+        self.boost_amounts = self.cars[:, BOOST_AMOUNT]
+
+        self.rotation_mtxs = rotation_mtxs if rotation_mtxs is not None else np.zeros((2, num_cars, 3, 3))
+        self.car_rotation_mtxs, self.inverted_car_rotation_mtxs = self.rotation_mtxs
+        self.euler_angles = euler_angles if euler_angles is not None else np.zeros((2, num_cars, 3))
+        self.car_euler_angles, self.inverted_car_euler_angles = self.euler_angles
+
+        self.players = [PlayerDataView(self.cars[i], self.car_rotation_mtxs[i], self.car_euler_angles[i],
+                                       self.inverted_car_rotation_mtxs[i], self.inverted_car_euler_angles[i])
+                        for i in range(num_cars)]
@@ -1,10 +1,11 @@
 """
     Object to contain all relevant information about the game state.
 """
+from copy import deepcopy
 from typing import Optional, List, Union
 
 # import numpy as np
-from numpy import fromiter, ndarray
+from numpy import fromiter, ndarray, concatenate, asarray
 
 # from numba import njit
 
@@ -12,6 +13,7 @@ from rlgym.utils.gamestates import PlayerData
 from rlgym.utils.gamestates.player_data import PlayerDataDecode
 from rlgym.utils.gamestates.physics_object import PhysicsObjectDecode
 from rlgym.utils.gamestates.physics_object import FakePhysicsObject
+from rlgym.utils import math
 
 
 class GameState(object):
@@ -25,6 +27,8 @@ class GameState(object):
         self.game_type, self.blue_score, self.orange_score, self.last_touch, self.players, self.ball, \
         self.inverted_ball, self.boost_pads, self.inverted_boost_pads = 0, -1, -1, -1, [], PhysicsObjectDecode(), \
                                                                         PhysicsObjectDecode(), None, None
+        # The decoded packet, the arrays of the objects above are views of it.
+        self.state_vals: Optional[ndarray] = None
         # self.game_type: int = 0
         # self.blue_score: int = -1
         # self.orange_score: int = -1
@@ -52,18 +56,27 @@ class GameState(object):
     #     assert type(state_floats) == list, "UNABLE TO DECODE STATE OF TYPE {}".format(type(state_floats))
     #     self._decode(state_floats)
 
-    def decode(self, state_vals: List[float]):
+    def decode(self, state_vals: Union[List[float], ndarray]):
         """
         Decode a string containing the current game state from the Bakkesmod plugin.
-        :param state_vals: String containing the game state.
+        Decoding into a state that was already decoded overwrites it, reusing its buffer and player objects when the
+        number of players is the same.
+        :param state_vals: String containing the game state, or a float array when using protocol v2.
         """
-        assert type(state_vals) == list, "UNABLE TO DECODE STATE OF TYPE {}".format(type(state_vals))
+        assert type(state_vals) in (list, ndarray), "UNABLE TO DECODE STATE OF TYPE {}".format(type(state_vals))
         # pads_len = self.BOOST_PADS_LENGTH
         # p_len = self.PLAYER_INFO_LENGTH
         # b_len = self.BALL_STATE_LENGTH
         start, num_ball_packets, state_val_len = 3, 1, len(state_vals)
-        state_vals = fromiter(state_vals, float, state_val_len)
+        if self.state_vals is not None and len(self.state_vals) == state_val_len:
+            self.state_vals[:] = state_vals
+            state_vals = self.state_vals
+        elif type(state_vals) == list:
+            state_vals = fromiter(state_vals, float, state_val_len)
+        else:
+            state_vals = state_vals.astype(float)
         state_vals: ndarray
+        self.state_vals = state_vals
 
         # num_ball_packets = 1
         # The state will contain the ball, the mirrored ball, every player, every player mirrored,
@@ -91,18 +104,59 @@ class GameState(object):
         self.inverted_ball.decode_ball_data(state_vals[start:start + self.BALL_STATE_LENGTH])
         start = start + (self.BALL_STATE_LENGTH // 2)
 
+        players_start = start
+        old_players = self.players if len(self.players) == num_player_packets else None
+        self.players, self.last_touch = [], -1
         for i in range(num_player_packets):
-            player = self._decode_player(state_vals[start:start + self.PLAYER_INFO_LENGTH])
+            player = self._decode_player(state_vals[start:start + self.PLAYER_INFO_LENGTH],
+                                         old_players[i] if old_players is not None else None)
             self.players.append(player)
             start = start + self.PLAYER_INFO_LENGTH
 
             if player.ball_touched:
                 self.last_touch = player.car_id
 
+        if num_player_packets > 0:
+            player_vals = state_vals[players_start:start].reshape(num_player_packets, self.PLAYER_INFO_LENGTH)
+            self._compute_orientations(player_vals)
+
         self.players = sorted(self.players, key=lambda p: p.car_id)  # YOU'RE WELCOME RANGLER, THIS WAS MY INNOVATION.
 
-    def _decode_player(self, full_player_data: ndarray):
-        player_data = PlayerDataDecode()
+    def copy(self) -> 'GameState':
+        """
+        Returns an independent copy of this state. A Match created with reuse_game_states decodes every packet into
+        one of two states, so a state has to be copied to keep it for longer than the next step.
+        """
+        if self.state_vals is None:
+            return deepcopy(self)
+
+        # Decoding an array copies it.
+        state = type(self)(self.state_vals)
+        state.game_type, state.last_touch = self.game_type, self.last_touch
+        return state
+
+    def _compute_orientations(self, player_vals: ndarray):
+        """
+        Converts the quaternions of every car, normal and inverted, in one batched call and fills the rotation matrix
+        and euler angle caches of their PhysicsObjects, so forward(), up() etc. don't convert them one at a time.
+
+        :param player_vals: The player packets, one per row, in the same order as self.players.
+        """
+        start = 2 + 3
+        inverted_start = start + self.PLAYER_CAR_STATE_LENGTH
+        quats = concatenate((player_vals[:, start:start + 4], player_vals[:, inverted_start:inverted_start + 4]))
+        rot_mtxs = math.quat_to_rot_mtx_batch(quats)
+        euler_angles = math.quat_to_euler_batch(quats)
+
+        num_players = len(self.players)
+        for i, player in enumerate(self.players):
+            for car_data, j in ((player.car_data, i), (player.inverted_car_data, num_players + i)):
+                car_data._rotation_mtx, car_data._euler_angles = rot_mtxs[j], euler_angles[j]
+                car_data._has_computed_rot_mtx = car_data._has_computed_euler_angles = True
+
+    def _decode_player(self, full_player_data: ndarray, player_data: PlayerDataDecode = None):
+        if player_data is None:
+            player_data = PlayerDataDecode()
         # c_len = self.PLAYER_CAR_STATE_LENGTH
         # c_len = 13
         # t_len = self.PLAYER_TERTIARY_INFO_LENGTH
@@ -232,7 +286,7 @@ class FakeGameState(object):
         # p_len = self.PLAYER_INFO_LENGTH
         # b_len = self.BALL_STATE_LENGTH
         start, num_ball_packets = 3, 1
-        # state_vals = numpy.asarray(state_vals)
+        state_vals = asarray(state_vals, dtype=float)
 
         # num_ball_packets = 1
         # The state will contain the ball, the mirrored ball, every player, every player mirrored,
@@ -259,6 +313,7 @@ class FakeGameState(object):
         self.inverted_ball.decode_ball_data(fromiter(state_vals[start:start + self.BALL_STATE_LENGTH], float))
         start = start + (self.BALL_STATE_LENGTH // 2)
 
+        players_start = start
         for i in range(num_player_packets):
             player = self._decode_player(state_vals[start:start + self.PLAYER_INFO_LENGTH])
             self.players.append(player)
@@ -267,8 +322,14 @@ class FakeGameState(object):
             if player.ball_touched:
                 self.last_touch = player.car_id
 
+        if num_player_packets > 0:
+            player_vals = state_vals[players_start:start].reshape(num_player_packets, self.PLAYER_INFO_LENGTH)
+            self._compute_orientations(player_vals)
+
         self.players = sorted(self.players, key=lambda p: p.car_id)  # YOU'RE WELCOME RANGLER, THIS WAS MY INNOVATION.
 
+    _compute_orientations = GameState._compute_orientations
+
     def _decode_player(self, full_player_data: List[float]):
         player_data = PlayerData()
         # c_len = self.PLAYER_CAR_STATE_LENGTH
@@ -2,12 +2,33 @@
 A basic library for useful mathematical operations.
 """
 
-from typing import Union, List
+from typing import Union, List, Dict, Callable
 import math
+import os
+import timeit
 import numpy as np
-import numba
 import random
-import rlgym.rlgym_rust as rlgym_rust
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    import rlgym.rlgym_rust as rlgym_rust
+except ImportError:
+    # Only win_amd64 binaries are shipped, elsewhere setup.py builds the extension when a Rust toolchain is available.
+    rlgym_rust = None
+
+
+def _njit(func):
+    # Without numba the kernels still work, as plain Python.
+    return func if numba is None else numba.njit(cache=True)(func)
+
+
+def _as_float64(values) -> np.ndarray:
+    # float64 arrays are passed on without a copy, lists are converted once
+    return np.asarray(values, dtype=np.float64)
 
 
 def get_dist(x: np.ndarray, y: np.ndarray) -> np.ndarray:
@@ -74,7 +95,7 @@ def scalar_projection(vec: np.ndarray, dest_vec: np.ndarray) -> Union[np.ndarray
 
 
 def squared_vecmag_1d(vec: List) -> float:
-    x = rlgym_rust.norm_func(vec)
+    x = norm_1d(vec)
     # x = np.linalg.norm(vec)
     return x * x
 
@@ -84,20 +105,30 @@ def squared_vecmag(vec: np.ndarray) -> float:
     return x * x
 
 
+# norm_1d, vecmag_1d, norm_batch, quat_to_rot_mtx_1d, quat_to_rot_mtx_batch and quat_to_euler_batch below are the
+# NumPy implementations, they are rebound to the preferred backend at import, see set_backend.
 def norm_1d(vec: List) -> float:
     """optimized efficiency for 1d lists"""
-    # assuming non-complex 1d list
-    # norm = math.sqrt(sum([x*x for x in vec]))
-    # norm = rlgym_rust.norm_func(vec)
-    # norm = np.linalg.norm(vec)
-    return rlgym_rust.norm_func(vec)
+    return np.linalg.norm(vec)
 
 
 def vecmag_1d(vec: List) -> float:
     """optimized efficiency for 1d lists"""
-    # norm = np.linalg.norm(vec)
-    # norm = rlgym_rust.norm_func(vec)
-    return rlgym_rust.norm_func(vec)
+    return np.linalg.norm(vec)
+
+
+def norm_batch(vecs: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Norms of every row of an (N, k) array.
+
+    :param vecs: The vectors, one per row.
+    :param out: Optional (N,) float64 array to write the norms into.
+    """
+    vecs = _as_float64(vecs)
+    if out is None:
+        out = np.empty(len(vecs))
+    np.sqrt(np.einsum('ij,ij->i', vecs, vecs), out=out)
+    return out
 
 
 def vecmag(vec: np.ndarray) -> float:
@@ -126,7 +157,7 @@ def cosine_similarity(a, b) -> Union[np.ndarray, float]:
     return np.dot(a / np.linalg.norm(a), b / np.linalg.norm(b))
 
 
-# @numba.njit(cache=True)
+# @_njit
 def quat_to_euler(quat) -> np.ndarray:
     w, x, y, z = quat
     sinr_cosp = 2 * (w * x + y * z)
@@ -148,7 +179,7 @@ def quat_to_euler(quat) -> np.ndarray:
 
 
 # From RLUtilities
-# @numba.njit(cache=True)
+# @_njit
 def quat_to_rot_mtx(quat) -> np.ndarray:
     w = -quat[0]
     x = -quat[1]
@@ -180,39 +211,103 @@ def quat_to_rot_mtx(quat) -> np.ndarray:
 
 
 def quat_to_rot_mtx_1d(quat) -> np.ndarray:
-    # theta = rlgym_rust.quat_to_rot_mtx(quat)
-    # w = -quat[0]
-    # x = -quat[1]
-    # y = -quat[2]
-    # z = -quat[3]
-    #
-    # theta = np.zeros((3, 3))
-    #
-    # # norm = np.dot(quat, quat)
-    # norm = sum([i*j for i, j in zip(quat, quat)])
-    # if norm != 0:
-    #     s = 1.0 / norm
-    #     # s = [1.0/i for i in norm]
-    #
-    #     # front direction
-    #     theta[0, 0] = 1.0 - 2.0 * s * (y * y + z * z)
-    #     theta[1, 0] = 2.0 * s * (x * y + z * w)
-    #     theta[2, 0] = 2.0 * s * (x * z - y * w)
-    #
-    #     # left direction
-    #     theta[0, 1] = 2.0 * s * (x * y - z * w)
-    #     theta[1, 1] = 1.0 - 2.0 * s * (x * x + z * z)
-    #     theta[2, 1] = 2.0 * s * (y * z + x * w)
-    #
-    #     # up direction
-    #     theta[0, 2] = 2.0 * s * (x * z + y * w)
-    #     theta[1, 2] = 2.0 * s * (y * z - x * w)
-    #     theta[2, 2] = 1.0 - 2.0 * s * (x * x + y * y)
-    #
-    return rlgym_rust.quat_to_rot_mtx(quat)
-
-
-@numba.njit(cache=True)
+    return quat_to_rot_mtx(quat)
+
+
+def quat_to_rot_mtx_batch(quats: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Batched version of quat_to_rot_mtx, converts (N, 4) quaternions to (N, 3, 3) rotation matrices in one call.
+
+    :param quats: Quaternions in w, x, y, z order, one per row.
+    :param out: Optional (N, 3, 3) float64 array to write the matrices into.
+    """
+    w, x, y, z = _as_float64(quats).T
+    if out is None:
+        out = np.empty((len(w), 3, 3))
+    norm = w * w + x * x + y * y + z * z
+    s = np.divide(2.0, norm, out=np.zeros_like(norm), where=norm != 0)
+
+    out[:, 0, 0] = 1.0 - s * (y * y + z * z)
+    out[:, 1, 0] = s * (x * y + z * w)
+    out[:, 2, 0] = s * (x * z - y * w)
+    out[:, 0, 1] = s * (x * y - z * w)
+    out[:, 1, 1] = 1.0 - s * (x * x + z * z)
+    out[:, 2, 1] = s * (y * z + x * w)
+    out[:, 0, 2] = s * (x * z + y * w)
+    out[:, 1, 2] = s * (y * z - x * w)
+    out[:, 2, 2] = 1.0 - s * (x * x + y * y)
+    out[norm == 0] = 0
+    return out
+
+
+def quat_to_euler_batch(quats: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Batched version of quat_to_euler, converts (N, 4) quaternions to (N, 3) pitch, yaw, roll in one call.
+
+    :param quats: Quaternions in w, x, y, z order, one per row.
+    :param out: Optional (N, 3) float64 array to write the angles into.
+    """
+    w, x, y, z = _as_float64(quats).T
+    if out is None:
+        out = np.empty((len(w), 3))
+    sinp = 2 * (w * y - z * x)
+    out[:, 0] = -np.where(np.abs(sinp) > 1, np.pi / 2, np.arcsin(np.clip(sinp, -1, 1)))
+    out[:, 1] = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    out[:, 2] = -np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    return out
+
+
+@_njit
+def _quat_to_rot_mtx_batch_jit(quats: np.ndarray, out: np.ndarray):
+    for n in range(quats.shape[0]):
+        w = -quats[n, 0]
+        x = -quats[n, 1]
+        y = -quats[n, 2]
+        z = -quats[n, 3]
+
+        norm = w * w + x * x + y * y + z * z
+        if norm == 0:
+            out[n] = 0
+            continue
+        s = 1.0 / norm
+
+        # front direction
+        out[n, 0, 0] = 1.0 - 2.0 * s * (y * y + z * z)
+        out[n, 1, 0] = 2.0 * s * (x * y + z * w)
+        out[n, 2, 0] = 2.0 * s * (x * z - y * w)
+
+        # left direction
+        out[n, 0, 1] = 2.0 * s * (x * y - z * w)
+        out[n, 1, 1] = 1.0 - 2.0 * s * (x * x + z * z)
+        out[n, 2, 1] = 2.0 * s * (y * z + x * w)
+
+        # up direction
+        out[n, 0, 2] = 2.0 * s * (x * z + y * w)
+        out[n, 1, 2] = 2.0 * s * (y * z - x * w)
+        out[n, 2, 2] = 1.0 - 2.0 * s * (x * x + y * y)
+
+
+@_njit
+def _quat_to_euler_batch_jit(quats: np.ndarray, out: np.ndarray):
+    for n in range(quats.shape[0]):
+        w, x, y, z = quats[n, 0], quats[n, 1], quats[n, 2], quats[n, 3]
+        sinr_cosp = 2 * (w * x + y * z)
+        cosr_cosp = 1 - 2 * (x * x + y * y)
+        sinp = 2 * (w * y - z * x)
+        siny_cosp = 2 * (w * z + x * y)
+        cosy_cosp = 1 - 2 * (y * y + z * z)
+
+        if abs(sinp) > 1:
+            pitch = math.pi / 2
+        else:
+            pitch = math.asin(sinp)
+
+        out[n, 0] = -pitch
+        out[n, 1] = math.atan2(siny_cosp, cosy_cosp)
+        out[n, 2] = -math.atan2(sinr_cosp, cosr_cosp)
+
+
+@_njit
 def rotation_to_quaternion(m: np.ndarray) -> np.ndarray:
     trace = np.trace(m)
     q = np.zeros(4)
@@ -252,7 +347,7 @@ def rotation_to_quaternion(m: np.ndarray) -> np.ndarray:
     return -q
 
 
-@numba.njit(cache=True)
+@_njit
 def euler_to_rotation(pyr) -> np.ndarray:
     # pyr is List/Array of len 3
     cp, cy, cr = np.cos(pyr)
@@ -301,7 +396,7 @@ def rand_vec3(max_norm, rng: np.random.Generator = np.random) -> np.ndarray:
 
 
 def clip_1d(lst: Union[List, np.ndarray], _min: float, _max: float) -> Union[List, np.ndarray]:
-    """optimized for lists or 1D/2D action arrays"""
+    """optimized for lists or 1D/2D action arrays, arrays are clipped in place"""
     if isinstance(lst, list):
         for i, v in enumerate(lst):
             if v > _max:
@@ -309,19 +404,170 @@ def clip_1d(lst: Union[List, np.ndarray], _min: float, _max: float) -> Union[Lis
             if _min > v:
                 lst[i] = _min
     else:
-        if lst.ndim > 1:
-            for i, v in enumerate(lst):
-                for y, j in enumerate(v):
-                    if y > _max:
-                        v[y] = _max
-                    if _min > y:
-                        v[y] = _min
-                lst[i] = v
-        else:
-            for i, v in enumerate(lst):
-                if v > _max:
-                    lst[i] = _max
-                if _min > v:
-                    lst[i] = _min
+        np.clip(lst, _min, _max, out=lst, casting='unsafe')
 
     return lst
+
+
+class MathBackend:
+    RUST = 'rust'
+    NUMBA = 'numba'
+    NUMPY = 'numpy'
+
+
+# The functions below have one implementation per backend, the first available one in this order is picked at import.
+# The module level definitions above are the NumPy ones.
+# The RLGYM_MATH_BACKEND environment variable moves a backend to the front, set_backend switches at runtime.
+#   norm_1d(vec), vecmag_1d(vec): norm of a 1d list or array.
+#   quat_to_rot_mtx_1d(quat): rotation matrix of a w, x, y, z quaternion.
+#   norm_batch(vecs, out=None): the (N,) norms of an (N, k) array.
+#   quat_to_rot_mtx_batch(quats, out=None): the (N, 3, 3) rotation matrices of (N, 4) quaternions.
+#   quat_to_euler_batch(quats, out=None): the (N, 3) pitch, yaw, roll of (N, 4) quaternions.
+_BACKEND_ORDER = (MathBackend.RUST, MathBackend.NUMBA, MathBackend.NUMPY)
+_IMPLEMENTATIONS: Dict[str, Dict[str, Callable]] = {}
+_SELECTED: Dict[str, str] = {}
+
+
+def _batched(kernel, *row_shape):
+    def batched(values: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        if out is None:
+            out = np.empty((len(values),) + row_shape)
+        kernel(values, out)
+        return out
+    return batched
+
+
+@_njit
+def _norm_jit(vec: np.ndarray) -> float:
+    total = 0.0
+    for x in vec:
+        total += x * x
+    return math.sqrt(total)
+
+
+@_njit
+def _norm_batch_jit(vecs: np.ndarray, out: np.ndarray):
+    for n in range(vecs.shape[0]):
+        out[n] = _norm_jit(vecs[n])
+
+
+def _quat_to_rot_mtx_1d_numba(quat) -> np.ndarray:
+    theta = np.empty((1, 3, 3))
+    _quat_to_rot_mtx_batch_jit(_as_float64(quat).reshape(1, 4), theta)
+    return theta[0]
+
+
+def _register(name: str, backend: str, func):
+    _IMPLEMENTATIONS.setdefault(name, {})[backend] = func
+
+
+_register('norm_1d', MathBackend.NUMPY, norm_1d)
+_register('vecmag_1d', MathBackend.NUMPY, vecmag_1d)
+for _name in ('norm_1d', 'vecmag_1d'):
+    if numba is not None:
+        _register(_name, MathBackend.NUMBA, lambda vec: _norm_jit(_as_float64(vec)))
+    if rlgym_rust is not None:
+        _register(_name, MathBackend.RUST, lambda vec: rlgym_rust.norm_func(_as_float64(vec)))
+
+_register('quat_to_rot_mtx_1d', MathBackend.NUMPY, quat_to_rot_mtx_1d)
+_register('norm_batch', MathBackend.NUMPY, norm_batch)
+_register('quat_to_rot_mtx_batch', MathBackend.NUMPY, quat_to_rot_mtx_batch)
+_register('quat_to_euler_batch', MathBackend.NUMPY, quat_to_euler_batch)
+
+if numba is not None:
+    _register('quat_to_rot_mtx_1d', MathBackend.NUMBA, _quat_to_rot_mtx_1d_numba)
+    _register('norm_batch', MathBackend.NUMBA, _batched(_norm_batch_jit))
+    _register('quat_to_rot_mtx_batch', MathBackend.NUMBA, _batched(_quat_to_rot_mtx_batch_jit, 3, 3))
+    _register('quat_to_euler_batch', MathBackend.NUMBA, _batched(_quat_to_euler_batch_jit, 3))
+
+if rlgym_rust is not None:
+    _register('quat_to_rot_mtx_1d', MathBackend.RUST, lambda quat: rlgym_rust.quat_to_rot_mtx(_as_float64(quat)))
+    # Builds from before the zero-copy kernels only have the two functions above.
+    if hasattr(rlgym_rust, 'norm_batch'):
+        _register('norm_batch', MathBackend.RUST,
+                  _batched(lambda vecs, out: rlgym_rust.norm_batch(_as_float64(vecs), out)))
+        _register('quat_to_rot_mtx_batch', MathBackend.RUST,
+                  _batched(lambda quats, out: rlgym_rust.quat_to_rot_mtx_batch(_as_float64(quats), out), 3, 3))
+
+
+def available_backends(name: str) -> List[str]:
+    """
+    :param name: The name of a function with several backends, like 'norm_1d'.
+    :return: The backends that can run it on this host.
+    """
+    return [backend for backend in _BACKEND_ORDER if backend in _IMPLEMENTATIONS[name]]
+
+
+def get_backend(name: str) -> str:
+    """
+    :param name: The name of a function with several backends, like 'norm_1d'.
+    :return: The backend currently used by that function.
+    """
+    return _SELECTED[name]
+
+
+def set_backend(backend: str, name: str = None):
+    """
+    Switches functions to another backend. Code that calls them as `math.norm_1d(...)` picks the change up right away.
+
+    :param backend: One of the MathBackend values.
+    :param name: The function to switch, or None to switch every function that has an implementation for `backend`.
+    """
+    names = list(_IMPLEMENTATIONS) if name is None else [name]
+    for func_name in names:
+        implementations = _IMPLEMENTATIONS[func_name]
+        if backend not in implementations:
+            if name is None:
+                continue
+            raise ValueError("{} has no {} backend, available: {}".format(
+                func_name, backend, available_backends(func_name)))
+        globals()[func_name] = implementations[backend]
+        _SELECTED[func_name] = backend
+
+
+def benchmark_backends(number: int = 10000, select_fastest: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Times every available backend of every function on small, game sized inputs.
+
+    :param number: How many calls to time per backend.
+    :param select_fastest: Switch every function to its fastest backend afterwards.
+    :return: The seconds per call, as {function name: {backend: seconds}}.
+    """
+    rng = np.random.default_rng(0)
+    quats = rng.normal(size=(6, 4))
+    args = {
+        'norm_1d': (rng.normal(size=3),),
+        'vecmag_1d': (rng.normal(size=3),),
+        'quat_to_rot_mtx_1d': (quats[0],),
+        'norm_batch': (rng.normal(size=(6, 3)), np.empty(6)),
+        'quat_to_rot_mtx_batch': (quats, np.empty((6, 3, 3))),
+        'quat_to_euler_batch': (quats, np.empty((6, 3))),
+    }
+
+    results = {}
+    for name, implementations in _IMPLEMENTATIONS.items():
+        results[name] = {}
+        for backend in available_backends(name):
+            func = implementations[backend]
+            # The first call compiles the numba kernels.
+            func(*args[name])
+            results[name][backend] = timeit.timeit(lambda: func(*args[name]), number=number) / number
+
+        if select_fastest:
+            set_backend(min(results[name], key=results[name].get), name)
+
+    return results
+
+
+def _select_default_backends():
+    order = list(_BACKEND_ORDER)
+    preferred = os.environ.get("RLGYM_MATH_BACKEND")
+    if preferred in order:
+        order.remove(preferred)
+        order.insert(0, preferred)
+
+    for name, implementations in _IMPLEMENTATIONS.items():
+        set_backend(next(backend for backend in order if backend in implementations), name)
+
+
+_select_default_backends()
@@ -2,12 +2,19 @@
 from math import pi
 # import numpy as np
 from numpy import ndarray, zeros, expand_dims
-from numba import njit
 from typing import Any
 from rlgym.utils import common_values
-from rlgym.utils.gamestates import PlayerData, GameState, PhysicsObject
+from rlgym.utils.gamestates import PlayerData, GameState, PhysicsObject, ArrayGameState
+from rlgym.utils.gamestates.array_game_state import TEAM_NUM, ON_GROUND, HAS_FLIP, IS_DEMOED, BOOST_AMOUNT
 from rlgym.utils.obs_builders import ObsBuilder
 
+try:
+    from numba import njit
+except ImportError:
+    # Without numba the kernels run as plain Python, like the ones in rlgym.utils.math.
+    def njit(cache=False):
+        return lambda func: func
+
 
 # class AdvancedObs(ObsBuilder):
 #     POS_STD = 2300  # If you read this and wonder why, ping Rangler in the dead of night.
@@ -124,9 +131,74 @@ def _add_player_to_obs_jit(POS_STD: float, ANG_STD: float, obs: ndarray, i: int,
     return i
 
 
+@njit(cache=True)
+def _add_car_to_obs_jit(POS_STD: float, ANG_STD: float, obs: ndarray, i: int, ball: ndarray, car: ndarray,
+                        rotation_mtx: ndarray, tertiary: ndarray, player_car: ndarray = None) -> int:
+    # Same layout as _add_player_to_obs_jit, reading the car from the ArrayGameState arrays.
+    for k in range(3):
+        obs[i + k] = (ball[k] - car[k]) / POS_STD
+        obs[i + 3 + k] = (ball[3 + k] - car[7 + k]) / POS_STD
+        obs[i + 6 + k] = car[k] / POS_STD
+        obs[i + 9 + k] = rotation_mtx[k, 0]
+        obs[i + 12 + k] = rotation_mtx[k, 2]
+        obs[i + 15 + k] = car[7 + k] / POS_STD
+        obs[i + 18 + k] = car[10 + k] / ANG_STD
+    obs[i + 21] = tertiary[BOOST_AMOUNT]
+    obs[i + 22] = 1 if tertiary[ON_GROUND] > 0 else 0
+    obs[i + 23] = 1 if tertiary[HAS_FLIP] > 0 else 0
+    obs[i + 24] = 1 if tertiary[IS_DEMOED] > 0 else 0
+    i += 25
+
+    if player_car is not None:
+        for k in range(3):
+            obs[i + k] = (car[k] - player_car[k]) / POS_STD
+            obs[i + 3 + k] = (car[7 + k] - player_car[7 + k]) / POS_STD
+        i += 6
+
+    return i
+
+
+@njit(cache=True)
+def _build_obs_batch_jit(POS_STD: float, ANG_STD: float, team_size: int, obs: ndarray, ball_states: ndarray,
+                         boost_pads: ndarray, car_states: ndarray, rotation_mtxs: ndarray, cars: ndarray,
+                         previous_actions: ndarray):
+    """
+    Fills the (n_players, obs_size) `obs` with the AdvancedObs of every player, from the per field arrays of an
+    ArrayGameState. Orange players read index 1 of the arrays with both sides of the field, the inverted state.
+    """
+    num_players = cars.shape[0]
+    num_pads = boost_pads.shape[0]
+    for p in range(num_players):
+        row = obs[p]
+        side = 1 if cars[p, TEAM_NUM] == common_values.ORANGE_TEAM else 0
+        ball = ball_states[side]
+
+        for k in range(3):
+            row[k] = ball[k] / POS_STD
+            row[3 + k] = ball[3 + k] / POS_STD
+            row[6 + k] = ball[6 + k] / ANG_STD
+        row[9:17] = previous_actions[p]
+        for k in range(num_pads):
+            row[17 + k] = boost_pads[num_pads - 1 - k] if side == 1 else boost_pads[k]
+
+        player_car = car_states[side, p]
+        i_allies = _add_car_to_obs_jit(POS_STD, ANG_STD, row, 51, ball, player_car, rotation_mtxs[side, p], cars[p])
+        i_enemies = i_allies + 31 * (team_size - 1)
+        for other in range(num_players):
+            if other == p:
+                continue
+            if cars[other, TEAM_NUM] == cars[p, TEAM_NUM]:
+                i_allies = _add_car_to_obs_jit(POS_STD, ANG_STD, row, i_allies, ball, car_states[side, other],
+                                               rotation_mtxs[side, other], cars[other], player_car)
+            else:
+                i_enemies = _add_car_to_obs_jit(POS_STD, ANG_STD, row, i_enemies, ball, car_states[side, other],
+                                                rotation_mtxs[side, other], cars[other], player_car)
+
+
 class AdvancedObs(ObsBuilder):
     def __init__(self, expanding=False, team_size=1):
         super().__init__()
+        self._array_state = ArrayGameState()
         self.POS_STD = 2300
         self.ANG_STD = pi
         self.expanding = expanding
@@ -181,6 +253,17 @@ class AdvancedObs(ObsBuilder):
 
         return obs
 
+    def build_obs_batch(self, state: GameState, previous_actions: ndarray) -> ndarray:
+        state = ArrayGameState.from_state(state, self._array_state)
+        obs = zeros((state.num_cars, self.obs_size))
+        _build_obs_batch_jit(self.POS_STD, self.ANG_STD, self.team_size, obs, state.ball_states, state.boost_pads,
+                             state.car_states, state.rotation_mtxs, state.cars, previous_actions)
+
+        if self.expanding:
+            return expand_dims(obs, 1)
+
+        return obs
+
     def _add_player_to_obs(self, obs: ndarray, car: PlayerData, ball: PhysicsObject,
                            inverted: bool, i: int, player: PhysicsObject = None):
         if inverted:
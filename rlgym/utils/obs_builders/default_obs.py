@@ -2,7 +2,8 @@ import math
 import numpy as np
 from typing import Any, List
 from rlgym.utils import common_values
-from rlgym.utils.gamestates import PlayerData, GameState
+from rlgym.utils.gamestates import PlayerData, GameState, ArrayGameState
+from rlgym.utils.gamestates.array_game_state import ON_GROUND, HAS_FLIP, IS_DEMOED
 from rlgym.utils.obs_builders import ObsBuilder
 
 
@@ -15,6 +16,7 @@ class DefaultObs(ObsBuilder):
         :param ang_vel_coef: Angular velocity normalization coefficient
         """
         super().__init__()
+        self._array_state = ArrayGameState()
         self.POS_COEF = pos_coef
         self.ANG_COEF = ang_coef
         self.LIN_VEL_COEF = lin_vel_coef
@@ -59,6 +61,33 @@ class DefaultObs(ObsBuilder):
         obs.extend(enemies)
         return np.concatenate(obs)
 
+    def build_obs_batch(self, state: GameState, previous_actions: np.ndarray) -> np.ndarray:
+        state = ArrayGameState.from_state(state, self._array_state)
+        num_players = state.num_cars
+        # 0 for blue players and 1 for orange ones, the index of their perspective in the state arrays.
+        sides = (state.team_nums == common_values.ORANGE_TEAM).astype(np.intp)
+
+        balls = state.ball_states * np.repeat([self.POS_COEF, self.LIN_VEL_COEF, self.ANG_VEL_COEF], 3)
+        pads = np.stack((state.boost_pads, state.inverted_boost_pads))
+
+        car_states, rotation_mtxs = state.car_states, state.rotation_mtxs
+        cars = np.empty((2, num_players, 19))
+        np.multiply(car_states[:, :, 0:3], self.POS_COEF, out=cars[:, :, 0:3])
+        cars[:, :, 3:6] = rotation_mtxs[:, :, :, 0]
+        cars[:, :, 6:9] = rotation_mtxs[:, :, :, 2]
+        np.multiply(car_states[:, :, 7:10], self.LIN_VEL_COEF, out=cars[:, :, 9:12])
+        np.multiply(car_states[:, :, 10:13], self.ANG_VEL_COEF, out=cars[:, :, 12:15])
+        cars[:, :, 15] = state.boost_amounts
+        cars[:, :, 16:19] = state.cars[:, [ON_GROUND, HAS_FLIP, IS_DEMOED]] > 0
+
+        obs = np.empty((num_players, 51 + 19 * num_players))
+        obs[:, 0:9] = balls[sides]
+        obs[:, 9:17] = previous_actions[:num_players]
+        obs[:, 17:51] = pads[sides]
+        # Each player's own car, then its teammates and opponents, all seen from its side of the field.
+        obs[:, 51:] = cars[sides[:, None], self._player_order(state.team_nums)].reshape(num_players, -1)
+        return obs
+
     def _add_player_to_obs(self, obs: List, player: PlayerData, inverted: bool):
         if inverted:
             player_car = player.inverted_car_data
@@ -3,12 +3,13 @@ The observation builder.
 """
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from rlgym.utils.gamestates import PlayerData, GameState
 # import gym
 from gym.spaces import Space
 # import numpy as np
-from numpy import ndarray
-from typing import Any
+from numpy import ndarray, stack, arange, argsort, array
+from typing import Any, Tuple
 
 
 class ObsBuilder(ABC):
@@ -61,3 +62,38 @@ class ObsBuilder(ABC):
         :return: An observation for the player provided.
         """
         raise NotImplementedError
+
+    def build_obs_batch(self, state: GameState, previous_actions: ndarray) -> ndarray:
+        """
+        Function to build the observations of every player at once. Match calls this instead of `build_obs` for every
+        player when a builder overrides it, so work that `build_obs` repeats for every player, like the team inversion,
+        only has to be done once. It is called after `pre_step`, like `build_obs`.
+
+        The default implementation calls `build_obs` for every player and stacks the results.
+
+        :param state: The current state of the game.
+        :param previous_actions: The actions taken at the previous environment step, one row per player.
+
+        :return: The observations of all players as one array, with one row per player in the order of `state.players`.
+        """
+        return stack([self.build_obs(player, state, previous_actions[i]) for i, player in enumerate(state.players)])
+
+    @staticmethod
+    def _player_order(team_nums: ndarray) -> ndarray:
+        """
+        :param team_nums: The team of every player.
+        :return: An (n, n) index array, row i holds player i, then its teammates, then its opponents, in state order.
+                 It is shared between calls and must not be modified.
+        """
+        return _player_order(tuple(team_nums))
+
+
+@lru_cache(maxsize=None)
+def _player_order(team_nums: Tuple[float, ...]) -> ndarray:
+    num_players = len(team_nums)
+    team_nums = array(team_nums)
+    keys = (team_nums[None, :] != team_nums[:, None]) * num_players + arange(num_players)
+    keys[arange(num_players), arange(num_players)] = -1
+    order = argsort(keys, axis=1, kind='stable')
+    order.flags.writeable = False
+    return order
@@ -1,8 +1,9 @@
-from typing import Optional, Tuple, Union
+from typing import Optional, Tuple, Union, Dict, Any
 
 import numpy as np
 from rlgym.utils.reward_functions import RewardFunction
 from rlgym.utils.gamestates import GameState, PlayerData
+from rlgym.utils.batching import overrides_batch
 
 
 class CombinedReward(RewardFunction):
@@ -13,7 +14,8 @@ class CombinedReward(RewardFunction):
     def __init__(
             self,
             reward_functions: Tuple[RewardFunction, ...],
-            reward_weights: Optional[Tuple[float, ...]] = None
+            reward_weights: Optional[Tuple[float, ...]] = None,
+            breakdown_length: int = 0
     ):
         """
         Creates the combined reward using multiple rewards, and a potential set
@@ -21,6 +23,11 @@ class CombinedReward(RewardFunction):
 
         :param reward_functions: Each individual reward function.
         :param reward_weights: The weights for each reward.
+        :param breakdown_length: When above 0, the weighted reward of every function for every player is recorded, for
+                                 the last `breakdown_length` steps in a ring buffer and summed over the episode. See
+                                 `get_breakdown`, Gym adds it to the info of the last step of every episode as
+                                 'reward_breakdown'. Match reports no breakdown for subclasses that replace the
+                                 reward methods it calls.
         """
         super().__init__()
 
@@ -35,6 +42,30 @@ class CombinedReward(RewardFunction):
                 )
             )
 
+        # Rewards without their own get_rewards_batch are called per player, with the original state.
+        self._batched = [overrides_batch(func, RewardFunction, "get_rewards_batch", "get_reward", "get_final_reward")
+                         for func in self.reward_functions]
+
+        # Set by Match.set_profiler, times every function, and the ArrayGameState conversion of the batched path.
+        self.profiler = None
+        self._profile_names = ["get_rewards/{}/{}".format(i, type(func).__name__)
+                               for i, func in enumerate(self.reward_functions)]
+
+        self.breakdown_length = breakdown_length
+        # reward_weights as a column, rebuilt when reward_weights is assigned another sequence.
+        self._weights_source = self.reward_weights
+        self._weights_column = np.asarray(self.reward_weights, dtype=float)[:, None]
+        self._breakdown = None
+        # The step get_reward and get_final_reward fill one player at a time, the row of each car id in it, which of
+        # the rows are filled in and how many are still missing.
+        self._breakdown_row = None
+        self._breakdown_index = {}
+        self._breakdown_filled = None
+        self._breakdown_missing = 0
+        self._breakdown_steps = 0
+        self._episode_sums = None
+        self._episode_steps = 0
+
     @classmethod
     def from_zipped(cls, *rewards_and_weights: Union[RewardFunction, Tuple[RewardFunction, float]]) -> "CombinedReward":
         """
@@ -62,6 +93,9 @@ class CombinedReward(RewardFunction):
         for func in self.reward_functions:
             func.reset(initial_state)
 
+        if self.breakdown_length > 0:
+            self._allocate_breakdown(len(initial_state.players))
+
     def get_reward(
             self,
             player: PlayerData,
@@ -77,10 +111,16 @@ class CombinedReward(RewardFunction):
 
         :return: The combined rewards for the player on the state.
         """
-        rewards = [
-            func.get_reward(player, state, previous_action)
-            for func in self.reward_functions
-        ]
+        if self.profiler is not None:
+            rewards = self._profiled_rewards(player, state, previous_action, False)
+        else:
+            rewards = [
+                func.get_reward(player, state, previous_action)
+                for func in self.reward_functions
+            ]
+
+        if self.breakdown_length > 0:
+            self._record_player_breakdown(player, state, rewards)
 
         # return float(np.dot(self.reward_weights, rewards))
         return sum([i*j for i, j in zip(self.reward_weights, rewards)])
@@ -100,10 +140,151 @@ class CombinedReward(RewardFunction):
 
         :return: The combined rewards for the player on the state.
         """
-        rewards = [
-            func.get_final_reward(player, state, previous_action)
-            for func in self.reward_functions
-        ]
+        if self.profiler is not None:
+            rewards = self._profiled_rewards(player, state, previous_action, True)
+        else:
+            rewards = [
+                func.get_final_reward(player, state, previous_action)
+                for func in self.reward_functions
+            ]
+
+        if self.breakdown_length > 0:
+            self._record_player_breakdown(player, state, rewards)
 
         # return float(np.dot(self.reward_weights, rewards))
         return sum([i*j for i, j in zip(self.reward_weights, rewards)])
+
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        """
+        Returns the combined rewards of every player, as the weighted sum of the (components, players) matrix of the
+        rewards of each function.
+
+        :param state: The current state of the game.
+        :param previous_actions: The actions taken at the previous environment step, one row per player.
+        :param done: Whether the state is a terminal one.
+
+        :return: The combined rewards of all players.
+        """
+        rewards = np.empty((len(self.reward_functions), len(state.players)))
+        array_state = None
+        profiler = self.profiler
+        start = profiler.now() if profiler is not None else 0
+        for i, func in enumerate(self.reward_functions):
+            if self._batched[i]:
+                # Converted once for all the batched rewards.
+                if array_state is None:
+                    array_state = self._as_array_state(state)
+                    if profiler is not None and array_state is not state:
+                        start = profiler.lap("get_rewards/as_array_state", start)
+                rewards[i] = func.get_rewards_batch(array_state, previous_actions, done)
+            else:
+                rewards[i] = func.get_rewards_batch(state, previous_actions, done)
+            if profiler is not None:
+                start = profiler.lap(self._profile_names[i], start)
+
+        if self.breakdown_length > 0:
+            self._record_breakdown(rewards)
+
+        return np.dot(self.reward_weights, rewards)
+
+    def _profiled_rewards(self, player: PlayerData, state: GameState, previous_action: np.ndarray, final: bool) -> list:
+        # Per player, so each function gets one time per player and step.
+        profiler = self.profiler
+        rewards = []
+        start = profiler.now()
+        for name, func in zip(self._profile_names, self.reward_functions):
+            get_reward = func.get_final_reward if final else func.get_reward
+            rewards.append(get_reward(player, state, previous_action))
+            start = profiler.lap(name, start)
+        return rewards
+
+    def get_breakdown(self) -> Optional[Dict[str, Any]]:
+        """
+        The contribution of each reward function to the rewards of the current episode, or None when the breakdown is
+        not recorded.
+
+        :return: A dict with the class 'names' of the reward functions, the number of 'steps' recorded this episode and
+                 the 'episode_sums' and 'episode_means' of the weighted rewards, (n_functions, n_players) arrays with
+                 players in the order of `state.players`. None when no step of the episode was recorded.
+        """
+        if self._episode_sums is None or self._episode_steps == 0:
+            return None
+
+        sums = self._episode_sums.copy()
+        return {
+            'names': [type(func).__name__ for func in self.reward_functions],
+            'steps': self._episode_steps,
+            'episode_sums': sums,
+            'episode_means': sums / max(self._episode_steps, 1)
+        }
+
+    def get_breakdown_history(self) -> Optional[np.ndarray]:
+        """
+        The weighted reward of every function for every player over the last `breakdown_length` steps, possibly
+        spanning several episodes.
+
+        :return: An (n_steps, n_functions, n_players) array, oldest step first, or None when nothing was recorded.
+        """
+        if self._breakdown is None:
+            return None
+
+        length = len(self._breakdown)
+        if self._breakdown_steps <= length:
+            return self._breakdown[:self._breakdown_steps].copy()
+        return np.roll(self._breakdown, -(self._breakdown_steps % length), axis=0)
+
+    def _allocate_breakdown(self, num_players: int):
+        shape = (len(self.reward_functions), num_players)
+        if self._breakdown is None or self._breakdown.shape[1:] != shape:
+            self._breakdown = np.zeros((self.breakdown_length,) + shape)
+            self._breakdown_steps = 0
+            self._episode_sums = np.zeros(shape)
+        else:
+            self._episode_sums.fill(0)
+        self._episode_steps = 0
+        self._breakdown_row = None
+
+    def _get_weights_column(self) -> np.ndarray:
+        if self._weights_source is not self.reward_weights:
+            self._weights_source = self.reward_weights
+            self._weights_column = np.asarray(self.reward_weights, dtype=float)[:, None]
+        return self._weights_column
+
+    def _next_breakdown_row(self, num_players: int) -> np.ndarray:
+        if self._breakdown is None or self._breakdown.shape[2] != num_players:
+            self._allocate_breakdown(num_players)
+        return self._breakdown[self._breakdown_steps % self.breakdown_length]
+
+    def _commit_breakdown_row(self, contributions: np.ndarray):
+        self._episode_sums += contributions
+        self._breakdown_steps += 1
+        self._episode_steps += 1
+
+    def _record_breakdown(self, rewards: np.ndarray):
+        contributions = self._next_breakdown_row(rewards.shape[1])
+        np.multiply(rewards, self._get_weights_column(), out=contributions)
+        self._commit_breakdown_row(contributions)
+
+    def _record_player_breakdown(self, player: PlayerData, state: GameState, rewards: list):
+        # Match asks for every player of a step once, the step is recorded once all of them are in.
+        index = self._breakdown_index.get(player.car_id) if self._breakdown_row is not None else None
+        if index is None or self._breakdown_filled[index]:
+            # The first player of a step, an unfinished step is dropped.
+            players = state.players
+            self._breakdown_index = {other.car_id: i for i, other in enumerate(players)}
+            index = self._breakdown_index.get(player.car_id)
+            if index is None:
+                self._breakdown_row = None
+                raise ValueError("The player with car id {} is not one of the players of the state".format(
+                    player.car_id))
+            self._breakdown_row = self._next_breakdown_row(len(players))
+            self._breakdown_filled = np.zeros(len(players), dtype=bool)
+            self._breakdown_missing = len(players)
+
+        contributions = self._breakdown_row
+        np.multiply(self._get_weights_column()[:, 0], rewards, out=contributions[:, index])
+        self._breakdown_filled[index] = True
+        self._breakdown_missing -= 1
+        if self._breakdown_missing == 0:
+            self._commit_breakdown_row(contributions)
+            self._breakdown_row = None
@@ -28,11 +28,16 @@ class LiuDistanceBallToGoalReward(RewardFunction):
         # BACK_NET_Y - BACK_WALL_Y + BALL_RADIUS)
         # dist = np.linalg.norm([i - j for i, j in zip([i - j for i, j in zip(state.ball.position, objective)])]) - (
         #             BACK_NET_Y - BACK_WALL_Y + BALL_RADIUS)
-        dist = math.norm_1d([i - j for i, j in zip([i - j for i, j in zip(state.ball.position, objective)])]) \
-               - self.partial
+        dist = math.norm_1d([i - j for i, j in zip(state.ball.position, objective)]) - self.partial
         # dist = np.linalg.norm(state.ball.position - objective) - (BACK_NET_Y - BACK_WALL_Y + BALL_RADIUS)
         return math_py.exp(-0.5 * dist / BALL_MAX_SPEED)  # Inspired by https://arxiv.org/abs/2105.12196
 
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        state = self._as_array_state(state)
+        objectives = _goal_objectives(state.team_nums, self.own_goal)
+        dist = np.linalg.norm(state.ball.position - objectives, axis=1) - self.partial
+        return np.exp(-0.5 * dist / BALL_MAX_SPEED)
+
 
 class VelocityBallToGoalReward(RewardFunction):
     def __init__(self, own_goal=False, use_scalar_projection=False):
@@ -72,6 +77,14 @@ class VelocityBallToGoalReward(RewardFunction):
             # return float(np.dot(norm_pos_diff, norm_vel))
             return sum([i * j for i, j in zip(norm_pos_diff, norm_vel)])
 
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        state = self._as_array_state(state)
+        pos_diff = _goal_objectives(state.team_nums, self.own_goal) - state.ball.position
+        dist = np.linalg.norm(pos_diff, axis=1)
+        if self.use_scalar_projection:
+            return np.divide(pos_diff @ state.ball.linear_velocity, dist, out=np.zeros_like(dist), where=dist != 0)
+        return pos_diff @ (state.ball.linear_velocity / BALL_MAX_SPEED) / dist
+
 
 class BallYCoordinateReward(RewardFunction):
     def __init__(self, exponent=1):
@@ -86,3 +99,16 @@ class BallYCoordinateReward(RewardFunction):
             return (state.ball.position[1] / (BACK_WALL_Y + BALL_RADIUS)) ** self.exponent
         else:
             return (state.inverted_ball.position[1] / (BACK_WALL_Y + BALL_RADIUS)) ** self.exponent
+
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        state = self._as_array_state(state)
+        ball_y = state.ball_states[(state.team_nums != BLUE_TEAM).astype(np.intp), 1]
+        return (ball_y / (BACK_WALL_Y + BALL_RADIUS)) ** self.exponent
+
+
+_GOALS_BACK = np.array((BLUE_GOAL_BACK, ORANGE_GOAL_BACK), dtype=float)
+
+
+def _goal_objectives(team_nums: np.ndarray, own_goal: bool) -> np.ndarray:
+    # The goal each player aims at, or defends when own_goal, as an (n_players, 3) array.
+    return _GOALS_BACK[((team_nums == BLUE_TEAM) != own_goal).astype(np.intp)]
@@ -6,6 +6,7 @@ from rlgym.utils import math
 from rlgym.utils import RewardFunction
 from rlgym.utils.common_values import BLUE_TEAM, ORANGE_TEAM
 from rlgym.utils.gamestates import PlayerData, GameState
+from rlgym.utils.batching import overrides_batch
 
 
 class ConditionalRewardFunction(RewardFunction):
@@ -17,6 +18,14 @@ class ConditionalRewardFunction(RewardFunction):
     def condition(self, player: PlayerData, state: GameState, previous_action: np.ndarray) -> bool:
         raise NotImplementedError
 
+    def condition_batch(self, state: GameState, previous_actions: np.ndarray) -> np.ndarray:
+        """
+        The condition of every player at once, as an (n_players,) bool array. The default calls `condition` for every
+        player, overrides are given the state as an ArrayGameState.
+        """
+        return np.array([self.condition(player, state, previous_actions[i]) for i, player in enumerate(state.players)],
+                        dtype=bool)
+
     def reset(self, initial_state: GameState):
         pass
 
@@ -30,6 +39,20 @@ class ConditionalRewardFunction(RewardFunction):
             return self.reward_func.get_final_reward(player, state, previous_action)
         return 0
 
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        if overrides_batch(self, ConditionalRewardFunction, "condition_batch", "condition"):
+            mask = self.condition_batch(self._as_array_state(state), previous_actions)
+        else:
+            mask = ConditionalRewardFunction.condition_batch(self, state, previous_actions)
+
+        # The wrapped reward is only called for the players meeting the condition, like get_reward does, since it may
+        # keep per player state.
+        get_reward = self.reward_func.get_final_reward if done else self.reward_func.get_reward
+        rewards = np.zeros(len(state.players))
+        for i in np.flatnonzero(mask):
+            rewards[i] = get_reward(state.players[i], state, previous_actions[i])
+        return rewards
+
 
 class RewardIfClosestToBall(ConditionalRewardFunction):
     def __init__(self, reward_func: RewardFunction, team_only=True):
@@ -48,13 +71,27 @@ class RewardIfClosestToBall(ConditionalRewardFunction):
                     return False
         return True
 
+    def condition_batch(self, state: GameState, previous_actions: np.ndarray) -> np.ndarray:
+        dist = np.linalg.norm(state.car_positions - state.ball.position, axis=1)
+        if not self.team_only:
+            return dist <= dist.min()
+        same_team = state.team_nums[:, None] == state.team_nums[None, :]
+        return ~np.any(same_team & (dist[None, :] < dist[:, None]), axis=1)
+
 
 class RewardIfTouchedLast(ConditionalRewardFunction):
     def condition(self, player: PlayerData, state: GameState, previous_action: np.ndarray) -> bool:
         return state.last_touch == player.car_id
 
+    def condition_batch(self, state: GameState, previous_actions: np.ndarray) -> np.ndarray:
+        return state.car_ids == state.last_touch
+
 
 class RewardIfBehindBall(ConditionalRewardFunction):
     def condition(self, player: PlayerData, state: GameState, previous_action: np.ndarray) -> bool:
         return player.team_num == BLUE_TEAM and player.car_data.position[1] < state.ball.position[1] \
                or player.team_num == ORANGE_TEAM and player.car_data.position[1] > state.ball.position[1]
+
+    def condition_batch(self, state: GameState, previous_actions: np.ndarray) -> np.ndarray:
+        car_y, ball_y = state.car_positions[:, 1], state.ball.position[1]
+        return (state.team_nums == BLUE_TEAM) & (car_y < ball_y) | (state.team_nums == ORANGE_TEAM) & (car_y > ball_y)
@@ -4,6 +4,7 @@ import math as math_py
 from rlgym.utils import math
 from rlgym.utils.common_values import BLUE_TEAM, BLUE_GOAL_BACK, ORANGE_GOAL_BACK, ORANGE_TEAM, CAR_MAX_SPEED
 from rlgym.utils.gamestates import GameState, PlayerData
+from rlgym.utils.gamestates.array_game_state import MATCH_GOALS, MATCH_SHOTS, MATCH_SAVES, MATCH_DEMOLISHES
 from rlgym.utils.reward_functions import RewardFunction
 
 
@@ -58,6 +59,27 @@ class EventReward(RewardFunction):
         # self.last_registered_values[player.car_id] = new_values
         return reward
 
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        state = self._as_array_state(state)
+        sides = (state.team_nums != BLUE_TEAM).astype(np.intp)
+        scores = np.array([state.blue_score, state.orange_score], dtype=float)
+        new_values = np.empty((state.num_cars, len(self.weights)))
+        new_values[:, 0] = state.cars[:, MATCH_GOALS]
+        new_values[:, 1] = scores[sides]
+        new_values[:, 2] = scores[1 - sides]
+        new_values[:, 3] = state.ball_touched > 0
+        new_values[:, 4:7] = state.cars[:, (MATCH_SHOTS, MATCH_SAVES, MATCH_DEMOLISHES)]
+        new_values[:, 7] = state.boost_amounts
+        car_ids = state.car_ids.astype(int).tolist()
+        old_values = np.array([self.last_registered_values[car_id] for car_id in car_ids], dtype=float)
+
+        # Rows stay usable by get_reward, which only iterates over them.
+        for car_id, values in zip(car_ids, new_values):
+            self.last_registered_values[car_id] = values
+
+        diff_values = np.maximum(new_values - old_values, 0)  # We only care about increasing values
+        return diff_values @ np.asarray(self.weights, dtype=float)
+
 
 class VelocityReward(RewardFunction):
     # Simple reward function to ensure the model is training.
@@ -72,6 +94,10 @@ class VelocityReward(RewardFunction):
         # return np.linalg.norm(player.car_data.linear_velocity) / CAR_MAX_SPEED * (1 - 2 * self.negative)
         return math.norm_1d(player.car_data.linear_velocity) / CAR_MAX_SPEED * (1 - 2 * self.negative)
 
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        state = self._as_array_state(state)
+        return np.linalg.norm(state.car_linear_velocities, axis=1) / CAR_MAX_SPEED * (1 - 2 * self.negative)
+
 
 class SaveBoostReward(RewardFunction):
     def reset(self, initial_state: GameState):
@@ -81,6 +107,9 @@ class SaveBoostReward(RewardFunction):
         # 1 reward for each frame with 100 boost, sqrt because 0->20 makes bigger difference than 80->100
         return math_py.sqrt(player.boost_amount)
 
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        return np.sqrt(self._as_array_state(state).boost_amounts)
+
 
 class ConstantReward(RewardFunction):
     def reset(self, initial_state: GameState):
@@ -89,6 +118,9 @@ class ConstantReward(RewardFunction):
     def get_reward(self, player: PlayerData, state: GameState, previous_action: np.ndarray) -> float:
         return 1
 
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        return np.ones(len(state.players))
+
 
 class AlignBallGoal(RewardFunction):
     def __init__(self, defense=1., offense=1.):
@@ -118,3 +150,22 @@ class AlignBallGoal(RewardFunction):
                                                                     [i - j for i, j in zip(attacc, pos)])
 
         return defensive_reward + offensive_reward
+
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        state = self._as_array_state(state)
+        pos = state.car_positions
+        orange = (state.team_nums == ORANGE_TEAM)[:, None]
+        protecc = np.where(orange, ORANGE_GOAL_BACK, BLUE_GOAL_BACK)
+        attacc = np.where(orange, BLUE_GOAL_BACK, ORANGE_GOAL_BACK)
+
+        to_ball = state.ball.position - pos
+        to_ball /= np.linalg.norm(to_ball, axis=1, keepdims=True)
+        defensive_reward = self.defense * _cosine_similarity_rows(to_ball, pos - protecc)
+        offensive_reward = self.offense * _cosine_similarity_rows(to_ball, attacc - pos)
+
+        return defensive_reward + offensive_reward
+
+
+def _cosine_similarity_rows(unit_a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Row wise cosine similarity, the rows of unit_a are already normalized.
+    return np.einsum('ij,ij->i', unit_a, b) / np.linalg.norm(b, axis=1)
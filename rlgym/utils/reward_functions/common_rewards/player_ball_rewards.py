@@ -16,6 +16,11 @@ class LiuDistancePlayerToBallReward(RewardFunction):
         dist = math.norm_1d([i - j for i, j in zip(player.car_data.position, state.ball.position)]) - BALL_RADIUS
         return math_py.exp(-0.5 * dist / CAR_MAX_SPEED)  # Inspired by https://arxiv.org/abs/2105.12196
 
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        state = self._as_array_state(state)
+        dist = np.linalg.norm(state.car_positions - state.ball.position, axis=1) - BALL_RADIUS
+        return np.exp(-0.5 * dist / CAR_MAX_SPEED)
+
 
 class VelocityPlayerToBallReward(RewardFunction):
     def __init__(self, use_scalar_projection=False):
@@ -47,6 +52,15 @@ class VelocityPlayerToBallReward(RewardFunction):
             # return float(np.dot(norm_pos_diff, norm_vel))
             return sum([i*j for i, j in zip(norm_pos_diff, norm_vel)])
 
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        state = self._as_array_state(state)
+        pos_diff = state.ball.position - state.car_positions
+        dist = np.linalg.norm(pos_diff, axis=1)
+        dot = np.einsum('ij,ij->i', pos_diff, state.car_linear_velocities)
+        if self.use_scalar_projection:
+            return np.divide(dot, dist, out=np.zeros_like(dist), where=dist != 0)
+        return dot / (dist * CAR_MAX_SPEED)
+
 
 class FaceBallReward(RewardFunction):
     def reset(self, initial_state: GameState):
@@ -62,6 +76,12 @@ class FaceBallReward(RewardFunction):
         # return float(np.dot(player.car_data.forward(), norm_pos_diff))
         return sum([i * j for i, j in zip(player.car_data.forward(), norm_pos_diff)])
 
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        state = self._as_array_state(state)
+        pos_diff = state.ball.position - state.car_positions
+        forward = state.car_rotation_mtxs[:, :, 0]
+        return np.einsum('ij,ij->i', forward, pos_diff) / np.linalg.norm(pos_diff, axis=1)
+
 
 class TouchBallReward(RewardFunction):
     def __init__(self, aerial_weight=0.):
@@ -75,3 +95,8 @@ class TouchBallReward(RewardFunction):
             # Default just rewards 1, set aerial weight to reward more depending on ball height
             return ((state.ball.position[2] + BALL_RADIUS) / (2 * BALL_RADIUS)) ** self.aerial_weight
         return 0
+
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        state = self._as_array_state(state)
+        reward = ((state.ball.position[2] + BALL_RADIUS) / (2 * BALL_RADIUS)) ** self.aerial_weight
+        return np.where(state.ball_touched > 0, reward, 0.)
@@ -18,3 +18,6 @@ class DefaultReward(RewardFunction):
 
     def get_final_reward(self, player: PlayerData, state: GameState, previous_action: np.ndarray) -> float:
         return self.get_reward(player, state, previous_action)
+
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        return - np.linalg.norm(self._as_array_state(state).car_angular_velocities, axis=1) / 100
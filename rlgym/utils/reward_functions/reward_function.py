@@ -3,7 +3,7 @@ The reward function.
 """
 
 from abc import ABC, abstractmethod
-from rlgym.utils.gamestates import GameState, PlayerData
+from rlgym.utils.gamestates import GameState, PlayerData, ArrayGameState
 import numpy as np
 
 
@@ -54,3 +54,31 @@ class RewardFunction(ABC):
         :return: A reward for the player provided.
         """
         return self.get_reward(player, state, previous_action)
+
+    def get_rewards_batch(self, state: GameState, previous_actions: np.ndarray, done: bool = False) -> np.ndarray:
+        """
+        Function to compute the rewards of every player at once. Match calls this instead of `get_reward` or
+        `get_final_reward` for every player when a reward function overrides it and the state is an ArrayGameState
+        (see the `game_state_class` of Match), so it can be vectorized over the players. It is called after `pre_step`,
+        like `get_reward`.
+
+        The default implementation calls `get_reward`, or `get_final_reward` when `done`, for every player.
+
+        :param state: The current state of the game.
+        :param previous_actions: The actions taken at the previous environment step, one row per player.
+        :param done: Whether the state is a terminal one.
+
+        :return: The rewards of all players as an (n_players,) array, in the order of `state.players`.
+        """
+        get_reward = self.get_final_reward if done else self.get_reward
+        return np.array([get_reward(player, state, previous_actions[i]) for i, player in enumerate(state.players)],
+                        dtype=float)
+
+    def _as_array_state(self, state: GameState) -> ArrayGameState:
+        """
+        The state as an ArrayGameState, for batched rewards. A GameState is copied into the same ArrayGameState every
+        step, so the result is only valid until the next call.
+        """
+        if getattr(self, "_array_state", None) is None:
+            self._array_state = ArrayGameState()
+        return ArrayGameState.from_state(state, self._array_state)
@@ -0,0 +1,135 @@
+"""
+Wall clock timings of the phases of a step, kept in log scaled histograms.
+"""
+import json
+from math import log2
+from time import perf_counter_ns
+from typing import Dict, Any, Optional
+
+# 4 buckets per power of two nanoseconds, up to 2^40 ns (~18 minutes).
+BUCKETS_PER_OCTAVE = 4
+NUM_BUCKETS = 40 * BUCKETS_PER_OCTAVE
+
+
+class StepProfiler(object):
+    """
+    Records how long each phase of `Gym.step` and `Gym.reset` takes, pass one to `rlgym.make` or `Gym`. The phases are
+    parse_actions, send_actions, receive_state, parse_state, build_observations, is_done and get_rewards, plus
+    send_reset and episode_reset for resets. The terminal conditions of the Match and the components of a CombinedReward
+    reward function are also timed one by one, as "is_done/<index>/<class name>" and "get_rewards/<index>/<class name>",
+    the components once per player when the rewards are not batched. The conversion of the state for the batched
+    components is "get_rewards/as_array_state".
+
+    Every phase has a histogram with 4 buckets per power of two, so recording a time only takes a few arithmetic
+    operations and the percentiles are accurate to about 10%.
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, list] = {}
+        self._totals: Dict[str, int] = {}
+        self._mins: Dict[str, int] = {}
+        self._maxs: Dict[str, int] = {}
+
+    @staticmethod
+    def now() -> int:
+        """
+        The time to pass to `record` as `start`, in nanoseconds.
+        """
+        return perf_counter_ns()
+
+    def record(self, phase: str, start: int, end: int = None):
+        """
+        Records a duration.
+
+        :param phase: The name of the phase.
+        :param start: When the phase started, from `now()`.
+        :param end: When the phase ended, from `now()`, defaults to now.
+        """
+        elapsed = (perf_counter_ns() if end is None else end) - start
+        counts = self._counts.get(phase)
+        if counts is None:
+            counts = self._counts[phase] = [0] * NUM_BUCKETS
+            self._totals[phase], self._mins[phase], self._maxs[phase] = 0, elapsed, elapsed
+
+        bucket = int(log2(elapsed) * BUCKETS_PER_OCTAVE) if elapsed > 1 else 0
+        counts[bucket if bucket < NUM_BUCKETS else NUM_BUCKETS - 1] += 1
+        self._totals[phase] += elapsed
+        if elapsed < self._mins[phase]:
+            self._mins[phase] = elapsed
+        elif elapsed > self._maxs[phase]:
+            self._maxs[phase] = elapsed
+
+    def lap(self, phase: str, start: int) -> int:
+        """
+        Records the duration of a phase that ends now and returns the current time, to use as the start of the next
+        phase.
+        """
+        end = perf_counter_ns()
+        self.record(phase, start, end)
+        return end
+
+    def percentile(self, phase: str, q: float) -> float:
+        """
+        :param phase: The name of the phase.
+        :param q: The percentile, between 0 and 100.
+
+        :return: An estimate of the q-th percentile of the durations of the phase in seconds.
+        """
+        counts = self._counts[phase]
+        target = q / 100 * sum(counts)
+        seen = 0
+        for bucket, count in enumerate(counts):
+            seen += count
+            if count and seen >= target:
+                # The geometric middle of the bucket, clamped to the durations actually seen.
+                estimate = 2 ** ((bucket + 0.5) / BUCKETS_PER_OCTAVE)
+                return min(max(estimate, self._mins[phase]), self._maxs[phase]) / 1e9
+        return self._maxs[phase] / 1e9
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        :return: For every phase, the number of times it was recorded and its total, mean, min, max, p50, p90 and p99
+                 durations in seconds.
+        """
+        summary = {}
+        for phase, counts in self._counts.items():
+            count = sum(counts)
+            summary[phase] = {
+                'count': count,
+                'total': self._totals[phase] / 1e9,
+                'mean': self._totals[phase] / count / 1e9,
+                'min': self._mins[phase] / 1e9,
+                'max': self._maxs[phase] / 1e9,
+                'p50': self.percentile(phase, 50),
+                'p90': self.percentile(phase, 90),
+                'p99': self.percentile(phase, 99)
+            }
+        return summary
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """
+        Dumps the summary and the histogram of every phase as JSON. The bucket `i` of a histogram holds the durations
+        from 2^(i / 4) to 2^((i + 1) / 4) nanoseconds.
+
+        :param path: A file to write the JSON to.
+        :return: The JSON string.
+        """
+        data: Dict[str, Any] = {
+            'buckets_per_octave': BUCKETS_PER_OCTAVE,
+            'summary': self.summary(),
+            'histograms': self._counts
+        }
+        dumped = json.dumps(data, indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(dumped)
+        return dumped
+
+    def reset(self):
+        """
+        Forgets every recorded duration.
+        """
+        self._counts.clear()
+        self._totals.clear()
+        self._mins.clear()
+        self._maxs.clear()
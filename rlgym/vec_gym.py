@@ -0,0 +1,146 @@
+"""
+    A vectorized environment that drives several games from one process.
+"""
+import os
+from typing import List, Tuple, Dict, Any
+
+import numpy as np
+
+from rlgym.communication import Message, TransportType
+from rlgym.envs import Match
+from rlgym.gamelaunch import LaunchPreference, launch_instances
+from rlgym.gym import Gym
+
+
+class VecGym(object):
+    def __init__(self, matches: List[Match], launch_preference=LaunchPreference.EPIC, use_injector=False,
+                 force_paging=False, raise_on_crash=False, auto_minimize=False, transport=TransportType.NAMED_PIPE,
+                 protocol=Message.RLGYM_PROTOCOL_V1, max_concurrent_launches=4, connect_timeout=300, supervisor=None,
+                 instance_pool=None):
+        """
+        Launches one game per match, up to `max_concurrent_launches` at a time, see `launch_instances`. Every match
+        needs its own reward function, obs builder etc. objects, because they keep per episode state, and all of them
+        must have the same number of agents and observation shape.
+
+        Observations, rewards and dones are returned as arrays with one row per agent, the agents of environment `i` are
+        at rows `i * agents_per_env` to `(i + 1) * agents_per_env`. Environments reset themselves when they are done.
+
+        :param max_concurrent_launches: How many games may be starting at the same time.
+        :param connect_timeout: How long to wait for each game to connect in seconds.
+        :param supervisor: An rlgym.gamelaunch.InstanceSupervisor to get the games from instead of launching them. A
+                           game that crashes or freezes is then swapped for a standby game, and only that environment
+                           starts a new episode.
+        :param instance_pool: An rlgym.gamelaunch.InstancePool to claim idle games from, only the missing ones are
+                              launched. The games are given back to it by `close`.
+
+        The other arguments are the same as `Gym`.
+        """
+        self.num_envs = len(matches)
+        self.agents_per_env = matches[0].agents
+        self.num_agents = self.num_envs * self.agents_per_env
+        self.observation_space = matches[0].observation_space
+        self.action_space = matches[0].action_space
+
+        assert all(m.agents == self.agents_per_env for m in matches), "All matches must have the same number of agents"
+        assert self.observation_space.shape is not None, "VecGym needs observations with a fixed shape"
+
+        if supervisor is not None:
+            instances = supervisor.acquire_many(self.num_envs)
+        else:
+            instances = []
+            if instance_pool is not None:
+                for _ in range(self.num_envs):
+                    instance = instance_pool.claim(launch_preference, transport, protocol)
+                    if instance is None:
+                        break
+                    instances.append(instance)
+
+            pipe_ids = ["{}_{}".format(os.getpid(), i) for i in range(len(instances), self.num_envs)]
+            if instance_pool is not None:
+                pipe_ids = [instance_pool.next_pipe_id(pipe_id) for pipe_id in pipe_ids]
+            instances += launch_instances(pipe_ids, launch_preference=launch_preference, transport=transport,
+                                          protocol=protocol, max_concurrent_launches=max_concurrent_launches,
+                                          use_injector=use_injector, connect_timeout=connect_timeout)
+        self._envs = [Gym(match, use_injector=use_injector, force_paging=force_paging, raise_on_crash=raise_on_crash,
+                          auto_minimize=auto_minimize, instance=instance, supervisor=supervisor,
+                          instance_pool=instance_pool)
+                      for match, instance in zip(matches, instances)]
+
+        self._obs = np.zeros((self.num_agents,) + tuple(self.observation_space.shape), dtype=np.float32)
+        self._rewards = np.zeros(self.num_agents, dtype=np.float32)
+        self._dones = np.zeros(self.num_agents, dtype=bool)
+
+    def reset(self) -> np.ndarray:
+        """
+        Resets every environment, the reset messages are all sent before waiting for the first state.
+
+        :return: The stacked observations, of shape (num_envs * agents_per_env, *obs_shape).
+        """
+        for env in self._envs:
+            env._send_reset_state()
+
+        for i, env in enumerate(self._envs):
+            self._obs[self._rows(i)] = env._finish_reset(env._receive_reset_state())
+
+        return self._obs.copy()
+
+    def step(self, actions: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+        """
+        Sends the actions of every environment first and only then collects the states, so all the games simulate
+        their `tick_skip` ticks at the same time.
+
+        :param actions: The actions of all agents, indexable by agent row, in the format of the `ActionParser`.
+        :return: A tuple containing (obs, rewards, dones, infos). Rewards and dones have one entry per agent, infos have
+                 one entry per environment. When an environment is done its observations are already those of the next
+                 episode, the last ones are in its info under 'terminal_observation'.
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions: Any):
+        """
+        Sends the actions of every environment without waiting for the states, see `Gym.step_async`.
+        """
+        for i, env in enumerate(self._envs):
+            env.step_async(actions[self._rows(i)])
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+        """
+        Collects the states of the actions given to `step_async`, the return value is the same as `step`.
+        """
+        infos = []
+        for i, env in enumerate(self._envs):
+            rows = self._rows(i)
+            obs, reward, done, info = env.step_wait()
+
+            self._rewards[rows] = reward
+            self._dones[rows] = done
+            if done:
+                info['terminal_observation'] = np.asarray(obs, dtype=np.float32).reshape(self._obs[rows].shape)
+                env._send_reset_state()
+            else:
+                self._obs[rows] = obs
+            infos.append(info)
+
+        # Finishing the resets last lets those games work while the other environments are processed.
+        for i, env in enumerate(self._envs):
+            if self._dones[i * self.agents_per_env]:
+                self._obs[self._rows(i)] = env._finish_reset(env._receive_reset_state())
+
+        return self._obs.copy(), self._rewards.copy(), self._dones.copy(), infos
+
+    async def astep(self, actions: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+        """
+        An asyncio version of `step`, see `Gym.astep`.
+        """
+        import asyncio
+
+        self.step_async(actions)
+        return await asyncio.get_running_loop().run_in_executor(None, self.step_wait)
+
+    def close(self):
+        for env in self._envs:
+            env.close()
+
+    def _rows(self, env_index: int) -> slice:
+        return slice(env_index * self.agents_per_env, (env_index + 1) * self.agents_per_env)
@@ -1,6 +1,17 @@
+import sys
+
 from setuptools import setup, find_packages
 from setuptools.command.install import install
 
+try:
+    from setuptools_rust import Binding, RustExtension
+
+    # Optional, without a Rust toolchain rlgym.utils.math falls back to its numba and NumPy implementations.
+    rust_extensions = [RustExtension('rlgym.rlgym_rust.rlgym_rust', path='Cargo.toml', binding=Binding.PyO3,
+                                     optional=True)]
+except ImportError:
+    rust_extensions = []
+
 
 __version__ = None  # This will get replaced when reading version.py
 exec(open('rlgym/version.py').read())
@@ -13,7 +24,9 @@ with open('README.md', 'r') as readme_file:
 class CustomInstall(install):
     def run(self):
         install.run(self)
-        self.install_plugin()
+        # The Bakkesmod plugin only exists on Windows, Linux installs drive the headless game.
+        if sys.platform == 'win32':
+            self.install_plugin()
 
     def install_plugin(self):
         print('Installing plugin')
@@ -61,11 +74,13 @@ setup(
     install_requires=[
         'gym>=0.17',
         'numpy>=1.19',
-        'pywin32==228',
-        'pywinauto==0.6.8',
+        'pywin32==228; platform_system=="Windows"',
+        'pywinauto==0.6.8; platform_system=="Windows"',
         'psutil>=5.8',
     ],
     python_requires='>=3.7',
+    rust_extensions=rust_extensions,
+    zip_safe=False,
     cmdclass={'install': CustomInstall},
     license='Apache 2.0',
     license_file='LICENSE',
@@ -75,6 +90,7 @@ setup(
         'License :: OSI Approved :: Apache Software License',
         'Programming Language :: Python :: 3',
         "Operating System :: Microsoft :: Windows",
+        "Operating System :: POSIX :: Linux",
     ],
     package_data={
         'rlgym': [
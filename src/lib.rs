@@ -1,4 +1,5 @@
 use pyo3::prelude::*;
+use pyo3::exceptions::PyValueError;
 // use pyo3::types::*;
 use numpy::*;
 use ndarray::*;
@@ -16,32 +17,26 @@ use ndarray::*;
 fn rlgym_rust(_py: Python, m: &PyModule) -> PyResult<()> {
     // m.add_function(wrap_pyfunction!(sum_as_string, m)?)?;
     m.add_function(wrap_pyfunction!(quat_to_rot_mtx, m)?)?;
+    m.add_function(wrap_pyfunction!(quat_to_rot_mtx_into, m)?)?;
+    m.add_function(wrap_pyfunction!(quat_to_rot_mtx_batch, m)?)?;
     m.add_function(wrap_pyfunction!(norm_func, m)?)?;
+    m.add_function(wrap_pyfunction!(norm_batch, m)?)?;
     // m.add_class::<GameState>()?;
     // m.add_class::<PhysicsObject>()?;
     // m.add_class::<PlayerData>()?;
     Ok(())
 }
 
-/// Quat to rot matrix calculation for RLGym using list
-#[pyfunction]
-#[pyo3(text_signature = "Takes quat list and outputs matrix in ndarray type")]
-fn quat_to_rot_mtx(nums: Vec<f64>, py: Python) -> PyResult<&PyArray2<f64>> {
-    let mut theta = Array2::<f64>::zeros((3, 3));
-
-    let norm: f64 = nums.clone()
-                        .into_iter()
-                        .map(|x: f64| x.powf(2.))
-                        .collect::<Vec<f64>>()
-                        .iter()
-                        .sum();
+/// Writes the rotation matrix of one w, x, y, z quaternion into `theta`, a zero quaternion gives a zero matrix
+fn fill_rot_mtx(quat: ArrayView1<f64>, mut theta: ArrayViewMut2<f64>) {
+    let (w, x, y, z) = (quat[0], quat[1], quat[2], quat[3]);
+    let norm: f64 = w * w + x * x + y * y + z * z;
+    if norm == 0. {
+        theta.fill(0.);
+        return;
+    }
     let s: f64 = 1.0 / norm;
 
-    let w: &f64 = &nums[0];
-    let x: &f64 = &nums[1];
-    let y: &f64 = &nums[2];
-    let z: &f64 = &nums[3];
-
     // front direction
     theta[[0, 0]] = 1. - 2. * s * (y * y + z * z);
     theta[[1, 0]] = 2. * s * (x * y + z * w);
@@ -56,24 +51,71 @@ fn quat_to_rot_mtx(nums: Vec<f64>, py: Python) -> PyResult<&PyArray2<f64>> {
     theta[[0, 2]] = 2. * s * (x * z + y * w);
     theta[[1, 2]] = 2. * s * (y * z - x * w);
     theta[[2, 2]] = 1. - 2. * s * (x * x + y * y);
+}
 
-    // let theta_arr = theta.to_pyarray(py);
+fn check_len(name: &str, len: usize, expected: usize) -> PyResult<()> {
+    if len != expected {
+        return Err(PyValueError::new_err(format!("{} has length {}, expected {}", name, len, expected)));
+    }
+    Ok(())
+}
 
-    Ok(theta.to_pyarray(py))
+/// Quat to rot matrix calculation for RLGym, reads the quaternion array in place
+#[pyfunction]
+#[pyo3(text_signature = "(quat)")]
+fn quat_to_rot_mtx<'py>(py: Python<'py>, quat: PyReadonlyArray1<f64>) -> PyResult<&'py PyArray2<f64>> {
+    check_len("quat", quat.len(), 4)?;
+    let mut theta = Array2::<f64>::zeros((3, 3));
+    fill_rot_mtx(quat.as_array(), theta.view_mut());
+    Ok(theta.into_pyarray(py))
 }
 
-/// Norm func that takes list
+/// Same as quat_to_rot_mtx, but writes into a caller provided (3, 3) array instead of allocating one
 #[pyfunction]
-#[pyo3(text_signature = "takes list and norms it")]
-fn norm_func(nums: Vec<f64>) -> PyResult<f64> {
-    let norm_val: f64 = nums.clone()
-                                 .into_iter()
-                                 .map(|x: f64| x.powf(2.))
-                                 .collect::<Vec<f64>>()
-                                 .iter()
-                                 .sum::<f64>()
-                                 .sqrt();
-    Ok(norm_val)
+#[pyo3(text_signature = "(quat, out)")]
+fn quat_to_rot_mtx_into(quat: PyReadonlyArray1<f64>, mut out: PyReadwriteArray2<f64>) -> PyResult<()> {
+    check_len("quat", quat.len(), 4)?;
+    if out.shape() != [3, 3] {
+        return Err(PyValueError::new_err("out must have shape (3, 3)"));
+    }
+    fill_rot_mtx(quat.as_array(), out.as_array_mut());
+    Ok(())
+}
+
+/// Converts (N, 4) quaternions into the (N, 3, 3) `out` array in one call
+#[pyfunction]
+#[pyo3(text_signature = "(quats, out)")]
+fn quat_to_rot_mtx_batch(quats: PyReadonlyArray2<f64>, mut out: PyReadwriteArray3<f64>) -> PyResult<()> {
+    let quats = quats.as_array();
+    let mut out = out.as_array_mut();
+    check_len("quats.shape[1]", quats.ncols(), 4)?;
+    if out.shape() != [quats.nrows(), 3, 3] {
+        return Err(PyValueError::new_err("out must have shape (len(quats), 3, 3)"));
+    }
+    for (quat, theta) in quats.outer_iter().zip(out.outer_iter_mut()) {
+        fill_rot_mtx(quat, theta);
+    }
+    Ok(())
+}
+
+/// Norm func that reads the array in place
+#[pyfunction]
+#[pyo3(text_signature = "(nums)")]
+fn norm_func(nums: PyReadonlyArray1<f64>) -> PyResult<f64> {
+    Ok(nums.as_array().fold(0., |acc, x| acc + x * x).sqrt())
+}
+
+/// Writes the norm of every row of `vecs` into `out`
+#[pyfunction]
+#[pyo3(text_signature = "(vecs, out)")]
+fn norm_batch(vecs: PyReadonlyArray2<f64>, mut out: PyReadwriteArray1<f64>) -> PyResult<()> {
+    let vecs = vecs.as_array();
+    let mut out = out.as_array_mut();
+    check_len("out", out.len(), vecs.nrows())?;
+    for (row, norm) in vecs.outer_iter().zip(out.iter_mut()) {
+        *norm = row.fold(0., |acc, x| acc + x * x).sqrt();
+    }
+    Ok(())
 }
 
 